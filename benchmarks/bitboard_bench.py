@@ -0,0 +1,86 @@
+"""
+File: bitboard_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Compares asking "is any enemy in this unit's attack range" the
+way Map.enemy_in_attack_range used to, getting the unit's range
+and checking every enemy against it, with one AND of bitboard
+masks from src/core/bitboard.py.
+
+Usage: python -m benchmarks.bitboard_bench
+
+"""
+
+import random
+import timeit
+
+from src.core.bitboard import Bitboard
+from src.constants import GRID_COLUMNS, GRID_ROWS
+from src.core.unit import Unit
+
+# (columns, rows, enemy units)
+BOARDS = [
+    (GRID_COLUMNS, GRID_ROWS, 3),
+    (100, 100, 100),
+    (1000, 1000, 1000),
+]
+
+QUERIES = 1000
+
+
+def make_board(cols, rows, enemy_count):
+    """
+    Returns enemy units scattered over the board, their
+    bitboard and units to ask about.
+    """
+    bitboard = Bitboard(cols, rows)
+    enemies = []
+    for _ in range(enemy_count):
+        enemy = Unit(4)
+        enemy.pos = [random.randrange(cols), random.randrange(rows)]
+        bitboard.set_unit(enemy.pos[0], enemy.pos[1], enemy.type)
+        enemies.append(enemy)
+    units = []
+    for _ in range(QUERIES):
+        unit = Unit(1)
+        unit.pos = [random.randrange(cols), random.randrange(rows)]
+        units.append(unit)
+    return enemies, bitboard, units
+
+
+def with_lists(units, enemies, cols, rows):
+    found = 0
+    for unit in units:
+        attack_range = unit.get_range("attack", cols, rows)
+        for enemy in enemies:
+            if tuple(enemy.pos) in attack_range:
+                found += 1
+                break
+    return found
+
+
+def with_bitboard(units, bitboard):
+    found = 0
+    enemies = bitboard.players[2]
+    for unit in units:
+        col, row = unit.pos
+        found += bitboard.any_in_range(col, row, unit.attack_range, enemies)
+    return found
+
+
+def main():
+    print("{:>11} {:>8} {:>12} {:>14}".format("board", "enemies", "sets_us", "bitboard_us"))
+    for cols, rows, enemy_count in BOARDS:
+        random.seed(cols)
+        enemies, bitboard, units = make_board(cols, rows, enemy_count)
+        assert with_lists(units, enemies, cols, rows) == with_bitboard(units, bitboard)
+        lists = min(timeit.repeat(lambda: with_lists(units, enemies, cols, rows), number=1, repeat=3))
+        # The first run builds the range table for boards that use one
+        bits = min(timeit.repeat(lambda: with_bitboard(units, bitboard), number=1, repeat=3))
+        print("{:>11} {:>8} {:>12.2f} {:>14.2f}".format(
+            "{}x{}".format(cols, rows), enemy_count, lists / QUERIES * 1000000, bits / QUERIES * 1000000))
+
+
+if __name__ == "__main__":
+    main()
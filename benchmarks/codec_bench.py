@@ -0,0 +1,111 @@
+"""
+File: codec_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Compares the binary codec in src/codec.py against pickle:
+encode time, decode time and payload size for game states,
+turns and change lists on the 14x12 board and on much
+larger boards and armies.
+
+Usage: python -m benchmarks.codec_bench
+
+"""
+
+import pickle
+import random
+import timeit
+
+from src.codec import encode_gamestate, decode_gamestate, encode_turn, decode_turn
+from src.codec import encode_changes, decode_changes
+from src.constants import GRID_COLUMNS, GRID_ROWS, END_TURN
+from src.core.gamestate import GameState
+
+# (columns, rows, units per player)
+BOARDS = [
+    (GRID_COLUMNS, GRID_ROWS, 3),
+    (100, 100, 100),
+    (1000, 1000, 1000),
+    (4000, 4000, 10000),
+]
+
+
+def make_gamestate(cols, rows, units_per_player):
+    """
+    Build a GameState with units scattered over the board.
+    """
+    gamestate = GameState()
+    unit_count = 2 * units_per_player
+    gamestate.unit_locations = {
+        unit_type: [random.randrange(cols), random.randrange(rows)]
+        for unit_type in range(1, unit_count + 1)
+    }
+    gamestate.unit_health = {
+        unit_type: random.randint(0, 5)
+        for unit_type in range(1, unit_count + 1)
+    }
+    for unit_type, health in gamestate.unit_health.items():
+        if health == 0:
+            gamestate.unit_locations[unit_type] = None
+    gamestate.set_ready(1)
+    gamestate.set_ready(2)
+    return gamestate
+
+
+def make_changes(gamestate, count):
+    """
+    Returns the log of count random moves and attacks.
+    """
+    unit_types = list(gamestate.unit_health)
+    version = gamestate.version
+    for _ in range(count):
+        gamestate.move_unit([random.choice(unit_types), 3, 4])
+        gamestate.attack_unit([random.choice(unit_types), 1])
+        gamestate.change_turns()
+    return gamestate.changes_since(version)
+
+
+def measure(name, value, encode, decode):
+    """
+    Time encode/decode with both codecs and print one row.
+    """
+    number = 1
+    while timeit.timeit(lambda: encode(value), number=number) < 0.2:
+        number *= 2
+
+    encoded = encode(value)
+    pickled = pickle.dumps(value)
+    codec_encode = min(timeit.repeat(lambda: encode(value), number=number, repeat=3)) / number
+    codec_decode = min(timeit.repeat(lambda: decode(encoded), number=number, repeat=3)) / number
+    pickle_encode = min(timeit.repeat(lambda: pickle.dumps(value), number=number, repeat=3)) / number
+    pickle_decode = min(timeit.repeat(lambda: pickle.loads(pickled), number=number, repeat=3)) / number
+
+    print("{:<28} {:>10} {:>10} {:>11.2f} {:>11.2f} {:>11.2f} {:>11.2f}".format(
+        name, len(encoded), len(pickled),
+        codec_encode * 1e6, pickle_encode * 1e6,
+        codec_decode * 1e6, pickle_decode * 1e6))
+
+
+def main():
+    random.seed(0)
+    print("{:<28} {:>10} {:>10} {:>11} {:>11} {:>11} {:>11}".format(
+        "message", "codec_B", "pickle_B", "codec_enc", "pickle_enc", "codec_dec", "pickle_dec"))
+    print("{:<28} {:>10} {:>10} {:>11} {:>11} {:>11} {:>11}".format(
+        "", "", "", "us", "us", "us", "us"))
+
+    turn = {"move": [1, 5, 6], "attack": [4, 1], "phase": END_TURN}
+    measure("turn", turn, encode_turn, decode_turn)
+
+    for cols, rows, units in BOARDS:
+        gamestate = make_gamestate(cols, rows, units)
+        name = "gamestate {}x{} {}u".format(cols, rows, 2 * units)
+        measure(name, gamestate, encode_gamestate, decode_gamestate)
+
+    gamestate = make_gamestate(GRID_COLUMNS, GRID_ROWS, 3)
+    for count in (1, 50):
+        changes = make_changes(gamestate, count)
+        measure("changes {} turns".format(count), changes, encode_changes, decode_changes)
+
+
+if __name__ == "__main__":
+    main()
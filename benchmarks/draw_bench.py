@@ -0,0 +1,91 @@
+"""
+File: draw_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Times Map.draw on boards from 14x12 up to 2000x2000, at the
+usual zoom and zoomed all the way out. Only the tiles in the
+camera's view are drawn, so frame time should stay about the
+same however big the board gets.
+
+Also shows the memory the grid's chunks take against a whole
+uint8 array per layer, with some terrain scattered over it.
+
+Runs without a window, on SDL's dummy video driver.
+
+Usage: python -m benchmarks.draw_bench
+
+"""
+
+import os
+import random
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from src.camera import MIN_ZOOM
+from src.constants import GRID_COLUMNS, GRID_ROWS, WINDOW_WIDTH, WINDOW_HEIGHT, HARM, HEALTH
+from src.map import Map
+
+# (columns, rows)
+BOARDS = [
+    (GRID_COLUMNS, GRID_ROWS),
+    (100, 100),
+    (1000, 1000),
+    (2000, 2000),
+]
+
+# Patches of terrain scattered over each board
+PATCHES = 200
+PATCH_SIZE = 5
+
+FRAMES = 20
+
+
+def make_map(screen, cols, rows):
+    game_map = Map(screen, 1, cols, rows)
+    for _ in range(PATCHES):
+        col, row = random.randrange(cols), random.randrange(rows)
+        tile_type = random.choice((HARM, HEALTH))
+        game_map.grid.set_tile_types(
+            [(min(col + i, cols - 1), min(row + j, rows - 1))
+             for i in range(PATCH_SIZE) for j in range(PATCH_SIZE)], tile_type)
+    return game_map
+
+
+def time_draw(game_map):
+    return min(timeit.repeat(game_map.draw, number=FRAMES, repeat=3)) / FRAMES * 1000
+
+
+def count_tiles(camera):
+    first_col, first_row, last_col, last_row = camera.visible_tiles()
+    return (last_col - first_col + 1) * (last_row - first_row + 1)
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    print("{:>11} {:>8} {:>10} {:>10} {:>12} {:>12} {:>12}".format(
+        "board", "tiles", "draw_ms", "out_tiles", "out_draw_ms", "chunks_kb", "arrays_kb"))
+    for cols, rows in BOARDS:
+        random.seed(cols)
+        game_map = make_map(screen, cols, rows)
+        camera = game_map.camera
+        camera.center_on(cols // 2, rows // 2)
+        tiles, draw = count_tiles(camera), time_draw(game_map)
+
+        camera.zoom_by(MIN_ZOOM / camera.zoom)
+        out_tiles, out_draw = count_tiles(camera), time_draw(game_map)
+
+        grid = game_map.grid
+        chunks = grid.tile_types.nbytes + grid.unit_types.nbytes
+        print("{:>11} {:>8} {:>10.2f} {:>10} {:>12.2f} {:>12.0f} {:>12.0f}".format(
+            "{}x{}".format(cols, rows), tiles, draw, out_tiles, out_draw,
+            chunks / 1024, 2 * cols * rows / 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+File: encryption_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Compares the per-connection session cipher in src/encryption.py
+with the Fernet tokens it replaced: messages per second
+(encrypt on one side, decrypt on the other) and bytes added
+to each message.
+
+Usage: python -m benchmarks.encryption_bench
+
+"""
+
+import timeit
+
+from cryptography.fernet import Fernet
+
+from src.encryption import Handshake
+
+MESSAGES = [
+    ("request_turn", b"request_turn"),
+    ("turn", bytes(13)),
+    ("gamestate 14x12", bytes(57)),
+    ("16 KiB", bytes(16 * 1024)),
+]
+
+
+def messages_per_second(encrypt, decrypt, message):
+    number = 1
+    while timeit.timeit(lambda: decrypt(encrypt(message)), number=number) < 0.2:
+        number *= 2
+    seconds = min(timeit.repeat(lambda: decrypt(encrypt(message)), number=number, repeat=3))
+    return number / seconds
+
+
+def main():
+    fernet = Fernet(Fernet.generate_key())
+
+    client = Handshake()
+    server = Handshake()
+    client_session = client.create_session(server.public_key, is_client=True)
+    server_session = server.create_session(client.public_key, is_client=False)
+
+    print("{:<16} {:>8} {:>14} {:>14} {:>12} {:>12}".format(
+        "message", "bytes", "fernet_msg/s", "session_msg/s", "fernet_+B", "session_+B"))
+    for name, message in MESSAGES:
+        fernet_rate = messages_per_second(fernet.encrypt, fernet.decrypt, message)
+        session_rate = messages_per_second(client_session.encrypt, server_session.decrypt, message)
+        fernet_overhead = len(fernet.encrypt(message)) - len(message)
+        session_overhead = len(client_session.encrypt(message)) - len(message)
+        # Keep the receiving counter in step with the message just sealed
+        server_session.receive_count += 1
+        print("{:<16} {:>8} {:>14.0f} {:>14.0f} {:>12} {:>12}".format(
+            name, len(message), fernet_rate, session_rate, fernet_overhead, session_overhead))
+
+    def handshake():
+        client = Handshake()
+        server = Handshake()
+        client.create_session(server.public_key, is_client=True)
+        server.create_session(client.public_key, is_client=False)
+
+    number = 200
+    seconds = min(timeit.repeat(handshake, number=number, repeat=3))
+    print("\nhandshake (both sides): {:.1f} us".format(seconds / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
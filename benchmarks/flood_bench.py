@@ -0,0 +1,151 @@
+"""
+File: flood_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Measures how much a few abusive clients slow down everyone else.
+
+Starts server.py, seats some well-behaved matches and times their
+turns, then times them again while another process floods the
+server: pairs of clients that pipeline "get" commands without
+reading the replies, clients that spam invalid commands, and
+clients that keep reconnecting to send oversized frames.
+
+Usage: python -m benchmarks.flood_bench [flooders]
+
+"""
+
+import asyncio
+import json
+import multiprocessing
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.match_capacity import raise_file_limit, play_round
+from src.asyncclient import HOST, free_port, seat_match
+from src.encryption import Handshake
+from src.protocol import pack_frame, HEADER, MSG_TEXT, MSG_HELLO, MAX_PAYLOAD_SIZE
+
+MATCHES = 20
+ROUNDS = 50
+DEFAULT_FLOODERS = 10
+
+# Frames written at a time by a flooder
+BATCH = 100
+
+
+async def open_flooder(port, join=True):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    handshake = Handshake()
+    writer.write(pack_frame(MSG_HELLO, handshake.public_key))
+    length, _ = HEADER.unpack(await reader.readexactly(HEADER.size))
+    session = handshake.create_session(await reader.readexactly(length), is_client=True)
+    if join:
+        writer.write(pack_frame(MSG_TEXT, session.encrypt(b"join")))
+    return reader, writer, session
+
+
+async def spam(port, command):
+    # Never reads, so replies pile up on the server
+    _, writer, session = await open_flooder(port)
+    try:
+        while True:
+            writer.write(b"".join(pack_frame(MSG_TEXT, session.encrypt(command)) for _ in range(BATCH)))
+            await writer.drain()
+            # drain() doesn't give up the loop unless the socket is full
+            await asyncio.sleep(0)
+    except ConnectionError:
+        pass
+
+
+async def oversize(port):
+    # Header of a frame far larger than anything a client sends
+    while True:
+        try:
+            reader, writer, _ = await open_flooder(port, join=False)
+            writer.write(HEADER.pack(MAX_PAYLOAD_SIZE, MSG_TEXT) + bytes(4096))
+            await reader.read()
+            writer.close()
+        except ConnectionError:
+            pass
+
+
+def flood(port, flooders):
+    async def run():
+        tasks = []
+        for _ in range(flooders):
+            tasks.append(spam(port, b"get"))
+            tasks.append(spam(port, b"get"))
+            tasks.append(spam(port, b"nonsense"))
+            tasks.append(oversize(port))
+        await asyncio.gather(*tasks)
+    asyncio.run(run())
+
+
+async def time_turns(port, matches):
+    latencies = []
+    for _ in range(ROUNDS):
+        await asyncio.gather(*(play_round(players, latencies) for players in matches))
+    latencies.sort()
+    return statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+
+def get_stats(stats_port):
+    with socket.create_connection((HOST, stats_port)) as sock:
+        data = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return json.loads(data)
+            data += chunk
+
+
+async def run_load(port, flooders):
+    matches = [await seat_match(port, push=True) for _ in range(MATCHES)]
+    quiet = await time_turns(port, matches)
+
+    flooder = multiprocessing.Process(target=flood, args=(port, flooders), daemon=True)
+    flooder.start()
+    # Let the flood build up
+    await asyncio.sleep(1)
+    flooded = await time_turns(port, matches)
+    flooder.terminate()
+    flooder.join()
+    return quiet, flooded
+
+
+def main():
+    flooders = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FLOODERS
+    raise_file_limit(2 * MATCHES + 4 * flooders + 64)
+    port = free_port()
+    stats_port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "server.py", HOST, str(port), "--stats-port", str(stats_port)],
+        stdout=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection((HOST, port)).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        time.sleep(0.1)
+        quiet, flooded = asyncio.run(run_load(port, flooders))
+        counters = get_stats(stats_port)["counters"]
+    finally:
+        server.terminate()
+        server.wait()
+
+    print("{} matches, {} flooding clients".format(MATCHES, 4 * flooders))
+    print("{:>10} {:>10} {:>10}".format("", "p50_ms", "p99_ms"))
+    print("{:>10} {:>10.2f} {:>10.2f}".format("quiet", *quiet))
+    print("{:>10} {:>10.2f} {:>10.2f}".format("flooded", *flooded))
+    for name in ("rate_limited", "invalid_commands", "rejected_frames", "slow_client_drops"):
+        print("{}: {}".format(name, counters.get(name, 0)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+File: grid_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Compares the chunked uint8 arrays in src/core/grid.py against the old
+list of [tile_type, unit_type] lists, walked tile by tile the way
+Map.remove_highlight, Map.highlight_tiles and Map.reset did.
+
+Times highlighting N tiles, clearing the highlight and clearing
+the whole board, on the 14x12 board and on much larger ones. The
+"masks" grid also keeps the Bitboard and Pathfinder up to date,
+as the one in Board does.
+
+Usage: python -m benchmarks.grid_bench
+
+"""
+
+import random
+import timeit
+
+from src.constants import GRID_COLUMNS, GRID_ROWS, BLANK, MOVABLE
+from src.core.grid import Grid
+
+# (columns, rows)
+BOARDS = [
+    (GRID_COLUMNS, GRID_ROWS),
+    (100, 100),
+    (1000, 1000),
+]
+
+# Share of the board highlighted
+HIGHLIGHTED = 0.1
+
+
+class ListGrid:
+    """
+    The board as it was stored before, for comparison.
+    """
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+        self.grid = [[[0, 0] for j in range(cols)] for i in range(rows)]
+
+    def set_tile_type(self, col, row, tile_type=0):
+        try:
+            self.grid[row][col][0] = tile_type
+        except IndexError:
+            pass
+
+    def get_tile_type(self, col, row):
+        try:
+            return self.grid[row][col][0]
+        except IndexError:
+            return -1
+
+    def set_tile_types(self, positions, tile_type):
+        for col, row in positions:
+            self.set_tile_type(col, row, tile_type)
+
+    def clear_tile_type(self, tile_type):
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if self.get_tile_type(col, row) == tile_type:
+                    self.set_tile_type(col, row, BLANK)
+
+    def clear_tiles(self):
+        for row in range(self.rows):
+            for col in range(self.cols):
+                self.set_tile_type(col, row, BLANK)
+
+
+def time_grid(grid, positions):
+    """
+    Returns microseconds to highlight the tiles, clear the
+    highlight and clear the board.
+    """
+    number = max(1, 20000 // (grid.cols * grid.rows))
+    highlight = min(timeit.repeat(
+        lambda: grid.set_tile_types(positions, MOVABLE), number=number, repeat=3)) / number
+    clear_highlight = min(timeit.repeat(
+        lambda: grid.clear_tile_type(MOVABLE), number=number, repeat=3)) / number
+    clear = min(timeit.repeat(grid.clear_tiles, number=number, repeat=3)) / number
+    return highlight * 1000000, clear_highlight * 1000000, clear * 1000000
+
+
+def main():
+    print("{:>11} {:>8} {:>14} {:>14} {:>14}".format("board", "grid", "highlight_us", "unhighlight_us", "clear_us"))
+    for cols, rows in BOARDS:
+        random.seed(cols)
+        count = int(cols * rows * HIGHLIGHTED)
+        positions = [(random.randrange(cols), random.randrange(rows)) for _ in range(count)]
+        grids = (("lists", ListGrid(cols, rows)), ("arrays", Grid(cols, rows)),
+                 ("masks", Grid(cols, rows, bitboard=True, pathfinder=True)))
+        for name, grid in grids:
+            print("{:>11} {:>8} {:>14.1f} {:>14.1f} {:>14.1f}".format(
+                "{}x{}".format(cols, rows), name, *time_grid(grid, positions)))
+
+
+if __name__ == "__main__":
+    main()
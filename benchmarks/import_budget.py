@@ -0,0 +1,105 @@
+"""
+File: import_budget.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Checks that the rules in src/core import quickly and without
+the GUI, so the server, bots and anything else simulating games
+never pay for pygame.
+
+Imports each module in a fresh interpreter, a few times, and
+keeps the quickest. A core module fails if it takes longer than
+its budget or pulls in pygame or any part of src outside
+src/core. The server and bot only have to stay off pygame and
+within their budgets.
+
+Exits with status 1 if anything fails, so it can run as a check.
+
+Usage: python -m benchmarks.import_budget
+
+"""
+
+import json
+import subprocess
+import sys
+
+# Milliseconds each module may take to import, including what it imports
+CORE_BUDGETS = {
+    "src.core.constants" : 10,
+    "src.core.unit" : 20,
+    "src.core.gamestate" : 20,
+    "src.core.rules" : 20,
+    "src.core.pathfinding" : 20,
+    # These need numpy, which takes most of their budget
+    "src.core.chunks" : 300,
+    "src.core.bitboard" : 300,
+    "src.core.grid" : 300,
+    "src.core.board" : 300,
+    "src.core.unittable" : 300,
+}
+PROCESS_BUDGETS = {
+    "src.bot" : 200,
+    "server" : 300,
+}
+
+# Modules that mean the GUI was imported
+GUI_MODULES = ("pygame",)
+
+RUNS = 5
+
+MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed * 1000, sorted(sys.modules)]))
+"""
+
+
+def measure(module):
+    """
+    Returns the quickest import of a module in milliseconds
+    and the modules loaded by it.
+    """
+    best = None
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, "-c", MEASURE.format(module=module)],
+                                capture_output=True, text=True, check=True).stdout
+        elapsed, modules = json.loads(output)
+        if best is None or elapsed < best[0]:
+            best = (elapsed, modules)
+    return best
+
+
+def check(module, budget, core):
+    """
+    Returns why a module fails its budget, None if it doesn't.
+    """
+    elapsed, modules = measure(module)
+    problems = []
+    if elapsed > budget:
+        problems.append("over budget")
+    gui = [name for name in modules if name.split(".")[0] in GUI_MODULES]
+    if gui:
+        problems.append("imports " + gui[0])
+    if core:
+        outside = [name for name in modules
+                   if name.startswith("src.") and not name.startswith("src.core")]
+        if outside:
+            problems.append("imports " + outside[0])
+    print("{:>22} {:>10.1f} {:>10} {}".format(module, elapsed, budget, ", ".join(problems) or "ok"))
+    return problems or None
+
+
+def main():
+    print("{:>22} {:>10} {:>10} {}".format("module", "import_ms", "budget_ms", "result"))
+    failed = [module for module, budget in CORE_BUDGETS.items() if check(module, budget, True)]
+    failed += [module for module, budget in PROCESS_BUDGETS.items() if check(module, budget, False)]
+    if failed:
+        print("FAILED:", ", ".join(failed))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+File: loadgen.py
+Programmers: Fernando Rodriguez, Charles Davis
+
+
+Puts load on a running server with headless Bot clients.
+
+Clients are split across worker processes, one thread per
+client, and every pair of them plays a match of random legal
+turns (or a script). When all clients finish, a JSON report is
+written with p50/p95/p99 latency per command, turns per second
+and error counts, so runs can be compared over time.
+
+Usage: python -m benchmarks.loadgen <ip> <port> [--clients N] [--processes P]
+           [--turns T] [--push] [--script FILE] [--seed S] [--ratings R] [--output FILE]
+
+A script is a JSON object of turns listed by player number, e.g.
+{"1": [{"move": [1, 1, 0], "attack": null}], "2": [...]}; bots
+play random turns once their script runs out.
+
+With --ratings R, every bot queues with a random rating below R,
+so the server's matchmaking pairs bots within rating bands. A bot
+left without a close opponent waits for its band to widen, which
+can take longer than --timeout.
+
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+from benchmarks.match_capacity import raise_file_limit
+from src.bot import Bot, DEFAULT_TIMEOUT
+from src.network import Network
+
+# Threads only block on sockets, they don't need a full stack
+THREAD_STACK_SIZE = 256 * 1024
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, percent):
+    # Nearest-rank percentile of an already sorted list
+    index = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[index]
+
+
+def run_clients(host, port, client_count, turns, push, script, seed, timeout, ratings):
+    """
+    Play client_count bots at once from this process.
+
+    Returns:
+        (dict, Counter, int) -- Latencies listed by command, errors and turns played
+    """
+    threading.stack_size(THREAD_STACK_SIZE)
+    bots = []
+    for i in range(client_count):
+        rating = None
+        if ratings:
+            rating = random.Random(seed + i).randrange(ratings)
+        bots.append(Bot(Network(host, port), push, script, seed + i, timeout, rating))
+
+    # Network reports problems with print(), keep them out of the report
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        threads = [threading.Thread(target=bot.run, args=(turns,)) for bot in bots]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    latencies = defaultdict(list)
+    errors = Counter()
+    turns_played = 0
+    for bot in bots:
+        for command, values in bot.latencies.items():
+            latencies[command] += values
+        errors.update(bot.errors)
+        turns_played += bot.turns_played
+    return dict(latencies), errors, turns_played
+
+
+def load_script(path):
+    if path is None:
+        return None
+    with open(path) as script_file:
+        script = json.load(script_file)
+    return {int(player_num) : turns for player_num, turns in script.items()}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.loadgen",
+                                     description="Load a running server with headless bots.")
+    parser.add_argument("host")
+    parser.add_argument("port", type=int)
+    parser.add_argument("--clients", type=int, default=1000, help="bots to run, two per match")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="processes to spread bots over")
+    parser.add_argument("--turns", type=int, default=20, help="most turns each bot plays")
+    parser.add_argument("--push", action="store_true", help="wait for server events instead of polling")
+    parser.add_argument("--script", help="JSON file of turns to play first")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the bots' random turns")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds a bot waits for a reply or its turn")
+    parser.add_argument("--ratings", type=int, default=0, help="queue bots with random ratings below this")
+    parser.add_argument("--output", help="write the report here instead of stdout")
+    return parser.parse_args()
+
+
+def main():
+    arguments = parse_arguments()
+    script = load_script(arguments.script)
+    process_count = max(1, min(arguments.processes, arguments.clients))
+    raise_file_limit(arguments.clients + 64)
+
+    # Spread clients as evenly as possible, seeds never overlap
+    jobs = []
+    seed = arguments.seed
+    for index in range(process_count):
+        client_count = arguments.clients // process_count
+        if index < arguments.clients % process_count:
+            client_count += 1
+        jobs.append((arguments.host, arguments.port, client_count, arguments.turns,
+                     arguments.push, script, seed, arguments.timeout, arguments.ratings))
+        seed += client_count
+
+    started = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    start = time.perf_counter()
+    with multiprocessing.Pool(process_count) as pool:
+        results = pool.starmap(run_clients, jobs)
+    elapsed = time.perf_counter() - start
+
+    latencies = defaultdict(list)
+    errors = Counter()
+    turns_played = 0
+    for process_latencies, process_errors, process_turns in results:
+        for command, values in process_latencies.items():
+            latencies[command] += values
+        errors.update(process_errors)
+        turns_played += process_turns
+
+    commands = {}
+    for command, values in sorted(latencies.items()):
+        values.sort()
+        commands[command] = {"count" : len(values)}
+        for percent in PERCENTILES:
+            commands[command]["p{}_ms".format(percent)] = round(percentile(values, percent) * 1000, 3)
+        commands[command]["max_ms"] = round(values[-1] * 1000, 3)
+
+    report = {
+        "host" : arguments.host,
+        "port" : arguments.port,
+        "clients" : arguments.clients,
+        "processes" : process_count,
+        "turns_per_client" : arguments.turns,
+        "push" : arguments.push,
+        "seed" : arguments.seed,
+        "ratings" : arguments.ratings,
+        "started" : started,
+        "duration_sec" : round(elapsed, 3),
+        "turns" : turns_played,
+        "turns_per_sec" : round(turns_played / elapsed, 1),
+        "commands" : commands,
+        "errors" : dict(sorted(errors.items())),
+        "error_count" : sum(errors.values()),
+    }
+
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            json.dump(report, output, indent=2)
+            output.write("\n")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
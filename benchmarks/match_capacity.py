@@ -0,0 +1,149 @@
+"""
+File: match_capacity.py
+Programmers: Fernando Rodriguez, Charles Davis
+
+
+Measures how many concurrent matches one server process can
+hold and how long a turn takes at each load level.
+
+Starts server.py in a subprocess, seats N matches against it,
+plays a few rounds of turns in every match at once and reports
+server memory, server thread count and per-turn latency.
+
+Usage: python -m benchmarks.match_capacity [--push] [--journal] [matches ...]
+
+With --push, idle players subscribe to server events and wait
+for "your_turn" instead of polling request_turn every frame.
+With --journal, the server journals every turn to a temporary
+directory with fsync after every group commit.
+
+"""
+
+import asyncio
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.asyncclient import HOST, free_port, seat_match
+DEFAULT_MATCH_COUNTS = [10, 1000, 10000]
+ROUNDS = 2
+
+
+def raise_file_limit(needed):
+    """
+    Make room for one socket per player in both the server
+    and this process. Child processes inherit the new limit.
+    """
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft >= needed:
+        return
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (needed, max(hard, needed)))
+    except (ValueError, OSError):
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        if hard < needed:
+            raise OSError("needs {} open files, limit is {}".format(needed, hard))
+
+
+def process_status(pid):
+    """
+    Returns (resident kB, thread count) of a process.
+    """
+    rss, threads = 0, 0
+    with open("/proc/{}/status".format(pid)) as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+            elif line.startswith("Threads:"):
+                threads = int(line.split()[1])
+    return rss, threads
+
+
+async def play_round(players, latencies):
+    # Each turn lasts until the opponent sees it is their move
+    for player, opponent in (players, players[::-1]):
+        start = time.perf_counter()
+        await player.send_turn()
+        await opponent.wait_for_turn()
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_load(port, match_count, server_pid, push):
+    idle_rss, _ = process_status(server_pid)
+
+    matches = []
+    for _ in range(match_count):
+        matches.append(await seat_match(port, push))
+    seated_rss, threads = process_status(server_pid)
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await asyncio.gather(*(play_round(players, latencies) for players in matches))
+    elapsed = time.perf_counter() - start
+
+    for players in matches:
+        for player in players:
+            await player.command("quit")
+            player.writer.close()
+
+    latencies.sort()
+    return {
+        "matches": match_count,
+        "server_threads": threads,
+        "server_rss_kb": seated_rss,
+        "kb_per_match": (seated_rss - idle_rss) / match_count,
+        "turns_per_sec": len(latencies) / elapsed,
+        "turn_p50_ms": statistics.median(latencies) * 1000,
+        "turn_p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def benchmark(match_count, push, journal):
+    raise_file_limit(2 * match_count + 64)
+    port = free_port()
+    command = [sys.executable, "server.py", HOST, str(port)]
+    journal_directory = None
+    if journal:
+        journal_directory = tempfile.TemporaryDirectory()
+        command += ["--journal", journal_directory.name]
+    server = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    try:
+        # Wait for the server to start listening
+        for _ in range(100):
+            try:
+                socket.create_connection((HOST, port)).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        time.sleep(0.1)
+        return asyncio.run(run_load(port, match_count, server.pid, push))
+    finally:
+        server.terminate()
+        server.wait()
+        if journal_directory is not None:
+            journal_directory.cleanup()
+
+
+def main():
+    push = "--push" in sys.argv
+    journal = "--journal" in sys.argv
+    counts = [int(arg) for arg in sys.argv[1:] if not arg.startswith("--")] or DEFAULT_MATCH_COUNTS
+    print("{:>8} {:>8} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "matches", "threads", "rss_kb", "kb/match", "turns/s", "p50_ms", "p99_ms"))
+    for count in counts:
+        try:
+            result = benchmark(count, push, journal)
+        except OSError as e:
+            print("{:>8} failed: {}".format(count, e))
+            continue
+        print("{matches:>8} {server_threads:>8} {server_rss_kb:>10} {kb_per_match:>10.2f} "
+              "{turns_per_sec:>10.0f} {turn_p50_ms:>10.2f} {turn_p99_ms:>10.2f}".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+File: match_stress.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Hammers one match from both sides at once and checks that
+the server applied every command exactly once, in order.
+
+Starts server.py, seats a match, then has both players pipeline
+turns, gets, syncs and request_turns as fast as they can without
+waiting for replies. Turns are passes, so each one is legal
+exactly when it's that player's turn. Afterwards checks that:
+
+    every command got exactly one reply, in the order sent
+    accepted turns alternated between the players
+    both players see the same final GameState
+    that GameState's turn matches the accepted turns
+
+Exits with status 1 if any check fails.
+
+Usage: python -m benchmarks.match_stress [rounds]
+
+"""
+
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+
+from src.asyncclient import HOST, ROUND, free_port, seat_match, send_rounds, read_replies, get_gamestate
+
+DEFAULT_ROUNDS = 300
+
+# Seconds to wait for all the replies before calling it a failure
+TIMEOUT = 120
+
+async def hammer(port, rounds):
+    players = await seat_match(port, push=False)
+    start = time.perf_counter()
+    results = await asyncio.wait_for(asyncio.gather(
+        *(send_rounds(player, rounds) for player in players),
+        *(read_replies(player, rounds) for player in players)), TIMEOUT)
+    elapsed = time.perf_counter() - start
+    (accepted_1, errors_1), (accepted_2, errors_2) = results[2:]
+    errors = errors_1 + errors_2
+
+    # Player 1 goes first, so the counts differ by at most one
+    if not 0 <= len(accepted_1) - len(accepted_2) <= 1:
+        errors.append("accepted turns don't alternate: {} and {}".format(len(accepted_1), len(accepted_2)))
+
+    states = [await get_gamestate(player) for player in players]
+    if states[0].version != states[1].version or states[0].turn != states[1].turn:
+        errors.append("players see different GameStates")
+    expected_turn = 1 if len(accepted_1) == len(accepted_2) else 2
+    if states[0].get_turn() != expected_turn:
+        errors.append("GameState says player {}'s turn, expected {}".format(states[0].get_turn(), expected_turn))
+
+    for player in players:
+        await player.command("quit")
+        player.writer.close()
+    return {
+        "commands": 2 * rounds * len(ROUND),
+        "elapsed": elapsed,
+        "accepted_turns": len(accepted_1) + len(accepted_2),
+        "errors": errors,
+    }
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROUNDS
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "server.py", HOST, str(port)], stdout=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection((HOST, port)).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        time.sleep(0.1)
+        result = asyncio.run(hammer(port, rounds))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print("{} commands in {:.2f} s, {} turns accepted".format(
+        result["commands"], result["elapsed"], result["accepted_turns"]))
+    for error in result["errors"][:20]:
+        print("[Error]:", error)
+    if result["errors"]:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+File: matchmaking_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Measures the matchmaking queue in src/matchmaking.py.
+
+Fills the queue with N rated players who can't be paired with
+each other, then times players joining who pair with a random
+one of them, against finding that opponent by scanning a list
+of everyone waiting.
+
+Usage: python -m benchmarks.matchmaking_bench [depth ...]
+
+"""
+
+import random
+import sys
+import time
+
+from src.matchmaking import Matchmaker, DEFAULT_BAND_WIDTH
+
+DEFAULT_DEPTHS = [1000, 10000, 100000]
+JOINS = 5000
+
+
+def waiting_rating(index):
+    # Every third band, so no two waiting players are close enough to pair
+    return 3 * index * DEFAULT_BAND_WIDTH
+
+
+def time_matchmaker(depth, targets):
+    matchmaker = Matchmaker()
+    for index in range(depth):
+        matchmaker.add(index, waiting_rating(index))
+
+    start = time.perf_counter()
+    for count, target in enumerate(targets):
+        _, opponent = matchmaker.add(None, waiting_rating(target) + 1)
+        assert opponent is not None
+        # Keep the queue at the same depth
+        matchmaker.add(None, waiting_rating(depth + count))
+    return (time.perf_counter() - start) / len(targets)
+
+
+def time_scan(depth, targets):
+    # Everyone waiting, oldest first
+    waiting = [(index, waiting_rating(index)) for index in range(depth)]
+
+    start = time.perf_counter()
+    for count, target in enumerate(targets):
+        rating = waiting_rating(target) + 1
+        for position, (player, other_rating) in enumerate(waiting):
+            if abs(other_rating - rating) < 2 * DEFAULT_BAND_WIDTH:
+                del waiting[position]
+                break
+        waiting.append((None, waiting_rating(depth + count)))
+    return (time.perf_counter() - start) / len(targets)
+
+
+def main():
+    depths = [int(arg) for arg in sys.argv[1:]] or DEFAULT_DEPTHS
+    print("{:>10} {:>14} {:>14}".format("depth", "heaps_us", "scan_us"))
+    for depth in depths:
+        random.seed(depth)
+        # Later joins can only reach players still waiting
+        targets = random.sample(range(depth), min(JOINS, depth))
+        print("{:>10} {:>14.2f} {:>14.2f}".format(
+            depth, time_matchmaker(depth, targets) * 1000000, time_scan(depth, targets) * 1000000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+File: pathfinding_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Measures src/core/pathfinding.py on boards far larger than 14x12.
+
+Scatters units and HARM tiles over the board, then times a
+fresh search for every unit, the same searches again from the
+cache, and moving units one at a time and searching for every
+unit after each move. A move only drops the cached searches
+that could reach the tiles it changed, so most of those come
+from the cache too.
+
+Usage: python -m benchmarks.pathfinding_bench
+
+"""
+
+import random
+import time
+
+from src.constants import GRID_COLUMNS, GRID_ROWS, HARM
+from src.core.grid import Grid
+
+# (columns, rows, units)
+BOARDS = [
+    (GRID_COLUMNS, GRID_ROWS, 6),
+    (100, 100, 200),
+    (1000, 1000, 1000),
+]
+
+# Share of tiles that are HARM
+HARM_SHARE = 0.1
+
+SPEED = 3
+MOVES = 200
+
+
+def make_grid(cols, rows, unit_count):
+    grid = Grid(cols, rows, pathfinder=True)
+    for _ in range(int(cols * rows * HARM_SHARE)):
+        grid.set_tile_type(random.randrange(cols), random.randrange(rows), HARM)
+    units = random.sample(range(cols * rows), unit_count)
+    units = [(index % cols, index // cols) for index in units]
+    for col, row in units:
+        grid.set_unit_type(col, row, 1)
+    return grid, units
+
+
+def search_all(grid, units):
+    for col, row in units:
+        grid.pathfinder.get_reach(col, row, SPEED)
+
+
+def main():
+    print("{:>11} {:>6} {:>10} {:>10} {:>14} {:>10}".format(
+        "board", "units", "fresh_us", "cached_us", "after_move_us", "hit_rate"))
+    for cols, rows, unit_count in BOARDS:
+        random.seed(cols)
+        grid, units = make_grid(cols, rows, unit_count)
+        pathfinder = grid.pathfinder
+
+        start = time.perf_counter()
+        search_all(grid, units)
+        fresh = (time.perf_counter() - start) / len(units)
+        start = time.perf_counter()
+        search_all(grid, units)
+        cached = (time.perf_counter() - start) / len(units)
+
+        # Each move is followed by every unit asking for its range again
+        searches = 0
+        start = time.perf_counter()
+        for _ in range(MOVES):
+            index = random.randrange(len(units))
+            col, row = units[index]
+            reach = pathfinder.get_reach(col, row, SPEED)
+            target = random.choice(sorted(reach.tiles))
+            grid.set_unit_type(col, row, 0)
+            grid.set_unit_type(target[0], target[1], 1)
+            units[index] = target
+            before = len(pathfinder.cache)
+            search_all(grid, units)
+            searches += len(pathfinder.cache) - before
+        after_move = (time.perf_counter() - start) / (MOVES * len(units))
+        hit_rate = 1 - searches / (MOVES * len(units))
+
+        print("{:>11} {:>6} {:>10.1f} {:>10.2f} {:>14.2f} {:>9.1f}%".format(
+            "{}x{}".format(cols, rows), unit_count, fresh * 1000000, cached * 1000000,
+            after_move * 1000000, hit_rate * 100))
+
+
+if __name__ == "__main__":
+    main()
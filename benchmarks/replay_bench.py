@@ -0,0 +1,108 @@
+"""
+File: replay_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Measures the replay engine in src/replay.py.
+
+Writes an archive of random legal games played by Bot, then
+reports turns per second verifying it with one process and
+with a process pool, and how long random seeks take with
+and without checkpoints.
+
+Usage: python -m benchmarks.replay_bench [games]
+
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.bot import Bot
+from src.core.gamestate import GameState
+from src.replay import Replay, new_gamestate, verify_archive
+
+DEFAULT_GAMES = 2000
+
+# Games that haven't ended by then are recorded unfinished
+MAX_TURNS = 400
+
+SEEKS = 2000
+
+
+def play_game(seed):
+    """
+    Returns the turns and winner of one random game.
+    """
+    # The bot keeps its own copy, as it would against a server
+    gamestate = GameState()
+    bot = Bot(None, seed=seed)
+    bot.gamestate = new_gamestate()
+    turns = []
+    while not gamestate.game_is_over and len(turns) < MAX_TURNS:
+        bot.player_num = gamestate.get_turn()
+        turn = bot.choose_turn()
+        turn = {"move" : turn["move"], "attack" : turn["attack"]}
+        version = gamestate.version
+        gamestate.apply_turn(turn)
+        bot.apply_changes(gamestate.changes_since(version))
+        turns.append(turn)
+    return turns, gamestate.winner
+
+
+def write_archive(path, games):
+    with open(path, "w") as archive:
+        for seed in range(games):
+            turns, winner = play_game(seed)
+            archive.write(json.dumps({"id" : seed, "turns" : turns, "winner" : winner}) + "\n")
+
+
+def time_verify(path, processes):
+    start = time.perf_counter()
+    turns = 0
+    failures = 0
+    for result in verify_archive(path, processes):
+        turns += result["turns"]
+        failures += result["error"] is not None
+    return turns, failures, time.perf_counter() - start
+
+
+def time_seeks(turns, checkpoint_interval):
+    replay = Replay(turns, checkpoint_interval=checkpoint_interval)
+    # First pass lays down the checkpoints
+    replay.run()
+    random.seed(2)
+    targets = [random.randrange(len(turns) + 1) for _ in range(SEEKS)]
+    start = time.perf_counter()
+    for index in targets:
+        replay.seek(index)
+    return (time.perf_counter() - start) / SEEKS
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_GAMES
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "archive.jsonl")
+        start = time.perf_counter()
+        write_archive(path, games)
+        print("Recorded {} games in {:.1f}s".format(games, time.perf_counter() - start))
+
+        print("{:>10} {:>10} {:>10} {:>12}".format("processes", "turns", "failed", "turns/sec"))
+        for processes in sorted({1, os.cpu_count()}):
+            turns, failures, elapsed = time_verify(path, processes)
+            print("{:>10} {:>10} {:>10} {:>12.0f}".format(processes, turns, failures, turns / elapsed))
+
+        # Longest game in the archive
+        with open(path) as archive:
+            longest = max((json.loads(line)["turns"] for line in archive), key=len)
+    print("Seeking in a {} turn game:".format(len(longest)))
+    for interval in (16, 64, len(longest) + 1):
+        print("  checkpoint every {:>4} turns: {:>8.1f} us/seek".format(
+            interval, time_seeks(longest, interval) * 1000000))
+
+
+if __name__ == "__main__":
+    main()
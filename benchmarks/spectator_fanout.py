@@ -0,0 +1,227 @@
+"""
+File: spectator_fanout.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Measures what spectators cost the players of a match.
+
+First compares the cost of sending one GameState update to N
+spectators by encoding and encrypting it for each of them, as
+send_gamestate does for players, against sealing it once with
+the match's broadcast key.
+
+Then starts server.py, seats one match, attaches N spectators
+plus a few that never read, and plays turns as fast as the
+players can. Reports turn latency, updates each spectator got
+and how often a stalled spectator was skipped to the latest
+GameState. The spectators run in this process, so on a small
+machine their own work shows up in the turn latency too.
+
+Usage: python -m benchmarks.spectator_fanout [spectators ...]
+
+"""
+
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.match_capacity import raise_file_limit, play_round
+from src.asyncclient import HOST, free_port, seat_match
+from src.codec import encode_gamestate
+from src.encryption import Handshake, BroadcastCipher
+from src.core.gamestate import GameState
+from src.protocol import pack_frame, HEADER, MSG_TEXT, MSG_HELLO, MSG_BROADCAST, MSG_GAMESTATE, MSG_DELTA
+from src.protocol import HELLO_WATCH
+
+DEFAULT_SPECTATOR_COUNTS = [0, 100, 500]
+
+# Spectators that stop reading once they've joined
+STALLED_SPECTATORS = 4
+
+ROUNDS = 500
+
+
+class Watcher:
+    """
+    Minimal spectator speaking the server's watch protocol.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.session = None
+        self.broadcast = None
+        self.updates = 0
+        self.snapshots = 0
+
+    async def read_frame(self):
+        length, msg_type = HEADER.unpack(await self.reader.readexactly(HEADER.size))
+        return msg_type, await self.reader.readexactly(length)
+
+    async def watch(self, match_id):
+        handshake = Handshake()
+        self.writer.write(pack_frame(MSG_HELLO, handshake.public_key + bytes([0, HELLO_WATCH])))
+        _, public_key = await self.read_frame()
+        self.session = handshake.create_session(public_key, is_client=True)
+        text = "watch {}".format(match_id).encode()
+        self.writer.write(pack_frame(MSG_TEXT, self.session.encrypt(text)))
+        _, reply = await self.read_frame()
+        _, key, count = self.session.decrypt(reply).decode().split(" ")
+        self.broadcast = BroadcastCipher(bytes.fromhex(key), int(count))
+
+    async def read_updates(self):
+        try:
+            while True:
+                msg_type, payload = await self.read_frame()
+                if msg_type == MSG_BROADCAST:
+                    data = self.broadcast.decrypt(payload)
+                    self.updates += 1
+                    self.snapshots += data[0] != MSG_DELTA
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+
+def time_fanout(spectator_count, repeats=20):
+    """
+    Returns microseconds to send one update to every spectator,
+    encrypting per spectator and sealing once.
+    """
+    gamestate = GameState()
+    sessions = []
+    for _ in range(spectator_count):
+        client, server = Handshake(), Handshake()
+        sessions.append(server.create_session(client.public_key, is_client=False))
+
+    # Frames waiting to be written to each spectator
+    queues = [[] for _ in sessions]
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for session, queue in zip(sessions, queues):
+            queue.append(pack_frame(MSG_TEXT, session.encrypt(encode_gamestate(gamestate))))
+    per_recipient = (time.perf_counter() - start) / repeats
+
+    for queue in queues:
+        queue.clear()
+    cipher = BroadcastCipher()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        frame = pack_frame(MSG_BROADCAST, cipher.encrypt(bytes([MSG_GAMESTATE]) + encode_gamestate(gamestate)))
+        # Every spectator's queue gets the same bytes
+        for queue in queues:
+            queue.append(frame)
+    once = (time.perf_counter() - start) / repeats
+    return per_recipient * 1000000, once * 1000000
+
+
+def get_stats(stats_port):
+    with socket.create_connection((HOST, stats_port)) as sock:
+        data = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return json.loads(data)
+            data += chunk
+
+
+async def run_load(port, spectator_count):
+    players = await seat_match(port, push=True)
+
+    watchers = []
+    stalled = []
+    for index in range(spectator_count + STALLED_SPECTATORS):
+        sock = socket.socket()
+        if index >= spectator_count:
+            # Keep the kernel from soaking up what the stalled ones don't read
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        sock.connect((HOST, port))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        watcher = Watcher(reader, writer)
+        await watcher.watch(1)
+        if index < spectator_count:
+            watchers.append(watcher)
+        else:
+            writer.transport.pause_reading()
+            stalled.append(watcher)
+    tasks = [asyncio.ensure_future(watcher.read_updates()) for watcher in watchers]
+
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        await play_round(players, latencies)
+    elapsed = time.perf_counter() - start
+    # Let the spectators catch up
+    await asyncio.sleep(0.5)
+
+    for player in players:
+        await player.command("quit")
+        player.writer.close()
+    for watcher in watchers + stalled:
+        watcher.writer.close()
+    for task in tasks:
+        task.cancel()
+
+    latencies.sort()
+    return {
+        "spectators": spectator_count,
+        "turns_per_sec": len(latencies) / elapsed,
+        "turn_p50_ms": statistics.median(latencies) * 1000,
+        "turn_p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "updates_per_spectator": statistics.mean(w.updates for w in watchers) if watchers else 0,
+    }
+
+
+def benchmark(spectator_count):
+    raise_file_limit(spectator_count + STALLED_SPECTATORS + 64)
+    port = free_port()
+    stats_port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "server.py", HOST, str(port), "--stats-port", str(stats_port)],
+        stdout=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection((HOST, port)).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        time.sleep(0.1)
+        result = asyncio.run(run_load(port, spectator_count))
+        stats = get_stats(stats_port)
+        result["skips"] = stats["counters"].get("spectator_skips", 0)
+        result["broadcast_p50_us"] = stats["timings_us"].get("broadcast", {}).get("p50", 0)
+        return result
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SPECTATOR_COUNTS
+
+    print("Sending one GameState update:")
+    print("{:>11} {:>16} {:>14}".format("spectators", "per_spectator_us", "seal_once_us"))
+    for count in counts:
+        if count:
+            per_recipient, once = time_fanout(count)
+            print("{:>11} {:>16.0f} {:>14.0f}".format(count, per_recipient, once))
+
+    print("Playing {} turns with {} stalled spectators:".format(2 * ROUNDS, STALLED_SPECTATORS))
+    print("{:>11} {:>10} {:>10} {:>10} {:>12} {:>8} {:>14}".format(
+        "spectators", "turns/s", "p50_ms", "p99_ms", "updates/spec", "skips", "broadcast_us"))
+    for count in counts:
+        try:
+            result = benchmark(count)
+        except OSError as e:
+            print("{:>11} failed: {}".format(count, e))
+            continue
+        print("{spectators:>11} {turns_per_sec:>10.0f} {turn_p50_ms:>10.2f} {turn_p99_ms:>10.2f} "
+              "{updates_per_spectator:>12.1f} {skips:>8} {broadcast_p50_us:>14}".format(**result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+File: unittable_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Compares a Unit object per unit with the arrays of
+src/core/unittable.py for armies far larger than three a side.
+
+Measures the memory each takes per unit, then times one turn of
+every unit moving one tile and attacking a random enemy, done a
+unit at a time on the objects and in bulk on the table.
+
+Usage: python -m benchmarks.unittable_bench
+
+"""
+
+import random
+import timeit
+import tracemalloc
+
+import numpy
+
+from src.core.unit import Unit
+from src.core.unittable import UnitTable
+
+# Units per player
+ARMY_SIZES = [3, 100, 1000, 10000]
+
+
+def measure(make):
+    """
+    Returns what make() returns and the bytes it allocated.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    made = make()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return made, size
+
+
+def make_units(army_size):
+    units = {}
+    for unit_type in range(1, 2 * army_size + 1):
+        unit = Unit(unit_type, army_size)
+        unit.pos = [unit_type % 100, unit_type // 100]
+        units[unit_type] = unit
+    return units
+
+
+def make_table(army_size):
+    table = UnitTable(army_size)
+    unit_types = numpy.arange(1, 2 * army_size + 1)
+    table.move(unit_types, unit_types % 100, unit_types // 100)
+    return table
+
+
+def turn_with_units(units, targets):
+    # Units killed this turn still attack, as every unit acts at once
+    attackers = [(units[unit_type], units[target_type]) for unit_type, target_type in targets
+                 if units[unit_type].is_alive]
+    for unit, target in attackers:
+        unit.pos = [unit.pos[0] + 1, unit.pos[1]]
+        unit.attack(target)
+
+
+def turn_with_table(table, unit_types, target_types):
+    alive = table.health[unit_types] > 0
+    living = unit_types[alive]
+    table.move(living, table.col[living] + 1, table.row[living])
+    table.damage(target_types[alive], table.attack_power[living])
+
+
+def main():
+    print("{:>6} {:>12} {:>12} {:>12} {:>12}".format(
+        "army", "unit_bytes", "table_bytes", "objects_us", "table_us"))
+    for army_size in ARMY_SIZES:
+        random.seed(army_size)
+        units, unit_bytes = measure(lambda: make_units(army_size))
+        table, table_bytes = measure(lambda: make_table(army_size))
+        unit_count = 2 * army_size
+
+        # Every unit attacks a random enemy
+        targets = [(unit_type, random.randrange(1, army_size + 1) + (army_size if unit_type <= army_size else 0))
+                   for unit_type in range(1, unit_count + 1)]
+        unit_types = numpy.array([unit_type for unit_type, _ in targets])
+        target_types = numpy.array([target_type for _, target_type in targets])
+
+        # Both start from full health, so one turn of each should match
+        check_units, check_table = make_units(army_size), make_table(army_size)
+        turn_with_units(check_units, targets)
+        turn_with_table(check_table, unit_types, target_types)
+        assert all(unit.health == check_table.health[unit_type] and unit.pos[0] == check_table.col[unit_type]
+                   for unit_type, unit in check_units.items() if unit.is_alive)
+
+        # Later turns hit dead units too, which both skip
+        objects = min(timeit.repeat(lambda: turn_with_units(units, targets), number=1, repeat=5))
+        arrays = min(timeit.repeat(lambda: turn_with_table(table, unit_types, target_types), number=1, repeat=5))
+        print("{:>6} {:>12.0f} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+            army_size, unit_bytes / unit_count, table_bytes / unit_count, objects * 1000000, arrays * 1000000))
+
+
+if __name__ == "__main__":
+    main()
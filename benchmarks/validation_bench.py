@@ -0,0 +1,135 @@
+"""
+File: validation_bench.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Measures how many turns per second TurnValidator can check,
+against the same checks done from scratch: a new Pathfinder for
+every move and the sets Unit.get_range() returns for attacks.
+
+Turns are a mix of legal moves and attacks and every kind of
+illegal turn, taken from random positions on the 14x12 board.
+
+Usage: python -m benchmarks.validation_bench
+
+"""
+
+import random
+import time
+
+from src.constants import GRID_COLUMNS, GRID_ROWS, END_TURN
+from src.core.gamestate import GameState, starting_locations
+from src.core.pathfinding import Pathfinder
+from src.core.rules import TurnValidator
+from src.core.unit import Unit
+
+TURN_COUNT = 20000
+REPEATS = 5
+
+# Unit types owned by each player
+PLAYER_UNITS = TurnValidator(GRID_COLUMNS, GRID_ROWS).player_units
+
+
+def list_validate(gamestate, player_num, turn):
+    """
+    The rules of TurnValidator.validate(), checked from scratch.
+    """
+    if gamestate.game_is_over or not gamestate.turn[player_num]:
+        return "not your turn"
+    move = turn["move"]
+    attack = turn["attack"]
+    if move is None:
+        return "attack without a move" if attack else None
+
+    starting = starting_locations(GRID_COLUMNS, GRID_ROWS)
+    def position(unit_type):
+        return tuple(gamestate.unit_locations[unit_type] or starting[unit_type])
+
+    unit_type, col, row = move
+    if unit_type not in PLAYER_UNITS[player_num] or not gamestate.unit_health[unit_type]:
+        return "not your unit"
+    unit = Unit(unit_type)
+    unit.pos = position(unit_type)
+    pathfinder = Pathfinder(GRID_COLUMNS, GRID_ROWS)
+    for other_type, health in gamestate.unit_health.items():
+        if health:
+            pathfinder.set_blocked(*position(other_type), True)
+    if (col, row) not in pathfinder.search(unit.col(), unit.row(), unit.speed).tiles:
+        return "out of move range"
+    for other_type, health in gamestate.unit_health.items():
+        if health and position(other_type) == (col, row):
+            return "tile is occupied"
+    if attack is None:
+        return None
+
+    target_type, attack_power = attack
+    if target_type not in PLAYER_UNITS[3 - player_num] or not gamestate.unit_health[target_type]:
+        return "not an enemy unit"
+    if attack_power != unit.attack_power:
+        return "wrong attack power"
+    unit.pos = [col, row]
+    if position(target_type) not in unit.get_range("attack", GRID_COLUMNS, GRID_ROWS):
+        return "out of attack range"
+    return None
+
+
+def make_cases(count):
+    """
+    Returns (gamestate, player_num, turn) for count random turns.
+    """
+    cases = []
+    for _ in range(count):
+        gamestate = GameState()
+        tiles = random.sample([(col, row) for col in range(GRID_COLUMNS) for row in range(GRID_ROWS)], 6)
+        for unit_type, (col, row) in zip(range(1, 7), tiles):
+            gamestate.move_unit([unit_type, col, row])
+        player_num = random.choice((1, 2))
+        gamestate.turn = {1 : player_num == 1, 2 : player_num == 2}
+
+        # Mostly near the unit so a fair share of turns are legal
+        unit_type = random.choice(sorted(PLAYER_UNITS[player_num]))
+        col, row = gamestate.unit_locations[unit_type]
+        move = [unit_type,
+                min(max(col + random.randint(-3, 3), 0), GRID_COLUMNS - 1),
+                min(max(row + random.randint(-3, 3), 0), GRID_ROWS - 1)]
+        attack = None
+        if random.random() < 0.5:
+            target_type = random.choice(sorted(PLAYER_UNITS[3 - player_num]))
+            attack = [target_type, Unit(unit_type).attack_power]
+        cases.append((gamestate, player_num, {"move" : move, "attack" : attack, "phase" : END_TURN}))
+    return cases
+
+
+def time_validator(validate, cases):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for gamestate, player_num, turn in cases:
+            validate(gamestate, player_num, turn)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(cases) / best
+
+
+def main():
+    random.seed(1)
+    cases = make_cases(TURN_COUNT)
+    validator = TurnValidator(GRID_COLUMNS, GRID_ROWS)
+
+    # Both must agree on every turn
+    for gamestate, player_num, turn in cases:
+        if (validator.validate(gamestate, player_num, turn) is None) != \
+           (list_validate(gamestate, player_num, turn) is None):
+            raise AssertionError("Validators disagree on {}".format(turn))
+    legal = sum(validator.validate(*case) is None for case in cases)
+
+    table_rate = time_validator(validator.validate, cases)
+    list_rate = time_validator(list_validate, cases)
+    print("{} turns, {:.0f}% legal".format(len(cases), 100 * legal / len(cases)))
+    print("{:>12} {:>14} {:>10}".format("validator", "turns/sec", "us/turn"))
+    print("{:>12} {:>14.0f} {:>10.2f}".format("cached", table_rate, 1000000 / table_rate))
+    print("{:>12} {:>14.0f} {:>10.2f}".format("scratch", list_rate, 1000000 / list_rate))
+
+
+if __name__ == "__main__":
+    main()
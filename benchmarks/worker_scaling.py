@@ -0,0 +1,103 @@
+"""
+File: worker_scaling.py
+Programmers: Fernando Rodriguez, Charles Davis
+
+
+Measures how turn throughput grows with server.py --workers N.
+
+For each worker count, starts the server, seats matches from
+several client processes (one process at a time, so each
+process knows which two of its connections are paired) and
+then has every process play turns as fast as it can.
+
+Usage: python -m benchmarks.worker_scaling [workers ...]
+
+"""
+
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks.match_capacity import raise_file_limit, play_round
+from src.asyncclient import HOST, free_port, seat_match
+
+MATCHES_PER_CLIENT = 100
+ROUNDS = 20
+
+
+def client_process(port, seat_lock, start_barrier, results):
+    async def run():
+        with seat_lock:
+            matches = [await seat_match(port, push=True) for _ in range(MATCHES_PER_CLIENT)]
+        await asyncio.get_running_loop().run_in_executor(None, start_barrier.wait)
+
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            await asyncio.gather(*(play_round(players, latencies) for players in matches))
+        elapsed = time.perf_counter() - start
+
+        for players in matches:
+            for player in players:
+                await player.command("quit")
+                player.writer.close()
+        return len(latencies), elapsed
+
+    results.put(asyncio.run(run()))
+
+
+def benchmark(worker_count, client_count):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "server.py", HOST, str(port), "--workers", str(worker_count)],
+        stdout=subprocess.DEVNULL)
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection((HOST, port)).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        time.sleep(0.2)
+
+        seat_lock = multiprocessing.Lock()
+        start_barrier = multiprocessing.Barrier(client_count)
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=client_process,
+                                           args=(port, seat_lock, start_barrier, results))
+                   for _ in range(client_count)]
+        for client in clients:
+            client.start()
+        outcomes = [results.get() for _ in clients]
+        for client in clients:
+            client.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    turns = sum(turns for turns, _ in outcomes)
+    elapsed = max(elapsed for _, elapsed in outcomes)
+    return turns / elapsed
+
+
+def main():
+    cores = os.cpu_count() or 1
+    counts = [int(arg) for arg in sys.argv[1:]] or sorted({1, 2, 4, cores})
+    client_count = max(2, cores)
+    raise_file_limit(2 * client_count * MATCHES_PER_CLIENT + 64)
+
+    print("cores: {}, client processes: {}".format(cores, client_count))
+    print("{:>8} {:>10} {:>10}".format("workers", "turns/s", "speedup"))
+    baseline = None
+    for worker_count in counts:
+        rate = benchmark(worker_count, client_count)
+        baseline = baseline or rate
+        print("{:>8} {:>10.0f} {:>10.2f}".format(worker_count, rate, rate / baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -91,6 +91,10 @@ def get_connection():
 
         if network is not None:
             try:
+                # connect() returns once an opponent is found
+                T.delete(1.0, tkinter.END)
+                T.insert(tkinter.END, "Waiting for an opponent...")
+                root.update()
                 network.connect()
                 connection.append(network)
                 root.destroy()
@@ -0,0 +1,54 @@
+"""
+File: replay.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Re-verifies an archive of recorded matches against the
+current rules, spread over a pool of processes.
+
+Prints every match that no longer replays cleanly, then a
+summary line. Exits with status 1 if any match failed.
+
+"""
+
+import sys
+import time
+
+from src.replay import verify_archive
+
+
+def verify():
+    """
+    Replay the archive named on the command line.
+    """
+    ARCHIVE = sys.argv[1]
+
+    # Number of processes to replay with, one per CPU by default
+    PROCESSES = None
+    if "--processes" in sys.argv:
+        PROCESSES = int(sys.argv[sys.argv.index("--processes") + 1])
+
+    matches = 0
+    turns = 0
+    failures = 0
+    start = time.perf_counter()
+    for result in verify_archive(ARCHIVE, PROCESSES):
+        matches += 1
+        turns += result["turns"]
+        if result["error"] is not None:
+            failures += 1
+            print("[Error]: Match", result["id"], "-", result["error"])
+    elapsed = time.perf_counter() - start
+
+    print("{} matches, {} turns, {} failed in {:.2f}s ({:.0f} turns/sec)".format(
+        matches, turns, failures, elapsed, turns / elapsed if elapsed else 0))
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # Check for correct number of arguments
+    if len(sys.argv) < 2:
+        print("Usage: python replay.py <archive.jsonl> [--processes N]")
+        sys.exit()
+    verify()
@@ -3,208 +3,1411 @@ File: SERVER.py
 Programmers: Fernando Rodriguez, Charles Davis
 
 
-Controls the connection between two clients.
+Hosts any number of two-player matches in a single process.
+
+New players send "join" or "join <rating>" and wait in the
+matchmaking queue (see matchmaking.py) until they are paired.
+
+Every connection is handled by a coroutine on one asyncio
+event loop, so memory and thread count stay flat as the
+number of matches grows.
+
+Each match is run by its own task. Connections only read and
+check commands and queue them in the match's inbox; the match
+applies them one at a time, so it has a single writer and
+matches never wait on each other.
+
+With --workers N, N processes share the listening port through
+SO_REUSEPORT and pass accepted sockets between each other so both
+players of a match always land on the same worker.
+
+With --stats-port P, counters and latency histograms are served
+as JSON to anyone connecting to 127.0.0.1:P (P + i for worker i).
+
+A player whose connection drops keeps their seat for GRACE_PERIOD
+seconds and can resume with the session token sent when they were
+seated. Connections that send nothing for HEARTBEAT_TIMEOUT seconds
+are treated as dropped.
+
+Each client is held to COMMAND_RATE commands per second by a token
+bucket; past that the server stops reading from it for a while.
+Frames a client has no reason to send, or that are too large, are
+refused from their header before anything is buffered or decrypted.
+
+Any number of spectators can watch a live match. Each update is
+encoded and encrypted once and the same bytes are queued for every
+spectator; one that can't keep up skips to the latest GameState
+instead of holding up the players.
+
+With --army-size N, every match is played with N units a side
+instead of MAX_UNITS. Clients size their boards from the GameState.
+
+With --journal DIR, every change to a match is logged to DIR and
+matches are rebuilt from it when the server restarts. --fsync sets
+how often the log is flushed to disk (see journal.py). Workers keep
+separate journals, so restart with the same number of workers.
 
 """
 
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import secrets
+import signal
 import socket
 import sys
-import threading
-import pickle
+import time
 
-from src.encryption import encrypt, decrypt
-from src.gamestate import GameState
+from src.constants import GRID_COLUMNS, GRID_ROWS, MAX_UNITS
+from src.codec import encode_gamestate, encode_changes, decode_turn, CodecError, MAX_TURN_SIZE
+from src.encryption import Handshake, BroadcastCipher, EncryptionError, PUBLIC_KEY_SIZE, TAG_SIZE
+from src.core.gamestate import GameState, starting_locations
+from src.journal import Journal, SNAPSHOT_INTERVAL, FSYNC_ALWAYS, FSYNC_MODES
+from src.matchmaking import Matchmaker
+from src.ratelimit import TokenBucket
+from src.protocol import pack_frame, FrameReader, ProtocolError, HEADER, MSG_TEXT, MSG_GAMESTATE, MSG_EVENT
+from src.protocol import MSG_DELTA, MSG_TURN, MSG_HELLO, NOT_MODIFIED, INVALID_TURN, INVALID_SESSION
+from src.protocol import MSG_BROADCAST, INVALID_MATCH, HEARTBEAT_INTERVAL, HELLO_WATCH
+from src.protocol import EVENT_YOUR_TURN, EVENT_OPPONENT_READY, EVENT_GAME_OVER
+from src.core.rules import TurnValidator
+from src.stats import Stats
+from src.timers import TimerWheel
 
-# Number of clients connected
-client_count = 0
+# Pending connections the OS will queue for us
+SERVER_BACKLOG = 4096
 
-lock = threading.Lock()
+# Bytes read from a client stream at a time
+RECEIVE_SIZE = 65536
 
-# Global gamestate object holding
-# positions of player units and
-# other game information.
-gamestate = None
+# Stats are only served to this machine
+STATS_HOST = "127.0.0.1"
 
-def start_server():
+# Commands timed under their own name, others count as invalid
+COMMANDS = {"get", "sync", "turn", "request_turn", "start", "subscribe", "reset", "quit", "ping"}
+
+# Seconds a dropped player's seat is held for them
+GRACE_PERIOD = 60
+
+# Seconds of silence before a connection is treated as dropped
+HEARTBEAT_TIMEOUT = 3 * HEARTBEAT_INTERVAL
+
+# Seconds a new connection has to send its hello, and then "join"
+HELLO_TIMEOUT = 10
+
+# Seconds between looking for players who have waited long enough to pair with anyone
+SWEEP_INTERVAL = 1
+
+# Public key plus the route byte and HELLO_WATCH of a spectator
+MAX_HELLO_SIZE = PUBLIC_KEY_SIZE + 2
+
+# Updates queued for a spectator before it skips to the latest GameState
+SPECTATOR_QUEUE_SIZE = 32
+
+# Bytes a spectator's socket and stream may buffer before its queue fills
+SPECTATOR_SEND_BUFFER = 16384
+
+# Longest command a client sends, "resume <token> <version>"
+MAX_COMMAND_SIZE = 128
+
+# Frames a client may send before and after the handshake,
+# with the largest payload allowed for each
+HELLO_LIMITS = {MSG_HELLO : MAX_HELLO_SIZE}
+FRAME_LIMITS = {MSG_TEXT : MAX_COMMAND_SIZE + TAG_SIZE, MSG_TURN : MAX_TURN_SIZE + TAG_SIZE}
+
+# Commands a client may send per second on average, and in one burst
+COMMAND_RATE = 100
+COMMAND_BURST = 200
+
+# Invalid commands a client may send before it is disconnected
+MAX_INVALID_COMMANDS = 16
+
+# Bytes buffered for a client stream before backpressure kicks in
+READ_BUFFER_LIMIT = 16384
+WRITE_BUFFER_LIMIT = 65536
+
+# Bytes waiting for a client that has stopped reading before it's dropped
+MAX_WRITE_BUFFER = 1 << 20
+
+# Commands queued for a match before its players stop being read
+MATCH_INBOX_SIZE = 64
+
+
+class Match:
     """
-    Sets up server and begins listening for
-    client connections.
+    A single game between two connected players.
+
+    Players' commands wait in the inbox until the match's own
+    task applies them (see MatchServer.run_match).
     """
 
-    # Use the global variables
-    global gamestate
-    global client_count
+    def __init__(self, match_id, gamestate=None):
+        self.match_id = match_id
+        self.gamestate = gamestate or GameState()
 
-    # Create a socket object
-    SERVER = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # (Connection, player_num, command, argument, start) waiting to be applied
+        self.inbox = asyncio.Queue(MATCH_INBOX_SIZE)
+        self.task = None
 
-    # Use localhost and grab port from commandline arg
-    HOST = sys.argv[1]
-    PORT = int(sys.argv[2])
+        # Versions of the GameState already in the journal
+        self.journaled_version = self.gamestate.version
+        self.snapshot_version = self.gamestate.version
 
-    # Attempt bind to (host, port) pair
-    try:
-        SERVER.bind((HOST, PORT))
-    except socket.error:
-        print("Binding to " + HOST + ":" + str(PORT) + "failed.")
-        SERVER.close()
-        sys.exit()
+        # Number of players connected to this match
+        self.client_count = 0
 
-    # Start listeing for connections, max of two
-    SERVER.listen(2)
-    print("SERVER listening on " + HOST + ":" + str(PORT))
-
-    # Main server loop
-    while True:
-        if client_count < 2:
-            # Accept incoming connection
-            print("Waiting for client {}...".format(client_count + 1))
-            connection, address = SERVER.accept()
-            print("Established connection with " + address[0] + ":" + str(address[1]))
-
-            # Increment global client counter
-            client_count += 1
-            # Keep track of whose turn it is
-            player_num = 1
-
-            if client_count == 1:
-                # Create new gamestate object
-                gamestate = GameState()
-            else:
-                # One client already connected so
-                # this connection will be player 2
-                player_num = 2
+        # Connection of each player, keyed by player_num
+        self.connections = {}
 
-            # Create thread to handle client
-            t = threading.Thread(target=client_thread, args=(connection, player_num))
-            t.start()
+        # Session token of each seated player, connected or not
+        self.tokens = {}
 
-        if client_count < 2 and gamestate.ready():
-            # Game over, exit loop
-            break
+        # Release timers of players who dropped, keyed by player_num
+        self.seat_timers = {}
 
-    print("\nServer closing...")
-    SERVER.close()
-
-##############   Client Loop   #################
-
-def client_thread(connection, player_num):
-    """
-    Handles connection to clients.
-
-    Sends player_num to client and then
-    enters a loop where commands are 
-    received from client and processed.
-
-    Arguments:
-        connection {socket} -- Used to access network
-        player_num {int} -- Defines player order
-    """
-
-    # Access global variables
-    global client_count
-    global gamestate
-
-    # Send player's number to client
-    send_data(player_num, connection)
-
-    # Track number of active threads
-    thread_count = threading.active_count()
-    print("[Debug]: Active threads:", thread_count)
-
-    while True:
-        # Receive one kB of data from client
-        data = receive(connection)
-        if data:
-            if data == "get":
-                send_gamestate(gamestate, connection)
-            elif data == "turn":
-                send_data("ok", connection)
-                turn = receive_pickle(connection)
-                move = turn["move"]
-                attack = turn["attack"]
-                if move:
-                    gamestate.move_unit(move)
-                if attack:
-                    gamestate.attack_unit(attack)
-                    gamestate.determine_if_game_over()
-                # Change player turn
-                gamestate.change_turns()
-            elif data == "request_turn":
-                turn = gamestate.get_turn()
-                send_data(turn, connection)
-            elif data == "start":
-                send_data("ok", connection)
-                gamestate.set_ready(player_num)
-            elif data == "reset":
-                gamestate.reset()
-            elif data == "quit":
-                break  # Exit main client loop to close connection
+        # Watchers of the match and the key their updates are sealed with
+        self.spectators = set()
+        self.broadcast_cipher = BroadcastCipher()
+        # Version of the GameState spectators were last sent
+        self.broadcast_version = self.gamestate.version
+        # Latest sealed GameState, shared by every spectator that needs it
+        self.snapshot_frame = None
+        self.snapshot_frame_version = None
+        # Broadcast nonce just before the one snapshot_frame was sealed with
+        self.snapshot_frame_count = 0
+
+    def notify(self, player_num, event):
+        """
+        Push an event to a player if they subscribed to events.
+        """
+        connection = self.connections.get(player_num)
+        if connection is not None and connection.subscribed:
+            connection.send_event(event)
+
+    def notify_opponent(self, player_num, event):
+        self.notify(3 - player_num, event)
+
+    def seal(self, msg_type, data):
+        # Encrypt a spectator update once for all of them
+        payload = self.broadcast_cipher.encrypt(bytes([msg_type]) + data)
+        return pack_frame(MSG_BROADCAST, payload)
+
+    def get_snapshot_frame(self):
+        """
+        Returns the whole GameState sealed for spectators,
+        made at most once per version.
+        """
+        if self.snapshot_frame_version != self.gamestate.version:
+            self.snapshot_frame_count = self.broadcast_cipher.count
+            self.snapshot_frame = self.seal(MSG_GAMESTATE, encode_gamestate(self.gamestate))
+            self.snapshot_frame_version = self.gamestate.version
+        return self.snapshot_frame
+
+    def add_spectator(self, spectator):
+        """
+        Start sending a spectator updates, beginning with the whole GameState.
+
+        Returns:
+            str -- The broadcast key and nonce to send the spectator
+        """
+        if not self.spectators:
+            # Nobody was watching, so nothing was sent
+            self.broadcast_version = self.gamestate.version
+        self.spectators.add(spectator)
+        spectator.push(self.get_snapshot_frame(), self)
+        # Anything sealed before the snapshot is old news to them
+        return "{} {}".format(self.broadcast_cipher.key.hex(), self.snapshot_frame_count)
+
+    def broadcast(self):
+        """
+        Queue what changed since the last broadcast for every spectator.
+
+        Returns:
+            bool -- True if there was anything to send
+        """
+        gamestate = self.gamestate
+        if not self.spectators or gamestate.version == self.broadcast_version:
+            return False
+        changes = gamestate.changes_since(self.broadcast_version)
+        self.broadcast_version = gamestate.version
+        if changes is None:
+            frame = self.get_snapshot_frame()
+        else:
+            frame = self.seal(MSG_DELTA, encode_changes(changes))
+        for spectator in self.spectators:
+            spectator.push(frame, self)
+        return True
+
+    def close_spectators(self):
+        for spectator in self.spectators:
+            spectator.close()
+        self.spectators.clear()
+
+
+class Spectator:
+    """
+    A read-only watcher of a match.
+
+    Updates wait in a short queue while the spectator's socket
+    is backed up. A spectator that falls SPECTATOR_QUEUE_SIZE
+    updates behind drops them and gets the latest GameState
+    instead, so it can never hold up the match.
+    """
+
+    def __init__(self, connection, stats):
+        self.connection = connection
+        self.stats = stats
+
+        # Sealed frames waiting to be written
+        self.queue = collections.deque()
+        self.ready = asyncio.Event()
+        self.closed = False
+
+    def push(self, frame, match):
+        if len(self.queue) >= SPECTATOR_QUEUE_SIZE:
+            # The snapshot already includes this update
+            self.queue.clear()
+            frame = match.get_snapshot_frame()
+            self.stats.counters["spectator_skips"] += 1
+        self.queue.append(frame)
+        self.ready.set()
+
+    def close(self):
+        # Send what's queued, then hang up
+        self.closed = True
+        self.ready.set()
+
+    async def run(self):
+        """
+        Write queued updates as fast as the spectator reads them.
+        """
+        writer = self.connection.writer
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                if self.queue:
+                    self.connection.write(b"".join(self.queue))
+                    self.queue.clear()
+                if self.closed:
+                    writer.close()
+                    return
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+
+class MatchServer:
+    """
+    Pairs incoming connections into matches and
+    holds every live GameState keyed by match id.
+    """
+
+    def __init__(self, journal=None, army_size=MAX_UNITS):
+        self.matches = {}
+        self.match_ids = itertools.count(1)
+
+        # Units per player in every match
+        self.army_size = army_size
+
+        # Keeps matches on disk, if enabled
+        self.journal = journal
+
+        # Players waiting for an opponent
+        self.matchmaker = Matchmaker()
+
+        # Checks every turn before it's applied
+        self.validator = TurnValidator(GRID_COLUMNS, GRID_ROWS, army_size)
+
+        # Counters and histograms served on the stats port
+        self.stats = Stats()
+        self.connection_count = 0
+        self.spectator_count = 0
+
+        # (Match, player_num) of every seat, keyed by session token
+        self.sessions = {}
+
+        # First byte of every session token, names the worker holding the match
+        self.route = 0
+
+        # Heartbeat and grace period timeouts
+        self.timers = TimerWheel()
+        self.timer_task = None
+
+    async def join_queue(self, connection):
+        """
+        Wait in the matchmaking queue until paired with an opponent.
+
+        Returns:
+            (Match, int) -- The match joined and the player's number
+                            Will be None if the client left first
+        """
+        try:
+            data = await asyncio.wait_for(connection.receive(), HELLO_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None
+        command, _, argument = (data or "").partition(" ")
+        if command != "join":
+            return None
+        rating = None
+        if argument:
+            try:
+                rating = int(argument)
+            except ValueError:
+                print("[Error]: Invalid rating from client.")
+
+        seat = asyncio.get_running_loop().create_future()
+        ticket, opponent = self.matchmaker.add((connection, seat), rating)
+        if opponent is not None:
+            self.start_match(opponent, ticket)
+            return seat.result()
+
+        # Only pings are expected until an opponent turns up
+        receiving = asyncio.ensure_future(connection.receive())
+        try:
+            while not seat.done():
+                await asyncio.wait((seat, receiving), return_when=asyncio.FIRST_COMPLETED)
+                if seat.done():
+                    break
+                try:
+                    data = receiving.result()
+                except ConnectionError:
+                    data = None
+                if data is None or (data != "ping" and self.invalid_command(connection)):
+                    self.matchmaker.remove(ticket)
+                    self.stats.counters["queue_abandoned"] += 1
+                    return None
+                delay = connection.commands.take()
+                if delay:
+                    self.stats.counters["rate_limited"] += 1
+                    await asyncio.wait((seat,), timeout=delay)
+                    if seat.done():
+                        break
+                receiving = asyncio.ensure_future(connection.receive())
+        finally:
+            receiving.cancel()
+            # The stream can't be read again until it has let go
+            await asyncio.wait((receiving,))
+        return seat.result()
+
+    def start_match(self, first, second):
+        """
+        Seat two players from the queue in a new match,
+        the one who waited longer as player 1.
+
+        Arguments:
+            first {Ticket} -- Player 1's ticket
+            second {Ticket} -- Player 2's ticket
+        """
+        match = self.open_match(next(self.match_ids))
+        for player_num, ticket in ((1, first), (2, second)):
+            connection, seat = ticket.player
+            match.client_count += 1
+            match.connections[player_num] = connection
+            self.open_session(match, player_num)
+            self.stats.record_time("queue_wait", ticket.arrival)
+            seat.set_result((match, player_num))
+        self.stats.counters["matches_made"] += 1
+
+    def open_match(self, match_id, gamestate=None):
+        """
+        Create a match and start the task that runs it.
+
+        Returns:
+            Match -- The new match
+        """
+        match = Match(match_id, gamestate or GameState(self.army_size))
+        self.matches[match_id] = match
+        match.task = asyncio.ensure_future(self.run_match(match))
+        return match
+
+    async def run_match(self, match):
+        """
+        Apply the commands in a match's inbox in the order they arrived.
+
+        This is the only place a running match is changed, so one
+        player's command never sees the other's half applied. Commands
+        already waiting are applied together, and their changes are
+        journaled and broadcast once.
+        """
+        inbox = match.inbox
+        while True:
+            batch = [await inbox.get()]
+            while not inbox.empty():
+                batch.append(inbox.get_nowait())
+            self.stats.record_size("match_batch", len(batch))
+            for connection, player_num, command, argument, start in batch:
+                self.apply_command(match, connection, player_num, command, argument)
+                if start is not None:
+                    self.stats.record_time(command, start)
+            if self.matches.get(match.match_id) is not match:
+                # Every seat was given up
+                return
+            self.journal_match(match)
+            self.broadcast_match(match)
+
+    def apply_command(self, match, connection, player_num, command, argument):
+        """
+        Carry out one player's command and reply to it.
+
+        Arguments:
+            match {Match} -- The match the player is in
+            connection {Connection} -- The connection the command came on
+            player_num {int} -- The player's number
+            command {str} -- The command, or "leave" when the connection closed
+            argument -- Text after the command, the decoded turn for "turn",
+                        or whether the player quit for "leave"
+        """
+        gamestate = match.gamestate
+        if command == "get":
+            connection.send_gamestate(gamestate)
+        elif command == "sync":
+            connection.send_changes(gamestate, argument)
+        elif command == "turn":
+            error = self.validator.validate(gamestate, player_num, argument)
+            if error is not None:
+                self.stats.counters["invalid_turns"] += 1
+                connection.send_data(INVALID_TURN + " " + error)
             else:
-                print("Received invalid command from player", player_num)
+                connection.send_data("ok")
+                gamestate.apply_turn(argument)
+                match.notify(gamestate.get_turn(), EVENT_YOUR_TURN)
+                if gamestate.game_is_over:
+                    match.notify(1, EVENT_GAME_OVER)
+                    match.notify(2, EVENT_GAME_OVER)
+        elif command == "request_turn":
+            connection.send_data(gamestate.get_turn())
+        elif command == "start":
+            connection.send_data("ok")
+            gamestate.set_ready(player_num)
+            match.notify_opponent(player_num, EVENT_OPPONENT_READY)
+        elif command == "subscribe":
+            # Push events instead of waiting to be polled
+            connection.subscribed = True
+            connection.send_data("ok")
+        elif command == "reset":
+            gamestate.reset()
+        elif command == "leave":
+            self.leave_match(match, player_num, connection, argument)
+
+    def sweep_queue(self):
+        # Pair up players who have waited too long for a close rating
+        for first, second in self.matchmaker.sweep():
+            self.start_match(first, second)
+        self.timers.schedule(SWEEP_INTERVAL, self.sweep_queue)
+
+    def seat_abandoned(self):
+        """
+        Called when a client closes before it could be seated.
+        """
+
+    def leave_match(self, match, player_num, connection, quit):
+        """
+        Remove a player's connection from a match.
+
+        A player who quit gives up their seat. One who dropped
+        keeps it for GRACE_PERIOD seconds in case they resume.
+
+        Arguments:
+            match {Match} -- The match the player was in
+            player_num {int} -- The player's number
+            connection {Connection} -- The connection that closed
+            quit {bool} -- True if the player sent "quit"
+        """
+        if match.connections.get(player_num) is not connection:
+            # Already replaced by a resumed connection
+            return
+        print("Closing connection with player", player_num, "in match", match.match_id)
+        match.client_count -= 1
+        del match.connections[player_num]
+        if quit:
+            self.release_seat(match, player_num)
+        else:
+            match.seat_timers[player_num] = self.timers.schedule(
+                GRACE_PERIOD, self.release_seat, match, player_num)
+
+    def release_seat(self, match, player_num):
+        """
+        End a player's session, deleting the
+        match once no seats are held.
+        """
+        timer = match.seat_timers.pop(player_num, None)
+        if timer is not None:
+            timer.cancel()
+        token = match.tokens.pop(player_num, None)
+        self.sessions.pop(token, None)
+        if not match.tokens and match.match_id in self.matches:
+            # Delete gamestate object
+            del self.matches[match.match_id]
+            match.task.cancel()
+            match.close_spectators()
+            if self.journal is not None:
+                self.journal.remove(match.match_id)
+
+    def open_session(self, match, player_num):
+        """
+        Give a newly seated player a token to resume with.
+
+        Returns:
+            str -- The session token
+        """
+        token = "{:02x}{}".format(self.route, secrets.token_hex(16))
+        match.tokens[player_num] = token
+        self.sessions[token] = (match, player_num)
+        if self.journal is not None:
+            self.journal.save_sessions(match.match_id, match.tokens)
+        return token
+
+    async def resume_session(self, connection):
+        """
+        Put a reconnecting player back in their seat and
+        send them the changes they missed.
+
+        Returns:
+            (Match, int) -- The match rejoined and the player's number
+                            Will be None if the session isn't valid
+        """
+        data = await connection.receive()
+        parts = (data or "").split(" ")
+        seat = None
+        if len(parts) == 3 and parts[0] == "resume":
+            seat = self.sessions.get(parts[1])
+        if seat is None:
+            self.stats.counters["resume_failures"] += 1
+            connection.send_data(INVALID_SESSION)
+            return None
+
+        _, token, version = parts
+        match, player_num = seat
+        old_connection = match.connections.pop(player_num, None)
+        if old_connection is not None:
+            # The old connection is dead but hasn't timed out yet
+            match.client_count -= 1
+            old_connection.writer.transport.abort()
+        timer = match.seat_timers.pop(player_num, None)
+        if timer is not None:
+            timer.cancel()
+
+        match.client_count += 1
+        match.connections[player_num] = connection
+        self.stats.counters["resumes"] += 1
+        connection.send_data("{} {}".format(player_num, token))
+        connection.send_changes(match.gamestate, version)
+        return match, player_num
+
+    async def watch_match(self, connection):
+        """
+        Stream a match to a spectator until they leave
+        or the match ends.
+        """
+        data = await connection.receive()
+        command, _, argument = (data or "").partition(" ")
+        match = None
+        if command == "watch" and argument.isdigit():
+            match = self.matches.get(int(argument))
+        if match is None:
+            connection.send_data(INVALID_MATCH)
+            return
+
+        # Keep what a stalled spectator holds onto small,
+        # so it soon falls back to its queue
+        sock = connection.writer.get_extra_info("socket")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SPECTATOR_SEND_BUFFER)
+        connection.writer.transport.set_write_buffer_limits(SPECTATOR_SEND_BUFFER)
+
+        spectator = Spectator(connection, self.stats)
+        connection.send_data("ok " + match.add_spectator(spectator))
+        task = asyncio.ensure_future(spectator.run())
+        self.spectator_count += 1
+        self.stats.counters["spectators"] += 1
+        self.watch_connection(connection)
+        try:
+            # Spectators only send heartbeats and "quit"
+            while True:
+                await self.throttle(connection)
+                data = await connection.receive()
+                if data is None or data == "quit":
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.spectator_count -= 1
+            match.spectators.discard(spectator)
+            task.cancel()
+
+    def broadcast_match(self, match):
+        start = time.perf_counter()
+        if match.broadcast():
+            self.stats.record_time("broadcast", start)
+
+    def watch_connection(self, connection):
+        """
+        Drop the connection if it goes quiet for HEARTBEAT_TIMEOUT.
+        """
+        if connection.writer.is_closing():
+            return
+        idle = time.monotonic() - connection.last_seen
+        if idle < HEARTBEAT_TIMEOUT:
+            self.timers.schedule(HEARTBEAT_TIMEOUT - idle, self.watch_connection, connection)
+            return
+        print("[Error]: No heartbeat from client, closing connection.")
+        self.stats.counters["heartbeat_timeouts"] += 1
+        connection.writer.transport.abort()
+
+    def start_timers(self):
+        if self.timer_task is None:
+            self.timer_task = asyncio.ensure_future(self.timers.run())
+            self.sweep_queue()
+
+    def recover_matches(self):
+        """
+        Rebuild the matches in the journal and start writing to it.
+        """
+        if self.journal is None:
+            return
+        recovered = self.journal.recover(self.army_size)
+        for match_id, (gamestate, tokens) in recovered.items():
+            if not tokens or gamestate.army_size != self.army_size:
+                # Nobody could ever resume it, or it's from a server with other armies
+                self.journal.remove(match_id)
+                continue
+            match = self.open_match(match_id, gamestate)
+            self.stats.counters["matches_recovered"] += 1
+            # Players get the usual grace period to come back
+            for player_num, token in tokens.items():
+                match.tokens[player_num] = token
+                self.sessions[token] = (match, player_num)
+                match.seat_timers[player_num] = self.timers.schedule(
+                    GRACE_PERIOD, self.release_seat, match, player_num)
+        if recovered:
+            self.match_ids = itertools.count(max(recovered) + 1)
+        self.journal.start()
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+
+    def journal_match(self, match):
+        """
+        Queue the match's latest changes for the journal,
+        with a snapshot every SNAPSHOT_INTERVAL changes.
+        """
+        gamestate = match.gamestate
+        if self.journal is None or gamestate.version == match.journaled_version:
+            return
+
+        start = time.perf_counter()
+        changes = gamestate.changes_since(match.journaled_version)
+        if changes is None or gamestate.version - match.snapshot_version >= SNAPSHOT_INTERVAL:
+            self.journal.snapshot(match.match_id, gamestate)
+            match.snapshot_version = gamestate.version
         else:
-            # Data wasn't received; exit loop
-            break
-
-    # Close connection
-    print("Closing connection with player", player_num)
-    client_count -= 1
-    if client_count == 0:
-        # Delete gamestate object
-        gamestate = None
-        print("All clients disconnected.")
-    connection.close()
+            self.journal.append(match.match_id, changes)
+        match.journaled_version = gamestate.version
+        self.stats.record_time("journal", start)
+
+    async def handle_client(self, reader, writer):
+        """
+        Handles connection to one client.
+
+        Sends player_num to client and then
+        enters a loop where commands are
+        received from client and processed.
+
+        Arguments:
+            reader {asyncio.StreamReader} -- Incoming data from client
+            writer {asyncio.StreamWriter} -- Outgoing data to client
+        """
+        address = writer.get_extra_info("peername")
+        print("Established connection with " + str(address[0]) + ":" + str(address[1]))
+
+        connection = Connection(reader, writer, self.stats)
+        self.connection_count += 1
+        self.stats.counters["connections"] += 1
+        try:
+            is_connected = await asyncio.wait_for(connection.handshake(), HELLO_TIMEOUT)
+        except asyncio.TimeoutError:
+            is_connected = False
+        if not is_connected:
+            print("[Error]: Handshake with " + str(address[0]) + " failed.")
+            self.stats.counters["handshake_failures"] += 1
+            if not connection.routed:
+                self.seat_abandoned()
+            self.close_connection(connection)
+            return
+
+        if connection.watching:
+            try:
+                await self.watch_match(connection)
+            except ConnectionError:
+                pass
+            finally:
+                self.close_connection(connection)
+            return
+
+        if connection.resuming:
+            try:
+                seat = await self.resume_session(connection)
+            except ConnectionError:
+                seat = None
+            if seat is None:
+                self.close_connection(connection)
+                return
+            match, player_num = seat
+        else:
+            try:
+                seat = await self.join_queue(connection)
+            except ConnectionError:
+                seat = None
+            if seat is None:
+                self.seat_abandoned()
+                self.close_connection(connection)
+                return
+            match, player_num = seat
+            # Send player's number and session token to client
+            connection.send_data("{} {}".format(player_num, match.tokens[player_num]))
+        self.watch_connection(connection)
+
+        # Commands are only read and checked here, the match applies them
+        quit = False
+        try:
+            while True:
+                await self.throttle(connection)
+                data = await connection.receive()
+                if data is None:
+                    # Data wasn't received; exit loop
+                    break
+                start = time.perf_counter()
+                command, _, argument = data.partition(" ")
+                if command == "turn":
+                    argument = await connection.receive_turn()
+                    if argument is None:
+                        break
+                elif command == "ping":
+                    # Heartbeat, nothing to reply
+                    self.stats.record_time(command, start)
+                    continue
+                elif command == "quit":
+                    quit = True
+                    break  # Exit main client loop to close connection
+                elif command not in COMMANDS:
+                    if self.invalid_command(connection):
+                        break
+                    if connection.invalid_commands == 1:
+                        print("Received invalid command from player", player_num)
+                    self.stats.record_time("invalid_command", start)
+                    continue
+                await match.inbox.put((connection, player_num, command, argument, start))
+                await writer.drain()
+        except ConnectionError as e:
+            print(str(e))
+        finally:
+            if self.matches.get(match.match_id) is match:
+                # Behind any commands still waiting
+                await match.inbox.put((connection, player_num, "leave", quit, None))
+            self.close_connection(connection)
+
+    async def throttle(self, connection):
+        # Over its command rate, the client's commands wait in its socket
+        delay = connection.commands.take()
+        if delay:
+            self.stats.counters["rate_limited"] += 1
+            await asyncio.sleep(delay)
+
+    def invalid_command(self, connection):
+        """
+        Count an invalid command from a client.
+
+        Returns:
+            bool -- True if the client has sent too many and should be dropped
+        """
+        connection.invalid_commands += 1
+        self.stats.counters["invalid_commands"] += 1
+        return connection.invalid_commands > MAX_INVALID_COMMANDS
+
+    def close_connection(self, connection):
+        """
+        Close a client's stream and record what it sent and received.
+        """
+        self.connection_count -= 1
+        self.stats.record_size("connection_bytes_in", connection.bytes_in)
+        self.stats.record_size("connection_bytes_out", connection.bytes_out)
+        connection.writer.close()
+
+    def get_stats(self):
+        """
+        Returns the server's stats along with its current load.
+        """
+        return self.stats.snapshot({
+            "matches" : len(self.matches),
+            "connections" : self.connection_count,
+            "sessions" : len(self.sessions),
+            "spectators" : self.spectator_count,
+            "queue_depth" : self.matchmaker.depth,
+            "queue_oldest_wait_sec" : round(self.matchmaker.oldest_wait(), 1),
+        })
+
+    async def handle_stats(self, reader, writer):
+        # Answer every stats connection with one JSON document
+        writer.write(json.dumps(self.get_stats()).encode() + b"\n")
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def serve_stats(self, port):
+        """
+        Start serving stats on the local stats port.
+        """
+        try:
+            self.stats_server = await asyncio.start_server(self.handle_stats, STATS_HOST, port)
+        except OSError:
+            print("[Error]: Binding stats to " + STATS_HOST + ":" + str(port) + " failed.")
+            return
+        print("Stats on " + STATS_HOST + ":" + str(port))
+
+    async def serve(self, host, port, stats_port=None):
+        """
+        Sets up server and begins listening for
+        client connections.
+        """
+        if stats_port is not None:
+            await self.serve_stats(stats_port)
+        try:
+            server = await asyncio.start_server(
+                self.handle_client, host, port, backlog=SERVER_BACKLOG, limit=READ_BUFFER_LIMIT)
+        except OSError:
+            print("Binding to " + host + ":" + str(port) + " failed.")
+            sys.exit()
+
+        self.start_timers()
+        self.recover_matches()
+        print("SERVER listening on " + host + ":" + str(port))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close_journal()
 
 ################################################
 
-def send_data(data, connection):
-    try:
-        encrypted_data = encrypt(str(data).encode())
-        connection.sendall(encrypted_data)
-    except socket.error as e:
-        print("[Error]: Socket cannot be used to send data.")
-        print(str(e))
-    except TypeError:
-        print("[Error]: Data cannot be converted to string to be sent.")
-
-def send_gamestate(gamestate, connection):
-    # Send gamestate as serialized pickle object
-    gamestate_pickle = pickle.dumps(gamestate)
-    try:
-        encrypted_data = encrypt(gamestate_pickle)
-        connection.sendall(encrypted_data)
-    except socket.error as e:
-        print(str(e))
+class Connection:
+    """
+    Sends and receives framed, encrypted
+    messages over one client's stream.
+    """
+
+    def __init__(self, reader, writer, stats):
+        self.reader = reader
+        self.writer = writer
+        self.stats = stats
+
+        # Bytes on the wire in each direction
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+        # Set from the hello, True if the client is resuming a session
+        # or watching a match; both are routed by the client, not paired
+        self.routed = False
+        self.resuming = False
+        self.watching = False
+
+        # When the client last sent anything
+        self.last_seen = time.monotonic()
+
+        # Holds received bytes until a whole frame arrives
+        self.frames = FrameReader(HELLO_LIMITS)
+
+        # Limits how fast the client's commands are handled
+        self.commands = TokenBucket(COMMAND_RATE, COMMAND_BURST)
+        self.invalid_commands = 0
+        writer.transport.set_write_buffer_limits(WRITE_BUFFER_LIMIT)
+
+        # Client wants events pushed to it
+        self.subscribed = False
+
+        # Cipher agreed on with the client in handshake()
+        self.session = None
+
+    async def handshake(self):
+        """
+        Answer the client's handshake and start the session.
+
+        Returns:
+            bool -- True if the session was set up
+        """
+        try:
+            frame = await self.read_frame()
+            if frame is None or frame[0] != MSG_HELLO or len(frame[1]) > MAX_HELLO_SIZE:
+                return False
+            # After the key comes the route byte of a resuming client,
+            # or the route byte and HELLO_WATCH of a spectator
+            extra = frame[1][PUBLIC_KEY_SIZE:]
+            self.routed = len(extra) > 0
+            self.resuming = len(extra) == 1
+            self.watching = len(extra) == 2 and extra[1] == HELLO_WATCH
+            if len(extra) == 2 and not self.watching:
+                return False
+            handshake = Handshake()
+            self.session = handshake.create_session(frame[1][:PUBLIC_KEY_SIZE], is_client=False)
+        except (ConnectionError, ProtocolError, EncryptionError):
+            return False
+
+        self.frames.limits = FRAME_LIMITS
+        self.write(pack_frame(MSG_HELLO, handshake.public_key))
+        return True
+
+    def send_data(self, data):
+        try:
+            self.send_frame(MSG_TEXT, str(data).encode())
+        except TypeError:
+            print("[Error]: Data cannot be converted to string to be sent.")
+
+    def send_gamestate(self, gamestate):
+        start = time.perf_counter()
+        data = encode_gamestate(gamestate)
+        self.stats.record_time("encode_gamestate", start)
+        self.send_frame(MSG_GAMESTATE, data)
+
+    def send_changes(self, gamestate, version):
+        """
+        Send the changes made since the client's version.
+
+        Arguments:
+            gamestate {GameState} -- The match's state
+            version {str} -- Last version the client received
+        """
+        try:
+            changes = gamestate.changes_since(int(version))
+        except ValueError:
+            changes = None
+
+        if changes is None:
+            # Client is too far behind; send everything
+            self.send_gamestate(gamestate)
+        elif not changes:
+            self.send_data(NOT_MODIFIED)
+        else:
+            start = time.perf_counter()
+            data = encode_changes(changes)
+            self.stats.record_time("encode_changes", start)
+            self.send_frame(MSG_DELTA, data)
+
+    def send_event(self, event):
+        self.send_frame(MSG_EVENT, event.encode())
+
+    def send_frame(self, msg_type, data):
+        start = time.perf_counter()
+        encrypted_data = self.session.encrypt(data)
+        self.stats.record_time("encrypt", start)
+        self.write(pack_frame(msg_type, encrypted_data))
+
+    def write(self, frame):
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            # The client stopped reading; don't hold its backlog forever
+            print("[Error]: Client isn't reading, closing connection.")
+            self.stats.counters["slow_client_drops"] += 1
+            transport.abort()
+            return
+        self.bytes_out += len(frame)
+        self.stats.counters["bytes_out"] += len(frame)
+        self.writer.write(frame)
+
+    async def read_frame(self):
+        """
+        Read from the stream until a whole frame is buffered.
+
+        Returns:
+            (int, bytes) -- The msg_type and raw payload
+                            Will be None if the connection closed
+        """
+        frame = self.frames.next_frame()
+        while frame is None:
+            data = await self.reader.read(RECEIVE_SIZE)
+            if not data:
+                return None
+            self.bytes_in += len(data)
+            self.stats.counters["bytes_in"] += len(data)
+            self.last_seen = time.monotonic()
+            self.frames.feed(data)
+            frame = self.frames.next_frame()
+        return frame
+
+    async def receive_frame(self):
+        """
+        Read the next frame and decrypt it.
+
+        Returns:
+            (int, bytes) -- The msg_type and decrypted payload
+                            Will be None if the connection closed
+        """
+        try:
+            frame = await self.read_frame()
+            if frame is None:
+                return None
+            msg_type, payload = frame
+            start = time.perf_counter()
+            data = self.session.decrypt(payload)
+            self.stats.record_time("decrypt", start)
+            return msg_type, data
+        except (ProtocolError, EncryptionError) as e:
+            print("[Error]:", str(e))
+            self.stats.counters["rejected_frames"] += 1
+            return None
+
+    async def receive(self):
+        # Receive command from client
+        frame = await self.receive_frame()
+        if frame is None:
+            return None
+        msg_type, data = frame
+        if msg_type != MSG_TEXT:
+            return ""
+        try:
+            return data.decode()
+        except UnicodeDecodeError as e:
+            print("[Error]: Unable to decode message from client.")
+            print(str(e))
+            return ""
+
+    async def receive_turn(self):
+        # Receive the move and attack a player made
+        frame = await self.receive_frame()
+        if frame is None:
+            return None
+        msg_type, data = frame
+        if msg_type != MSG_TURN:
+            print("[Error]: Expected turn from client.")
+            return None
+        try:
+            start = time.perf_counter()
+            turn = decode_turn(data)
+            self.stats.record_time("decode_turn", start)
+            return turn
+        except CodecError as e:
+            print("[Error]: Unable to decode turn from client.")
+            print(str(e))
+            return None
+
+
+class WorkerMatchServer(MatchServer):
+    """
+    MatchServer that keeps its worker's entry in the shared
+    unpaired table up to date: the number of connections routed
+    to the worker that aren't in a full match yet.
+    """
 
-def receive(connection):
-    # Receive data from client
+    def __init__(self, index, unpaired, journal=None, army_size=MAX_UNITS):
+        MatchServer.__init__(self, journal, army_size)
+        self.index = index
+        self.unpaired = unpaired
+        self.route = index
+
+    def update_unpaired(self, change):
+        with self.unpaired.get_lock():
+            self.unpaired[self.index] += change
+
+    def start_match(self, first, second):
+        MatchServer.start_match(self, first, second)
+        self.update_unpaired(-2)
+
+    def seat_abandoned(self):
+        self.update_unpaired(-1)
+
+
+class Worker:
+    """
+    One of several server processes sharing the listening port.
+
+    The kernel spreads new connections across workers at random,
+    so each accepted socket is routed: a worker with an odd number
+    of unpaired connections has a player waiting and gets the
+    next one; otherwise new matches go to workers in turn. A
+    resuming client goes back to the worker named by the first
+    byte of its session token. A worker that accepts a socket
+    owned by another passes the file descriptor to it over a
+    Unix socket.
+
+    Each worker has its own matchmaking queue, so players are
+    only paired with players routed to the same worker; rated
+    players may wait until the queue widens their band.
+    """
+
+    def __init__(self, index, worker_count, unpaired, next_worker, handoff_sockets, journal=None,
+                 army_size=MAX_UNITS):
+        """
+        Arguments:
+            index {int} -- This worker's number, 0 to worker_count - 1
+            worker_count {int} -- Number of worker processes
+            unpaired {multiprocessing.Array} -- Unpaired connections per worker
+            next_worker {multiprocessing.Value} -- Worker to start the next match on
+            handoff_sockets {[(socket, socket)]} -- Receiving and sending end for each worker
+            journal {Journal} -- This worker's journal, None if disabled
+            army_size {int} -- Units per player in every match
+        """
+        self.index = index
+        self.worker_count = worker_count
+        self.unpaired = unpaired
+        self.next_worker = next_worker
+        self.handoff_sockets = handoff_sockets
+        self.match_server = WorkerMatchServer(index, unpaired, journal, army_size)
+
+        # Keep client tasks referenced until they finish
+        self.tasks = set()
+
+    def route(self):
+        """
+        Returns the index of the worker hosting the next connection.
+        """
+        with self.unpaired.get_lock():
+            for index, count in enumerate(self.unpaired):
+                if count % 2:
+                    break
+            else:
+                index = self.next_worker.value
+                self.next_worker.value = (index + 1) % self.worker_count
+            self.unpaired[index] += 1
+        return index
+
+    async def peek_hello(self, connection):
+        """
+        Wait for the client's hello without taking it off the socket,
+        so whichever worker gets the socket can still read it.
+
+        Returns:
+            bytes -- The hello's payload
+                     Will be None if the client closed or timed out
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + HELLO_TIMEOUT
+        while True:
+            try:
+                data = connection.recv(HEADER.size + MAX_HELLO_SIZE, socket.MSG_PEEK)
+            except BlockingIOError:
+                data = None
+            except OSError:
+                return None
+            if data == b"":
+                return None
+            if data is not None and len(data) >= HEADER.size:
+                length, msg_type = HEADER.unpack_from(data)
+                if msg_type != MSG_HELLO or length > MAX_HELLO_SIZE:
+                    # Let the handshake turn it away
+                    return b""
+                if len(data) >= HEADER.size + length:
+                    return data[HEADER.size:HEADER.size + length]
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return None
+            if data:
+                # Part of the hello is in, the socket stays readable until the rest arrives
+                await asyncio.sleep(min(0.01, remaining))
+                continue
+            readable = loop.create_future()
+            loop.add_reader(connection.fileno(), lambda: readable.done() or readable.set_result(None))
+            try:
+                await asyncio.wait_for(readable, remaining)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                loop.remove_reader(connection.fileno())
+
+    async def route_connection(self, connection):
+        hello = await self.peek_hello(connection)
+        if hello is None:
+            connection.close()
+            return
+        if len(hello) > PUBLIC_KEY_SIZE:
+            # Resuming or watching, the match lives where the route byte says
+            owner = hello[PUBLIC_KEY_SIZE]
+            if owner >= self.worker_count:
+                owner = self.index
+        else:
+            owner = self.route()
+        if owner == self.index:
+            self.start_client(connection)
+        else:
+            self.hand_off(connection, owner)
+
+    def start_client(self, connection):
+        task = asyncio.ensure_future(self.open_client(connection))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def open_client(self, connection):
+        reader, writer = await asyncio.open_connection(sock=connection, limit=READ_BUFFER_LIMIT)
+        await self.match_server.handle_client(reader, writer)
+
+    def hand_off(self, connection, owner):
+        """
+        Pass an accepted socket to the worker that owns it.
+        """
+        try:
+            socket.send_fds(self.handoff_sockets[owner][1], [b"c"], [connection.fileno()])
+        except OSError as e:
+            # Keep the client here rather than drop it
+            print("[Error]: Handoff to worker", owner, "failed:", str(e))
+            self.start_client(connection)
+            return
+        connection.close()
+
+    def receive_handoff(self):
+        receiver = self.handoff_sockets[self.index][0]
+        try:
+            _, fds, _, _ = socket.recv_fds(receiver, 1, 1)
+        except BlockingIOError:
+            return
+        for fd in fds:
+            connection = socket.socket(fileno=fd)
+            connection.setblocking(False)
+            self.start_client(connection)
+
+    async def serve(self, host, port, stats_port=None):
+        if stats_port is not None:
+            await self.match_server.serve_stats(stats_port + self.index)
+
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            listener.bind((host, port))
+        except socket.error:
+            print("Binding to " + host + ":" + str(port) + " failed.")
+            listener.close()
+            sys.exit()
+        listener.listen(SERVER_BACKLOG)
+        listener.setblocking(False)
+
+        loop = asyncio.get_running_loop()
+        receiver = self.handoff_sockets[self.index][0]
+        receiver.setblocking(False)
+        loop.add_reader(receiver.fileno(), self.receive_handoff)
+
+        self.match_server.start_timers()
+        self.match_server.recover_matches()
+        print("Worker", self.index, "listening on " + host + ":" + str(port))
+        try:
+            while True:
+                connection, address = await loop.sock_accept(listener)
+                task = asyncio.ensure_future(self.route_connection(connection))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+        finally:
+            self.match_server.close_journal()
+
+
+def run_worker(index, worker_count, unpaired, next_worker, handoff_sockets, host, port, stats_port,
+               journal_directory, fsync, army_size):
+    # Each worker journals its own matches
+    journal = None
+    if journal_directory is not None:
+        journal = Journal(os.path.join(journal_directory, "worker-{}".format(index)), fsync)
+    worker = Worker(index, worker_count, unpaired, next_worker, handoff_sockets, journal, army_size)
     try:
-        decrypted_reply = decrypt(connection.recv(2048))
-        reply = decrypted_reply.decode()
-        return reply
-    except socket.error as e:
-        print(str(e))
-        return None
-    except UnicodeDecodeError as e:
-        print("[Error]: Unable to decode message from client.")
-        print(str(e))
-        return None
-
-def receive_pickle(connection):
-    # Receive pickle object
+        asyncio.run(worker.serve(host, port, stats_port))
+    except KeyboardInterrupt:
+        pass
+
+
+def start_workers(host, port, worker_count, stats_port=None, journal_directory=None, fsync=FSYNC_ALWAYS,
+                  army_size=MAX_UNITS):
+    """
+    Fork worker processes and wait for them to exit.
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        print("[Error]: --workers needs SO_REUSEPORT, which this platform lacks.")
+        sys.exit()
+
+    context = multiprocessing.get_context("fork")
+    unpaired = context.Array("i", worker_count)
+    # Guarded by the lock of unpaired
+    next_worker = context.Value("i", 0, lock=False)
+    handoff_sockets = [socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+                       for _ in range(worker_count)]
+
+    workers = []
+    for index in range(worker_count):
+        worker = context.Process(
+            target=run_worker,
+            args=(index, worker_count, unpaired, next_worker, handoff_sockets, host, port, stats_port,
+                  journal_directory, fsync, army_size))
+        worker.start()
+        workers.append(worker)
+
+    # Take the workers down with us when terminated
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit())
     try:
-        decrypted_reply = decrypt(connection.recv(2048))
-        reply = pickle.loads(decrypted_reply)
-        return reply
-    except socket.error as e:
-        print(str(e))
-        return None
+        for worker in workers:
+            worker.join()
+    except (KeyboardInterrupt, SystemExit):
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+
+
+def start_server():
+    """
+    Run the match server until interrupted.
+    """
+    HOST = sys.argv[1]
+    PORT = int(sys.argv[2])
+
+    # Number of processes to serve from
+    WORKERS = 1
+    if "--workers" in sys.argv:
+        WORKERS = int(sys.argv[sys.argv.index("--workers") + 1])
+
+    # Local port to serve stats on, off by default
+    STATS_PORT = None
+    if "--stats-port" in sys.argv:
+        STATS_PORT = int(sys.argv[sys.argv.index("--stats-port") + 1])
+
+    # Directory to journal matches to, off by default
+    JOURNAL = None
+    if "--journal" in sys.argv:
+        JOURNAL = sys.argv[sys.argv.index("--journal") + 1]
+    FSYNC = FSYNC_ALWAYS
+    if "--fsync" in sys.argv:
+        FSYNC = sys.argv[sys.argv.index("--fsync") + 1]
+        if FSYNC not in FSYNC_MODES:
+            print("[Error]: --fsync must be one of " + ", ".join(FSYNC_MODES))
+            sys.exit()
+
+    # Units per player in every match
+    ARMY_SIZE = MAX_UNITS
+    if "--army-size" in sys.argv:
+        ARMY_SIZE = int(sys.argv[sys.argv.index("--army-size") + 1])
+        try:
+            starting_locations(GRID_COLUMNS, GRID_ROWS, ARMY_SIZE)
+        except ValueError as e:
+            print("[Error]: --army-size:", str(e))
+            sys.exit()
+
+    if WORKERS > 1:
+        start_workers(HOST, PORT, WORKERS, STATS_PORT, JOURNAL, FSYNC, ARMY_SIZE)
+    else:
+        journal = None
+        if JOURNAL is not None:
+            journal = Journal(JOURNAL, FSYNC)
+        try:
+            asyncio.run(MatchServer(journal, ARMY_SIZE).serve(HOST, PORT, STATS_PORT))
+        except KeyboardInterrupt:
+            pass
+
+    print("\nServer closing...")
 
 
 if __name__ == "__main__":
     # Check for correct number of arguments
     if len(sys.argv) < 3:
-        print("Usage: python server.py <ip> <port>")
+        print("Usage: python server.py <ip> <port> [--workers N] [--stats-port P] [--army-size N] [--journal DIR [--fsync always|interval|never]]")
         sys.exit()
     # Enter server loop
-    start_server()
\ No newline at end of file
+    start_server()
@@ -0,0 +1,173 @@
+"""
+File: asyncclient.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Minimal asyncio client for the server's command protocol.
+
+Network blocks on every call, which is what the game wants,
+but load tests and server tests need many players in one
+process. Player speaks the same encrypted frames with asyncio
+streams instead, and seat_match pairs two of them into a match.
+
+The round helpers pipeline a fixed set of commands without
+waiting for replies, then read the replies back in order.
+
+"""
+
+import asyncio
+import socket
+
+from src.codec import encode_turn, decode_gamestate
+from src.encryption import Handshake
+from src.core.constants import GRID_COLUMNS, GRID_ROWS
+from src.constants import END_TURN
+from src.core.gamestate import starting_locations
+from src.protocol import pack_frame, HEADER, MSG_TEXT, MSG_TURN, MSG_HELLO, MSG_GAMESTATE, MSG_DELTA
+from src.protocol import EVENT_YOUR_TURN, NOT_MODIFIED, INVALID_TURN
+
+HOST = "127.0.0.1"
+
+# Idle clients ask for the turn once per frame at 60 fps
+POLL_INTERVAL = 1 / 60
+
+PASS_TURN = encode_turn({"move": None, "attack": None, "phase": END_TURN})
+
+# Commands sent each round, with the reply each one expects
+ROUND = (("turn", "turn"), ("get", "gamestate"), ("request_turn", "text"), ("sync 0", "changes"))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+class Player:
+    """
+    Minimal client speaking the server's command protocol.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.player_num = None
+        self.subscribed = False
+        self.session = None
+
+        # Alternates between starting tile and the one next to it
+        self.moved = False
+
+    async def read_frame(self):
+        length, _ = HEADER.unpack(await self.reader.readexactly(HEADER.size))
+        return await self.reader.readexactly(length)
+
+    async def handshake(self):
+        handshake = Handshake()
+        self.writer.write(pack_frame(MSG_HELLO, handshake.public_key))
+        self.session = handshake.create_session(await self.read_frame(), is_client=True)
+
+    async def receive(self):
+        return self.session.decrypt(await self.read_frame())
+
+    async def command(self, text):
+        self.writer.write(pack_frame(MSG_TEXT, self.session.encrypt(text.encode())))
+        await self.writer.drain()
+
+    async def send_turn(self):
+        # Step the triangle toward the middle and back
+        unit_type = 1 if self.player_num == 1 else 4
+        col, row = starting_locations(GRID_COLUMNS, GRID_ROWS)[unit_type]
+        if not self.moved:
+            col += 1 if self.player_num == 1 else -1
+        self.moved = not self.moved
+
+        turn = {"move": [unit_type, col, row], "attack": None, "phase": END_TURN}
+        self.writer.write(pack_frame(MSG_TEXT, self.session.encrypt(b"turn")))
+        self.writer.write(pack_frame(MSG_TURN, self.session.encrypt(encode_turn(turn))))
+        await self.writer.drain()
+        await self.receive()
+
+    async def wait_for_turn(self):
+        if self.subscribed:
+            while (await self.receive()).decode() != EVENT_YOUR_TURN:
+                pass
+            return
+
+        # Poll like Game.update used to until the turn comes around
+        while True:
+            await self.command("request_turn")
+            if int((await self.receive()).decode()) == self.player_num:
+                return
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+async def seat_match(port, push):
+    players = []
+    for _ in range(2):
+        reader, writer = await asyncio.open_connection(HOST, port)
+        player = Player(reader, writer)
+        await player.handshake()
+        await player.command("join")
+        players.append(player)
+    # Nobody else is queued, so the two are paired with each other
+    for player in players:
+        # Seated as "<player_num> <token>"
+        player.player_num = int((await player.receive()).decode().split(" ")[0])
+    for player in players:
+        if push:
+            await player.command("subscribe")
+            await player.receive()
+            player.subscribed = True
+        await player.command("start")
+        await player.receive()
+    return players
+
+
+def round_frames(player):
+    frames = []
+    for command, _ in ROUND:
+        frames.append(pack_frame(MSG_TEXT, player.session.encrypt(command.encode())))
+        if command == "turn":
+            frames.append(pack_frame(MSG_TURN, player.session.encrypt(PASS_TURN)))
+    return b"".join(frames)
+
+
+async def send_rounds(player, rounds):
+    for _ in range(rounds):
+        player.writer.write(round_frames(player))
+        await player.writer.drain()
+
+
+async def read_replies(player, rounds):
+    """
+    Returns ([round of each accepted turn], [problems found]).
+    """
+    accepted = []
+    errors = []
+    for index in range(rounds):
+        for command, expected in ROUND:
+            length, msg_type = HEADER.unpack(await player.reader.readexactly(HEADER.size))
+            payload = player.session.decrypt(await player.reader.readexactly(length))
+            if expected == "gamestate" and msg_type != MSG_GAMESTATE:
+                errors.append("{!r} got a frame of type {}".format(command, msg_type))
+            elif expected == "changes" and msg_type not in (MSG_DELTA, MSG_GAMESTATE):
+                if payload.decode(errors="replace") != NOT_MODIFIED:
+                    errors.append("{!r} got a frame of type {}".format(command, msg_type))
+            elif expected in ("turn", "text") and msg_type != MSG_TEXT:
+                errors.append("{!r} got a frame of type {}".format(command, msg_type))
+            elif expected == "turn":
+                reply = payload.decode()
+                if reply == "ok":
+                    accepted.append(index)
+                elif not reply.startswith(INVALID_TURN):
+                    errors.append("turn got {!r}".format(reply))
+            elif expected == "text" and payload.decode() not in ("1", "2"):
+                errors.append("request_turn got {!r}".format(payload.decode()))
+    return accepted, errors
+
+
+async def get_gamestate(player):
+    await player.command("get")
+    length, _ = HEADER.unpack(await player.reader.readexactly(HEADER.size))
+    return decode_gamestate(player.session.decrypt(await player.reader.readexactly(length)))
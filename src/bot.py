@@ -0,0 +1,302 @@
+"""
+File: bot.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Contains the Bot class, a client without a window that
+plays a match through Network. Bots choose legal random
+turns or play a script, and time every command they send
+so many of them can be used to put load on the server.
+
+"""
+
+import random
+import time
+from collections import Counter, defaultdict
+
+from src.constants import *
+from src.core.rules import TurnValidator
+from src.core.unit import range_tiles
+from src.core.unittable import UnitTable
+from src.encryption import EncryptionError
+from src.protocol import HEARTBEAT_INTERVAL
+
+# Idle bots ask the server once per frame at 60 fps, like Game
+POLL_INTERVAL = 1 / 60
+
+# Seconds to wait for the opponent before giving up
+DEFAULT_TIMEOUT = 30
+
+
+class Bot:
+    """
+    Plays one side of a match without a window.
+
+    Has attributes:
+        latencies {dict} -- Seconds taken by each reply, listed by command
+        errors {Counter} -- Failures counted by kind
+        turns_played {int} -- Turns the server accepted
+    """
+
+    def __init__(self, network, push=False, script=None, seed=None, timeout=DEFAULT_TIMEOUT, rating=None):
+        """
+        Sets up the bot.
+
+        Arguments:
+            network {Network} -- Not yet connected to the server
+            push {bool} -- Wait for server events instead of polling request_turn
+            script {dict} -- Turns to play before random ones, listed by player number
+            seed {int} -- Seed for the bot's random choices
+            timeout {float} -- Seconds to wait for the opponent or a reply
+            rating {int} -- Rating to queue with, None to play anyone
+        """
+        self.network = network
+        self.push = push
+        self.script = script or {}
+        self.random = random.Random(seed)
+        self.timeout = timeout
+        self.rating = rating
+
+        self.player_num = None
+        self.gamestate = None
+        # UnitTable of the GameState, kept up to date by apply_changes()
+        self.units = None
+        # Made once the army size is known, to move by the server's rules
+        self.validator = None
+
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.turns_played = 0
+
+    def run(self, max_turns):
+        """
+        Connect, play until the game ends or max_turns
+        have been played, then leave the match.
+
+        Arguments:
+            max_turns {int} -- Most turns this bot will play
+        """
+        # A stalled server shows up as a timeout instead of a hang
+        self.network.CLIENT.settimeout(self.timeout)
+        try:
+            self.network.connect(self.rating)
+            self.player_num = self.network.get_player_num()
+            if self.player_num is None:
+                self.errors["connect"] += 1
+                return
+            script = list(self.script.get(self.player_num, []))
+
+            if self.push:
+                self.timed("subscribe", self.network.subscribe)
+            self.timed("start", self.network.send_ready)
+            if not self.wait_for_ready():
+                return
+
+            while self.turns_played < max_turns:
+                if not self.wait_for_turn():
+                    return
+                if self.gamestate.game_is_over:
+                    return
+                self.play_turn(script)
+
+                # Find out whether that turn won the game
+                if not self.refresh() or self.gamestate.game_is_over:
+                    return
+        except (OSError, EncryptionError) as e:
+            self.errors[type(e).__name__] += 1
+        finally:
+            try:
+                self.network.close()
+            except OSError:
+                pass
+
+    def timed(self, command, function, *args):
+        """
+        Call a Network method and record how long its reply took.
+        A reply of None counts as an error for that command.
+        """
+        start = time.perf_counter()
+        result = function(*args)
+        self.latencies[command].append(time.perf_counter() - start)
+        if result is None:
+            self.errors[command] += 1
+        return result
+
+    def refresh(self):
+        """
+        Bring the bot's copy of the GameState up to date.
+
+        Returns:
+            bool -- False if the server didn't answer
+        """
+        if self.gamestate is None:
+            self.gamestate = self.timed("get", self.network.get_gamestate)
+            self.units = None
+            return self.gamestate is not None
+
+        changes = self.timed("sync", self.network.sync_gamestate, self.gamestate.version)
+        if changes is None:
+            return False
+        if isinstance(changes, list):
+            self.apply_changes(changes)
+        else:
+            self.gamestate = changes
+            self.units = None
+        return True
+
+    def apply_changes(self, changes):
+        """
+        Bring the GameState and units up to date with changes from the server.
+
+        Arguments:
+            changes {[tuple]} -- (version, field, key, value) for each change
+        """
+        self.gamestate.apply_changes(changes)
+        if self.units is not None:
+            self.units.apply_changes(changes)
+
+    def wait_for_ready(self):
+        """
+        Wait until both players have sent "start".
+
+        Returns:
+            bool -- False if the opponent never got ready
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            # Always ask first, the event may have come before subscribing
+            if not self.refresh():
+                return False
+            if self.gamestate.ready():
+                return True
+            if time.monotonic() >= deadline:
+                self.errors["timeout"] += 1
+                return False
+
+            if self.push:
+                # Any event is a reason to look at the GameState again
+                if not self.wait_for_events(deadline):
+                    return False
+            else:
+                time.sleep(POLL_INTERVAL)
+
+    def wait_for_turn(self):
+        """
+        Wait until it is this bot's turn or the game is over.
+        The bot's GameState is up to date when this returns True.
+
+        Returns:
+            bool -- False if the turn never came
+        """
+        deadline = time.monotonic() + self.timeout
+        if self.push:
+            # Events can be stale by the time they're read,
+            # so only the GameState decides whose turn it is
+            while not (self.gamestate.is_players_turn(self.player_num) or self.gamestate.game_is_over):
+                if not self.wait_for_events(deadline):
+                    return False
+                if not self.refresh():
+                    return False
+            return True
+
+        while time.monotonic() < deadline:
+            turn = self.timed("request_turn", self.network.request_turn)
+            if turn is None:
+                return False
+            if turn == self.player_num:
+                return self.refresh()
+            time.sleep(POLL_INTERVAL)
+
+        self.errors["timeout"] += 1
+        return False
+
+    def wait_for_events(self, deadline):
+        """
+        Wait for the server to push an event, sending
+        heartbeats so the server doesn't drop the bot.
+
+        Returns:
+            bool -- False if nothing came before the deadline
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.errors["timeout"] += 1
+                return False
+            if self.network.wait_for_events(min(remaining, HEARTBEAT_INTERVAL)):
+                return True
+            if not self.network.connected:
+                self.errors["disconnected"] += 1
+                return False
+            self.network.heartbeat()
+
+    def play_turn(self, script):
+        """
+        Send the next scripted turn, or a random legal one.
+
+        Arguments:
+            script {[dict]} -- Turns left to play, each with move and attack
+        """
+        if script:
+            turn = script.pop(0)
+            turn = {"move" : turn.get("move"), "attack" : turn.get("attack"), "phase" : END_TURN}
+        else:
+            turn = self.choose_turn()
+
+        reply = self.timed("turn", self.network.send_turn, turn)
+        if reply == "ok":
+            self.turns_played += 1
+        elif reply is not None:
+            # Still this bot's turn, the next try picks again
+            self.errors["invalid_turn"] += 1
+
+    def choose_turn(self):
+        """
+        Move a random unit to a random free tile it can reach,
+        then attack a random enemy in the unit's attack range.
+
+        Returns:
+            dict -- Turn with keys move, attack and phase
+        """
+        units = self.get_units()
+        my_units = [unit for unit in units if unit.is_players_unit(self.player_num)]
+        enemy_units = [unit for unit in units if not unit.is_players_unit(self.player_num)]
+        occupied = {tuple(unit.pos) for unit in units}
+
+        if self.validator is None or self.validator.army_size != self.gamestate.army_size:
+            self.validator = TurnValidator(GRID_COLUMNS, GRID_ROWS, self.gamestate.army_size)
+
+        move = None
+        attack = None
+        self.random.shuffle(my_units)
+        for unit in my_units:
+            # Sorted so a seeded bot always picks the same tile
+            tiles = sorted(self.validator.get_reach(self.gamestate, unit.type).tiles - occupied)
+            if not tiles:
+                continue
+            col, row = self.random.choice(tiles)
+            move = [unit.type, col, row]
+
+            # The table keeps the unit where the server has it until the turn is accepted
+            attack_range = range_tiles(col, row, unit.attack_range, GRID_COLUMNS, GRID_ROWS)
+            targets = [enemy for enemy in enemy_units if tuple(enemy.pos) in attack_range]
+            if targets:
+                target = self.random.choice(targets)
+                attack = [target.type, unit.attack_power]
+            break
+
+        return {"move" : move, "attack" : attack, "phase" : END_TURN}
+
+    def get_units(self):
+        """
+        Returns the living units in the bot's GameState.
+        Units that haven't moved are still on their starting tile.
+
+        They're views of one UnitTable, built when the whole
+        GameState arrives and then updated with each turn's
+        changes, so large armies don't cost a pass over every
+        unit or an object per unit every turn.
+        """
+        if self.units is None or self.units.army_size != self.gamestate.army_size:
+            self.units = UnitTable.from_gamestate(self.gamestate, GRID_COLUMNS, GRID_ROWS)
+        return [self.units[unit_type] for unit_type in self.units.living().tolist()]
@@ -0,0 +1,151 @@
+"""
+File: camera.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Which part of the map is on screen and how big its tiles are
+drawn, for maps too big to fit in the window.
+
+The camera looks at the map drawn at its zoom and keeps the
+pixel offset of the view's top left corner into it. Everything
+here is in view pixels: (0, 0) is the top left of the map's
+surface on screen, not of the window.
+
+"""
+
+# Smallest and largest scale tiles are drawn at
+MIN_ZOOM = 0.25
+MAX_ZOOM = 4.0
+
+# Scale change per step of the mouse wheel
+ZOOM_STEP = 1.25
+
+# Pixels scrolled per frame while an arrow key is held
+SCROLL_SPEED = 8
+
+
+class Camera:
+    """
+    A scrolling, zooming view of a grid of tiles.
+
+    Has attributes:
+        x, y {float} -- Offset of the view into the zoomed map, in pixels
+        zoom {float} -- Scale tiles are drawn at, 1 is TILE_WIDTH x TILE_HEIGHT
+    """
+
+    def __init__(self, view_w, view_h, cols, rows, tile_w, tile_h, margin):
+        """
+        Set up a camera looking at the top left of the map.
+
+        Arguments:
+            view_w {int} -- Width of the view in pixels
+            view_h {int} -- Height of the view in pixels
+            cols {int} -- Number of columns on the grid
+            rows {int} -- Number of rows on the grid
+            tile_w {int} -- Width of a tile at zoom 1
+            tile_h {int} -- Height of a tile at zoom 1
+            margin {int} -- Gap around tiles at zoom 1
+        """
+        self.view_w = view_w
+        self.view_h = view_h
+        self.cols = cols
+        self.rows = rows
+        self.tile_w = tile_w
+        self.tile_h = tile_h
+        self.margin = margin
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom = 1.0
+
+    def get_pitch(self):
+        """
+        Returns the distance in pixels from one tile to the next, (across, down).
+        """
+        return (self.tile_w + self.margin) * self.zoom, (self.tile_h + self.margin) * self.zoom
+
+    def get_map_size(self):
+        """
+        Returns the size in pixels of the whole map at the current zoom.
+        """
+        pitch_x, pitch_y = self.get_pitch()
+        margin = self.margin * self.zoom
+        return self.cols * pitch_x + margin, self.rows * pitch_y + margin
+
+    def clamp(self):
+        # Keep the view on the map; maps smaller than the view sit at its top left
+        map_w, map_h = self.get_map_size()
+        self.x = min(max(self.x, 0.0), max(map_w - self.view_w, 0.0))
+        self.y = min(max(self.y, 0.0), max(map_h - self.view_h, 0.0))
+
+    def scroll(self, dx, dy):
+        """
+        Move the view by a number of pixels.
+        """
+        self.x += dx
+        self.y += dy
+        self.clamp()
+
+    def zoom_by(self, factor, focus=None):
+        """
+        Scale the map, keeping the point under focus where it is.
+
+        Arguments:
+            factor {float} -- Multiplies the zoom, clamped to MIN_ZOOM..MAX_ZOOM
+
+        Keyword Arguments:
+            focus {(int, int)} -- Point in the view to zoom around (default: {the center})
+        """
+        if focus is None:
+            focus = (self.view_w / 2, self.view_h / 2)
+        focus_x, focus_y = focus
+        zoom = min(max(self.zoom * factor, MIN_ZOOM), MAX_ZOOM)
+        scale = zoom / self.zoom
+        self.x = (self.x + focus_x) * scale - focus_x
+        self.y = (self.y + focus_y) * scale - focus_y
+        self.zoom = zoom
+        self.clamp()
+
+    def center_on(self, col, row):
+        """
+        Scroll so a tile is in the middle of the view.
+        """
+        pitch_x, pitch_y = self.get_pitch()
+        self.x = (col + 0.5) * pitch_x - self.view_w / 2
+        self.y = (row + 0.5) * pitch_y - self.view_h / 2
+        self.clamp()
+
+    def visible_tiles(self):
+        """
+        Returns the tiles at least partly in view.
+
+        Returns:
+            (int, int, int, int) -- First column, first row, last column
+                                    and last row, all included
+        """
+        pitch_x, pitch_y = self.get_pitch()
+        first_col = max(int(self.x // pitch_x), 0)
+        first_row = max(int(self.y // pitch_y), 0)
+        last_col = min(int((self.x + self.view_w) // pitch_x), self.cols - 1)
+        last_row = min(int((self.y + self.view_h) // pitch_y), self.rows - 1)
+        return first_col, first_row, last_col, last_row
+
+    def tile_at(self, x, y):
+        """
+        Returns the (col, row) of the tile under a point in the view.
+        It may be off the grid.
+        """
+        pitch_x, pitch_y = self.get_pitch()
+        return int((self.x + x) // pitch_x), int((self.y + y) // pitch_y)
+
+    def tile_rect(self, col, row):
+        """
+        Returns where a tile is drawn in the view.
+
+        Returns:
+            [int, int, int, int] -- Left, top, width and height in pixels
+        """
+        pitch_x, pitch_y = self.get_pitch()
+        margin = self.margin * self.zoom
+        left = int(col * pitch_x + margin - self.x)
+        top = int(row * pitch_y + margin - self.y)
+        return [left, top, max(int(self.tile_w * self.zoom), 1), max(int(self.tile_h * self.zoom), 1)]
@@ -0,0 +1,276 @@
+"""
+File: codec.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Converts GameState objects, turns and GameState changes
+to and from a compact binary layout for sending over the
+network. Unlike pickle, decoding never runs code sent by
+the peer.
+
+Every message starts with a CODEC_VERSION byte. All numbers
+are little-endian; a missing position is stored as NO_POSITION.
+
+"""
+
+import struct
+from itertools import chain
+
+from src.core.gamestate import GameState
+
+CODEC_VERSION = 1
+
+# Stands in for a position of None (dead or unplaced unit)
+NO_POSITION = 0xFFFF
+NO_LOCATION = (NO_POSITION, NO_POSITION)
+
+# GameState:
+#   codec version, flags, state version, winner, unit count
+#   then three columns of uint16, one entry per unit:
+#   unit_type, (col, row), health
+GAMESTATE_HEADER = struct.Struct("<BBIBH")
+
+# GameState flags
+TURN_1 = 1 << 0
+TURN_2 = 1 << 1
+READY_1 = 1 << 2
+READY_2 = 1 << 3
+GAME_OVER = 1 << 4
+
+# Turn:
+#   codec version, flags, phase
+#   then move [unit_type, col, row] and attack [unit_type, attack_power] if present
+HAS_MOVE = 1 << 0
+HAS_ATTACK = 1 << 1
+TURN_LAYOUTS = {
+    0 : struct.Struct("<BBB"),
+    HAS_MOVE : struct.Struct("<BBBHHH"),
+    HAS_ATTACK : struct.Struct("<BBBHH"),
+    HAS_MOVE | HAS_ATTACK : struct.Struct("<BBBHHHHH"),
+}
+MAX_TURN_SIZE = max(layout.size for layout in TURN_LAYOUTS.values())
+
+# Changes:
+#   codec version, change count, version of the first change
+#   then columns with one entry per change: field (uint8),
+#   key (uint16) and value (two uint16; the second is only
+#   used by locations). Versions are consecutive, as
+#   returned by GameState.changes_since().
+CHANGES_HEADER = struct.Struct("<BII")
+
+# Change fields
+FIELD_CODES = {"location" : 1, "health" : 2, "turn" : 3, "ready" : 4, "winner" : 5}
+FIELD_NAMES = {code: field for field, code in FIELD_CODES.items()}
+
+
+class CodecError(Exception):
+    """
+    Raised when data can't be decoded.
+    """
+
+
+def check_version(data):
+    if not data or data[0] != CODEC_VERSION:
+        raise CodecError("Unsupported codec version.")
+
+
+def encode_gamestate(gamestate):
+    """
+    Pack a GameState into bytes.
+
+    Arguments:
+        gamestate {GameState} -- The state to send
+
+    Returns:
+        bytes -- The encoded state
+    """
+    flags = 0
+    if gamestate.turn[1]:
+        flags |= TURN_1
+    if gamestate.turn[2]:
+        flags |= TURN_2
+    if gamestate.ready_state[1]:
+        flags |= READY_1
+    if gamestate.ready_state[2]:
+        flags |= READY_2
+    if gamestate.game_is_over:
+        flags |= GAME_OVER
+
+    unit_health = gamestate.unit_health
+    unit_types = list(unit_health)
+    locations = map(gamestate.unit_locations.__getitem__, unit_types)
+    positions = chain.from_iterable([location or NO_LOCATION for location in locations])
+    unit_count = len(unit_types)
+
+    header = GAMESTATE_HEADER.pack(CODEC_VERSION, flags, gamestate.version,
+                                   gamestate.winner or 0, unit_count)
+    return b"".join((
+        header,
+        struct.pack("<%dH" % unit_count, *unit_types),
+        struct.pack("<%dH" % (2 * unit_count), *positions),
+        struct.pack("<%dH" % unit_count, *unit_health.values()),
+    ))
+
+
+def decode_gamestate(data):
+    """
+    Rebuild a GameState from bytes.
+
+    The copy doesn't keep a change log, like
+    every GameState held by a client.
+
+    Arguments:
+        data {bytes} -- Output of encode_gamestate()
+
+    Returns:
+        GameState -- The decoded state
+    """
+    check_version(data)
+    try:
+        _, flags, version, winner, unit_count = GAMESTATE_HEADER.unpack_from(data)
+        if len(data) != GAMESTATE_HEADER.size + 8 * unit_count:
+            raise CodecError("GameState has the wrong length.")
+        offset = GAMESTATE_HEADER.size
+        unit_types = struct.unpack_from("<%dH" % unit_count, data, offset)
+        positions = iter(struct.unpack_from("<%dH" % (2 * unit_count), data, offset + 2 * unit_count))
+        healths = struct.unpack_from("<%dH" % unit_count, data, offset + 6 * unit_count)
+    except struct.error as e:
+        raise CodecError(str(e))
+
+    gamestate = GameState.__new__(GameState)
+    gamestate.changes = None
+    gamestate.army_size = unit_count // 2
+    gamestate.version = version
+    gamestate.turn = {1 : bool(flags & TURN_1), 2 : bool(flags & TURN_2)}
+    gamestate.ready_state = {1 : bool(flags & READY_1), 2 : bool(flags & READY_2)}
+    gamestate.game_is_over = bool(flags & GAME_OVER)
+    gamestate.winner = winner or None
+    gamestate.unit_health = dict(zip(unit_types, healths))
+    gamestate.unit_locations = dict(zip(unit_types, [
+        None if col == NO_POSITION else [col, row]
+        for col, row in zip(positions, positions)
+    ]))
+    gamestate.index_unit_tiles()
+
+    return gamestate
+
+
+def encode_turn(turn):
+    """
+    Pack a turn into bytes.
+
+    Arguments:
+        turn {dict} -- Has keys move, attack and phase
+
+    Returns:
+        bytes -- The encoded turn
+    """
+    flags = 0
+    values = [CODEC_VERSION, 0, turn["phase"]]
+    if turn["move"]:
+        flags |= HAS_MOVE
+        values += turn["move"]
+    if turn["attack"]:
+        flags |= HAS_ATTACK
+        values += turn["attack"]
+    values[1] = flags
+
+    return TURN_LAYOUTS[flags].pack(*values)
+
+
+def decode_turn(data):
+    """
+    Rebuild a turn from bytes.
+
+    Arguments:
+        data {bytes} -- Output of encode_turn()
+
+    Returns:
+        dict -- The turn, with move and attack set to None if absent
+    """
+    check_version(data)
+    try:
+        flags = data[1]
+        values = TURN_LAYOUTS[flags].unpack(data)
+    except (IndexError, KeyError, struct.error) as e:
+        raise CodecError(str(e))
+
+    move = None
+    attack = None
+    if flags & HAS_MOVE:
+        move = list(values[3:6])
+    if flags & HAS_ATTACK:
+        attack = list(values[-2:])
+
+    return {"move" : move, "attack" : attack, "phase" : values[2]}
+
+
+def encode_changes(changes):
+    """
+    Pack GameState changes into bytes.
+
+    Arguments:
+        changes {[tuple]} -- (version, field, key, value) for each change
+
+    Returns:
+        bytes -- The encoded changes
+    """
+    count = len(changes)
+    first_version = changes[0][0] if changes else 0
+
+    codes = []
+    keys = []
+    values = []
+    for version, field, key, value in changes:
+        codes.append(FIELD_CODES[field])
+        keys.append(key or 0)
+        if field == "location":
+            values += value or NO_LOCATION
+        else:
+            values += (int(value or 0), 0)
+
+    return b"".join((
+        CHANGES_HEADER.pack(CODEC_VERSION, count, first_version),
+        bytes(codes),
+        struct.pack("<%dH" % count, *keys),
+        struct.pack("<%dH" % (2 * count), *values),
+    ))
+
+
+def decode_changes(data):
+    """
+    Rebuild GameState changes from bytes.
+
+    Arguments:
+        data {bytes} -- Output of encode_changes()
+
+    Returns:
+        [tuple] -- (version, field, key, value) for each change
+    """
+    check_version(data)
+    try:
+        _, count, version = CHANGES_HEADER.unpack_from(data)
+        if len(data) != CHANGES_HEADER.size + 7 * count:
+            raise CodecError("Changes have the wrong length.")
+        offset = CHANGES_HEADER.size
+        codes = data[offset:offset + count]
+        keys = struct.unpack_from("<%dH" % count, data, offset + count)
+        values = iter(struct.unpack_from("<%dH" % (2 * count), data, offset + 3 * count))
+
+        changes = []
+        for code, key, first, second in zip(codes, keys, values, values):
+            field = FIELD_NAMES[code]
+            if field == "location":
+                value = None if first == NO_POSITION else [first, second]
+            elif field == "ready":
+                value = bool(first)
+            elif field == "winner":
+                value = first or None
+            else:
+                value = first
+            changes.append((version, field, key or None, value))
+            version += 1
+    except (struct.error, KeyError) as e:
+        raise CodecError(str(e))
+
+    return changes
@@ -28,6 +28,28 @@ darkgreen = (118, 186, 120)
 darkpurple = (190, 124, 190)
 darkorange = (251, 105, 9)
 
+# Unit colors, keyed by (player_num, archetype)
+unit_colors = {
+    (1, "triangle") : red,
+    (1, "diamond") : orange,
+    (1, "circle") : darkred,
+    (2, "triangle") : darkgreen,
+    (2, "diamond") : blue,
+    (2, "circle") : darkpurple,
+}
+
+def get_unit_color(unit):
+    """
+    Returns the color a unit is drawn in.
+
+    Arguments:
+        unit {Unit} -- The unit to draw
+
+    Returns:
+        (int, int, int) -- The RGB value of the unit
+    """
+    return unit_colors[(unit.get_owning_player(), unit.archetype)]
+
 def get_hover_color(color):
     """
     Used for highlighting hovered tiles.
@@ -1,8 +1,16 @@
 """
-File: colors.py
+File: constants.py
 Programmers: Fernando Rodriguez, Charles Davis
+
+
+Settings for the window and drawing. The rules'
+constants are in src/core/constants.py and are
+imported here too.
+
 """
 
+from src.core.constants import *
+
 #########################################################################
 # CONSTANTS
 
@@ -16,30 +24,6 @@ TILE_WIDTH = 23
 TILE_HEIGHT = 23
 TILE_MARGIN = 2
 
-# Units per player
-MAX_UNITS = 3
-
-# Unit_types
-NO_UNIT = 0
-P1_TRIANGLE = 1
-P1_DIAMOND = 2
-P1_CIRCLE = 3
-P2_TRIANGLE = 4
-P2_DIAMOND = 5
-P2_CIRCLE = 6
-
-# Max. health values
-TRIANGLE_HEALTH = 4
-DIAMOND_HEALTH = 5
-CIRCLE_HEALTH = 3
-
-# Tile_types
-BLANK = 0
-HEALTH = 1
-HARM = 2
-MOVABLE = 3
-ATTACKABLE = 4
-
 # Move phases
 NOT_TURN = 0
 PLACE_TILES = 1
@@ -49,8 +33,11 @@ ATTACKING = 4
 END_TURN = 5
 GAME_OVER = 6
 
-# Grid size
-GRID_COLUMNS = 14
-GRID_ROWS = 12
+# Most of the window the map takes up, in pixels. Bigger maps scroll.
+VIEWPORT_WIDTH = GRID_COLUMNS * (TILE_WIDTH + TILE_MARGIN) + TILE_MARGIN
+VIEWPORT_HEIGHT = GRID_ROWS * (TILE_HEIGHT + TILE_MARGIN) + TILE_MARGIN
+
+# Milliseconds between attempts to resume a dropped connection
+RECONNECT_DELAY = 2000
 
 #########################################################################
\ No newline at end of file
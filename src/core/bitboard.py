@@ -0,0 +1,218 @@
+"""
+File: bitboard.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Masks of the board with one bit per tile, for answering
+questions about many tiles at once.
+
+Tile (col, row) is bit (row * cols + col) of a Python int, the
+same layout as the range tables in rules.py. "Is any enemy in
+this unit's attack range" is then the unit's range mask ANDed
+with the enemy's occupancy mask, however big the board is.
+
+Range masks come from the range tables on boards up to
+RANGE_TABLE_TILES tiles. A table holds a mask per tile, so it
+grows with the square of the board; on bigger boards the mask
+is worked out when asked for.
+
+A Grid made with bitboard=True keeps one up to date as tiles
+and units change. One can also be built from a GameState, as
+the server sees the board.
+
+"""
+
+import numpy
+
+from src.core.constants import MAX_UNITS, BLANK
+from src.core.gamestate import starting_locations
+from src.core.rules import range_table
+from src.core.unit import get_owner
+
+# Largest board, in tiles, whose ranges are looked up in a table
+RANGE_TABLE_TILES = 64 * 64
+
+
+def mask_from_array(array):
+    """
+    Returns a bitboard mask with a bit set for every true element
+    of a 2D bool array indexed [row, col].
+    """
+    return int.from_bytes(numpy.packbits(array.ravel(), bitorder="little").tobytes(), "little")
+
+
+def mask_from_indices(indices):
+    """
+    Returns a bitboard mask with the bits at an array of indices set.
+    Only the span from the lowest to the highest index is packed.
+    """
+    if not len(indices):
+        return 0
+    first = int(indices.min())
+    bits = numpy.zeros(int(indices.max()) - first + 1, dtype=bool)
+    bits[indices - first] = True
+    return mask_from_array(bits) << first
+
+
+class Bitboard:
+    """
+    Occupancy and tile type masks of a board.
+
+    Has attributes:
+        players {dict} -- Tiles holding each player's units, keyed by player_num
+        units {dict} -- Tiles holding each unit type, keyed by unit_type
+        tiles {dict} -- Tiles of each tile_type other than blank, keyed by tile_type
+    """
+
+    def __init__(self, cols, rows, army_size=MAX_UNITS):
+        self.cols = cols
+        self.rows = rows
+        self.army_size = army_size
+        self.players = {1 : 0, 2 : 0}
+        self.units = {}
+        self.tiles = {}
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Returns the masks of everything on a Grid.
+        """
+        bitboard = cls(grid.cols, grid.rows, grid.army_size)
+        bitboard.load_units(grid.unit_types.to_array())
+        bitboard.load_tiles(grid.tile_types.to_array())
+        return bitboard
+
+    @classmethod
+    def from_gamestate(cls, gamestate, cols, rows):
+        """
+        Returns the masks of a GameState's living units.
+        Units that haven't moved are on their starting tile.
+        """
+        bitboard = cls(cols, rows, gamestate.army_size)
+        starting = starting_locations(cols, rows, gamestate.army_size)
+        for unit_type, health in gamestate.unit_health.items():
+            if health > 0:
+                col, row = gamestate.unit_locations[unit_type] or starting[unit_type]
+                bitboard.set_unit(col, row, unit_type)
+        return bitboard
+
+    def load_units(self, unit_types):
+        """
+        Rebuild the unit masks from an array of unit_types indexed [row, col].
+        """
+        self.players = {
+            1 : mask_from_array((unit_types > 0) & (unit_types <= self.army_size)),
+            2 : mask_from_array(unit_types > self.army_size),
+        }
+        self.units = {int(unit_type): mask_from_array(unit_types == unit_type)
+                      for unit_type in numpy.unique(unit_types) if unit_type}
+
+    def load_tiles(self, tile_types):
+        """
+        Rebuild the tile masks from an array of tile_types indexed [row, col].
+        """
+        self.tiles = {int(tile_type): mask_from_array(tile_types == tile_type)
+                      for tile_type in numpy.unique(tile_types) if tile_type != BLANK}
+
+    def get_bit(self, col, row):
+        return 1 << (row * self.cols + col)
+
+    def set_unit(self, col, row, unit_type, old_type=0):
+        """
+        Change the unit on a tile.
+
+        Arguments:
+            col {int} -- The column of the tile
+            row {int} -- The row of the tile
+            unit_type {int} -- The unit now on the tile, 0 if none
+            old_type {int} -- The unit that was on the tile, 0 if none
+        """
+        bit = self.get_bit(col, row)
+        if old_type:
+            self.players[get_owner(old_type, self.army_size)] &= ~bit
+            self.units[old_type] = self.units.get(old_type, 0) & ~bit
+        if unit_type:
+            self.players[get_owner(unit_type, self.army_size)] |= bit
+            self.units[unit_type] = self.units.get(unit_type, 0) | bit
+
+    def set_tile(self, col, row, tile_type, old_type=BLANK):
+        """
+        Change the type of a tile.
+
+        Arguments:
+            col {int} -- The column of the tile
+            row {int} -- The row of the tile
+            tile_type {int} -- The tile's new tile_type
+            old_type {int} -- The tile's old tile_type
+        """
+        bit = self.get_bit(col, row)
+        if old_type != BLANK:
+            self.tiles[old_type] = self.tiles.get(old_type, 0) & ~bit
+        if tile_type != BLANK:
+            self.tiles[tile_type] = self.tiles.get(tile_type, 0) | bit
+
+    def set_tiles(self, cols, rows, tile_type):
+        """
+        Give many tiles the same type.
+
+        Arguments:
+            cols {list or array} -- Column of each tile
+            rows {list or array} -- Row of each tile
+            tile_type {int} -- Their new tile_type
+        """
+        if isinstance(cols, list):
+            # A few tiles, quicker without numpy
+            indices = [row * self.cols + col for col, row in zip(cols, rows)]
+            first = min(indices)
+            mask = 0
+            for index in indices:
+                mask |= 1 << (index - first)
+            mask <<= first
+        else:
+            mask = mask_from_indices(rows * self.cols + cols)
+        for old_type in self.tiles:
+            if old_type != tile_type:
+                self.tiles[old_type] &= ~mask
+        if tile_type != BLANK:
+            self.tiles[tile_type] = self.tiles.get(tile_type, 0) | mask
+
+    def occupied(self):
+        """
+        Returns the mask of every tile holding a unit.
+        """
+        return self.players[1] | self.players[2]
+
+    def get_range(self, col, row, distance):
+        """
+        Returns the mask of tiles within a distance of a tile,
+        as Unit.get_range works it out.
+        """
+        cols = self.cols
+        if cols * self.rows <= RANGE_TABLE_TILES:
+            return range_table(cols, self.rows, distance)[row * cols + col]
+
+        # The square of tiles up to distance away in both directions, cut off at the edges
+        first_col, last_col = max(col - distance, 0), min(col + distance, cols - 1)
+        first_row, last_row = max(row - distance, 0), min(row + distance, self.rows - 1)
+        row_mask = ((1 << (last_col - first_col + 1)) - 1) << first_col
+        # One bit at the start of each row in range
+        row_starts = ((1 << ((last_row - first_row + 1) * cols)) - 1) // ((1 << cols) - 1)
+        return row_mask * row_starts << (first_row * cols)
+
+    def any_in_range(self, col, row, distance, mask):
+        """
+        Returns true if any tile of the mask is within a distance of a tile.
+        """
+        return bool(self.get_range(col, row, distance) & mask)
+
+    def get_positions(self, mask):
+        """
+        Returns the (col, row) of every tile set in a mask.
+        """
+        positions = []
+        while mask:
+            low = mask & -mask
+            index = low.bit_length() - 1
+            positions.append((index % self.cols, index // self.cols))
+            mask ^= low
+        return positions
@@ -0,0 +1,220 @@
+"""
+File: board.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+One player's view of the board: the grid, the units on it
+and the moves and attacks the player makes on their turn.
+
+Nothing here draws anything. Map draws a Board and turns
+clicks into calls on it, and anything that simulates games
+can use a Board without a window.
+
+"""
+
+from src.core.constants import *
+from src.core.gamestate import starting_locations
+from src.core.grid import Grid
+from src.core.unit import Unit
+
+class Board:
+    """
+    The grid of tiles and the units on it, as one player sees them.
+
+    Comprised of a grid of tiles, where each tile
+    has a tile_type and a unit_type. Units move
+    across tiles and are affected by tile_type.
+    """
+
+    def __init__(self, player_num, cols=GRID_COLUMNS, rows=GRID_ROWS, army_size=MAX_UNITS):
+        """
+        Set up tile grid and units.
+
+        Arguments:
+            player_num {int} -- The player identifier; 1 or 2
+
+        Keyword Arguments:
+            cols {int} -- Number of columns (default: {GRID_COLUMNS})
+            rows {int} -- Number of rows (default: {GRID_ROWS})
+            army_size {int} -- Units per player (default: {MAX_UNITS})
+        """
+        self.player_num = player_num
+        self.army_size = army_size
+
+        # The grid is a 2D array with columns and rows
+        self.grid = Grid(cols, rows, bitboard=True, pathfinder=True, army_size=army_size)
+
+        # Set up player units, each keyed by unit_type
+        self.all_units = {}
+        self.players_units = {}
+        self.enemy_units = {}
+        # Unit on each occupied tile, keyed by (col, row)
+        self.unit_positions = {}
+        self.initialize_units()
+
+    def initialize_units(self):
+        """
+        Place all units on map in initial positions.
+        """
+        # Take any units left from before off the grid
+        for col, row in self.unit_positions:
+            self.grid.set_unit_type(col, row, 0)
+        self.all_units.clear()
+        self.players_units.clear()
+        self.enemy_units.clear()
+        self.unit_positions.clear()
+
+        # Create Unit objects and add to dict
+        total_units = (2 * self.army_size)
+        for unit_type in range(1, total_units + 1):
+            unit = Unit(unit_type, self.army_size)
+            self.all_units[unit_type] = unit
+
+            # Determine this player's units
+            if unit.is_players_unit(self.player_num):
+                self.players_units[unit_type] = unit
+            else:
+                self.enemy_units[unit_type] = unit
+
+        # Place units on grid
+        positions = starting_locations(self.grid.cols, self.grid.rows, self.army_size)
+        for unit in self.all_units.values():
+            col, row = positions[unit.type]
+            unit.pos = [col, row]
+            self.grid.set_unit_type(col, row, unit.type)
+            self.unit_positions[(col, row)] = unit
+
+    def load_gamestate(self, gamestate):
+        """
+        Place units where a GameState has them, with its health.
+        Units it has dead are left off the board.
+
+        Arguments:
+            gamestate {GameState} -- The state to copy
+        """
+        self.initialize_units()
+
+        # Lift every unit first so units can trade tiles
+        for col, row in self.unit_positions:
+            self.grid.set_unit_type(col, row, 0)
+        self.unit_positions.clear()
+
+        positions = starting_locations(self.grid.cols, self.grid.rows, self.army_size)
+        for unit_type, unit in list(self.all_units.items()):
+            unit.change_health(gamestate.unit_health[unit_type])
+            if not unit.is_alive:
+                del self.all_units[unit_type]
+                self.players_units.pop(unit_type, None)
+                self.enemy_units.pop(unit_type, None)
+                continue
+            col, row = gamestate.unit_locations[unit_type] or positions[unit_type]
+            unit.pos = [col, row]
+            self.grid.set_unit_type(col, row, unit_type)
+            self.unit_positions[(col, row)] = unit
+
+    def get_unit_by_type(self, unit_type):
+        if unit_type == 0:
+            return None
+
+        target_unit = self.all_units.get(unit_type)
+        if target_unit is None:
+            print("[Error]: Could not get unit by type.")
+
+        return target_unit
+
+    def get_unit_at(self, col, row):
+        """
+        Returns the unit on a tile, None if there isn't one.
+        """
+        return self.unit_positions.get((col, row))
+
+    def move(self, unit, col, row):
+        """
+        Move unit to given location if possible.
+
+        Arguments:
+            unit {Unit} -- The unit to move
+            col {int}   -- A column on the grid
+            row {int}   -- A row on the grid
+        """
+        move = None
+        if unit:
+            if self.grid.get_unit_type(col, row) == 0:
+                # Set old tile to unit_type of blank
+                self.grid.set_unit_type(unit.col(), unit.row(), 0)
+                self.unit_positions.pop(tuple(unit.pos), None)
+                # Update grid with new unit position
+                self.grid.set_unit_type(col, row, unit.type)
+                self.unit_positions[(col, row)] = unit
+                unit.pos = [col, row]
+                move = [unit.type, col, row]
+
+        return move
+
+    def attack(self, unit, col, row):
+        """
+        Have a unit attack the enemy at given col, row.
+
+        Arguments:
+            unit {Unit} -- The attacking unit
+            col {int}   -- A column on the grid
+            row {int}   -- A row on the grid
+
+        Returns:
+            list -- [unit_type, attack_power] of the attack
+                    Will be None if there's no enemy to attack there
+        """
+        attack = None
+        if self.grid.tile_in_attack_range(col, row):
+            enemy_unit = self.get_unit_at(col, row)
+            if enemy_unit and enemy_unit.type in self.enemy_units:
+                unit.attack(enemy_unit)
+                if not enemy_unit.is_alive:
+                    self.kill_unit(enemy_unit)
+                attack = [enemy_unit.type, unit.attack_power]
+        return attack
+
+    def kill_unit(self, unit):
+        column, row = unit.pos
+        self.grid.set_unit_type(column, row, 0)
+        if self.unit_positions.get((column, row)) is unit:
+            del self.unit_positions[(column, row)]
+        self.all_units.pop(unit.type, None)
+        self.players_units.pop(unit.type, None)
+        self.enemy_units.pop(unit.type, None)
+
+    def highlight_tiles(self, unit, range_type):
+        if range_type == "move":
+            tile_type = 3
+            # Around other units and through terrain, not just the square of Unit.get_range
+            movable_list = self.grid.pathfinder.get_reach(unit.col(), unit.row(), unit.speed).tiles
+        elif range_type == "attack":
+            tile_type = 4
+            movable_list = unit.get_range(range_type, self.grid.cols, self.grid.rows)
+        self.grid.set_tile_types(movable_list, tile_type)
+
+    def remove_highlight(self, range_type):
+        if range_type == "move":
+            highlight_type = 3
+        elif range_type == "attack":
+            highlight_type = 4
+        self.grid.clear_tile_type(highlight_type)
+
+    def enemy_in_attack_range(self, unit):
+        """
+        Returns true if an enemy unit is in a unit's attack range.
+        """
+        col, row = unit.pos
+        bitboard = self.grid.bitboard
+        return bitboard.any_in_range(col, row, unit.attack_range, bitboard.players[3 - self.player_num])
+
+    def reset(self):
+        """
+        Initialize the board.
+
+        Removes special tile_types and
+        resets unit health and positions.
+        """
+        self.grid.clear_tiles()
+
+        self.initialize_units()
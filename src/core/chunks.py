@@ -0,0 +1,251 @@
+"""
+File: chunks.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+A 2D array of a board stored as square chunks, for maps far
+bigger than 14x12.
+
+Each chunk is a CHUNK_SIZE x CHUNK_SIZE numpy array, made the
+first time something other than 0 is written into it. Tiles in
+chunks that were never written read as 0, so a 1000x1000 board
+that is mostly blank takes memory only where things are.
+
+Reading a window of the board, as Map.draw does for the tiles on
+screen, touches only the chunks under it however big the board is.
+
+"""
+
+import numpy
+
+# Side of a chunk in tiles
+CHUNK_SIZE = 64
+
+# Lists of up to this many tiles are set one at a time, which beats
+# numpy's fixed cost per call; a unit's range on the usual board
+# is a few dozen tiles
+FEW_TILES = 64
+
+
+class ChunkedArray:
+    """
+    A board of values indexed [row, col], stored in chunks.
+
+    Has attributes:
+        chunks {dict} -- Chunk arrays indexed [row, col], keyed by
+                         (chunk_col, chunk_row); missing chunks are all 0
+    """
+
+    def __init__(self, cols, rows, dtype=numpy.uint8, chunk_size=CHUNK_SIZE):
+        self.cols = cols
+        self.rows = rows
+        self.dtype = numpy.dtype(dtype)
+        self.chunk_size = chunk_size
+        self.chunks = {}
+
+    @property
+    def shape(self):
+        return (self.rows, self.cols)
+
+    @property
+    def nbytes(self):
+        """
+        int -- Bytes held by the chunks made so far
+        """
+        return sum(chunk.nbytes for chunk in self.chunks.values())
+
+    def check_tile(self, col, row):
+        """
+        Returns col and row as indices into the board.
+        Negative indices count from the end, as they do in numpy.
+        """
+        if not (-self.cols <= col < self.cols and -self.rows <= row < self.rows):
+            raise IndexError("index ({0}, {1}) is out of bounds for a board of {2}x{3}".format(
+                col, row, self.cols, self.rows))
+        return col % self.cols, row % self.rows
+
+    def get_chunk(self, chunk_col, chunk_row):
+        """
+        Returns a chunk, making it if it doesn't exist yet.
+        """
+        chunk = self.chunks.get((chunk_col, chunk_row))
+        if chunk is None:
+            chunk = numpy.zeros((self.chunk_size, self.chunk_size), dtype=self.dtype)
+            self.chunks[(chunk_col, chunk_row)] = chunk
+        return chunk
+
+    def __getitem__(self, index):
+        row, col = index
+        col, row = self.check_tile(col, row)
+        size = self.chunk_size
+        chunk = self.chunks.get((col // size, row // size))
+        if chunk is None:
+            return self.dtype.type(0)
+        return chunk[row % size, col % size]
+
+    def __setitem__(self, index, value):
+        row, col = index
+        col, row = self.check_tile(col, row)
+        size = self.chunk_size
+        if not value and (col // size, row // size) not in self.chunks:
+            # Already 0
+            return
+        self.get_chunk(col // size, row // size)[row % size, col % size] = value
+
+    def group_by_chunk(self, cols, rows):
+        """
+        Split tiles by the chunk they're in.
+
+        Arguments:
+            cols {array} -- Column of each tile
+            rows {array} -- Row of each tile
+
+        Returns:
+            [((int, int), array, array)] -- Chunk key and the rows and
+                                            columns inside it of its tiles
+        """
+        cols = numpy.asarray(cols, dtype=numpy.intp)
+        rows = numpy.asarray(rows, dtype=numpy.intp)
+        if not len(cols):
+            return []
+        if (cols.min() < -self.cols or cols.max() >= self.cols
+                          or rows.min() < -self.rows or rows.max() >= self.rows):
+            raise IndexError("some tiles are out of bounds for a board of {0}x{1}".format(
+                self.cols, self.rows))
+        cols = cols % self.cols
+        rows = rows % self.rows
+
+        size = self.chunk_size
+        if self.cols <= size and self.rows <= size:
+            # The whole board is one chunk
+            return [((0, 0), rows, cols)]
+        chunks_across = -(-self.cols // size)
+        keys = (rows // size) * chunks_across + cols // size
+        order = numpy.argsort(keys)
+        keys, cols, rows = keys[order], cols[order], rows[order]
+        starts = numpy.flatnonzero(numpy.diff(keys)) + 1
+        groups = []
+        for key, chunk_cols, chunk_rows in zip(keys[numpy.r_[0, starts]].tolist(),
+                                               numpy.split(cols, starts), numpy.split(rows, starts)):
+            chunk_row, chunk_col = divmod(key, chunks_across)
+            groups.append(((chunk_col, chunk_row), chunk_rows % size, chunk_cols % size))
+        return groups
+
+    def set_many(self, cols, rows, value):
+        """
+        Give many tiles the same value.
+
+        Arguments:
+            cols {array} -- Column of each tile
+            rows {array} -- Row of each tile
+            value {int} -- The value to give them
+        """
+        for (chunk_col, chunk_row), chunk_rows, chunk_cols in self.group_by_chunk(cols, rows):
+            if not value and (chunk_col, chunk_row) not in self.chunks:
+                continue
+            self.get_chunk(chunk_col, chunk_row)[chunk_rows, chunk_cols] = value
+
+    def set_each(self, positions, value):
+        """
+        Give a few tiles the same value, one at a time, which
+        beats numpy's fixed cost per call for up to FEW_TILES.
+        Nothing is changed if any tile is out of bounds.
+
+        Arguments:
+            positions {[(int, int)]} -- Column and row of each tile
+            value {int} -- The value to give them
+        """
+        cols, rows = self.cols, self.rows
+        for col, row in positions:
+            if not (-cols <= col < cols and -rows <= row < rows):
+                raise IndexError("index ({0}, {1}) is out of bounds for a board of {2}x{3}".format(
+                    col, row, cols, rows))
+
+        size = self.chunk_size
+        if cols <= size and rows <= size:
+            # The whole board is one chunk
+            if not value and not self.chunks:
+                return
+            chunk = self.get_chunk(0, 0)
+            for col, row in positions:
+                chunk[row % rows, col % cols] = value
+            return
+        for col, row in positions:
+            col %= cols
+            row %= rows
+            key = (col // size, row // size)
+            if not value and key not in self.chunks:
+                # Already 0
+                continue
+            self.get_chunk(*key)[row % size, col % size] = value
+
+    def replace(self, old_value, new_value):
+        """
+        Change every tile holding old_value to new_value.
+        old_value can't be 0.
+        """
+        for chunk in self.chunks.values():
+            chunk[chunk == old_value] = new_value
+
+    def fill(self, value):
+        """
+        Give every tile the same value.
+        """
+        self.chunks.clear()
+        if value:
+            size = self.chunk_size
+            for chunk_row in range(-(-self.rows // size)):
+                for chunk_col in range(-(-self.cols // size)):
+                    # Edge chunks hang off the board, and those tiles stay 0
+                    chunk = self.get_chunk(chunk_col, chunk_row)
+                    chunk[:self.rows - chunk_row * size, :self.cols - chunk_col * size] = value
+
+    def find(self, value):
+        """
+        Returns the columns and rows of every tile holding a value,
+        as two arrays. The value can't be 0.
+        """
+        size = self.chunk_size
+        found_cols = []
+        found_rows = []
+        for (chunk_col, chunk_row), chunk in self.chunks.items():
+            rows, cols = numpy.nonzero(chunk == value)
+            found_cols.append(cols + chunk_col * size)
+            found_rows.append(rows + chunk_row * size)
+        if not found_cols:
+            return numpy.zeros(0, numpy.intp), numpy.zeros(0, numpy.intp)
+        return numpy.concatenate(found_cols), numpy.concatenate(found_rows)
+
+    def region(self, first_col, first_row, last_col, last_row):
+        """
+        Returns a copy of a rectangle of the board, indexed [row, col]
+        from its top left tile. Only the chunks under it are read.
+
+        Arguments:
+            first_col {int} -- Left column, included
+            first_row {int} -- Top row, included
+            last_col {int} -- Right column, included
+            last_row {int} -- Bottom row, included
+        """
+        size = self.chunk_size
+        region = numpy.zeros((last_row - first_row + 1, last_col - first_col + 1), dtype=self.dtype)
+        for chunk_row in range(first_row // size, last_row // size + 1):
+            for chunk_col in range(first_col // size, last_col // size + 1):
+                chunk = self.chunks.get((chunk_col, chunk_row))
+                if chunk is None:
+                    continue
+                # Overlap of the chunk and the region, in board tiles
+                top = max(first_row, chunk_row * size)
+                bottom = min(last_row, chunk_row * size + size - 1)
+                left = max(first_col, chunk_col * size)
+                right = min(last_col, chunk_col * size + size - 1)
+                region[top - first_row:bottom - first_row + 1, left - first_col:right - first_col + 1] = \
+                    chunk[top - chunk_row * size:bottom - chunk_row * size + 1,
+                          left - chunk_col * size:right - chunk_col * size + 1]
+        return region
+
+    def to_array(self):
+        """
+        Returns the whole board as one array indexed [row, col].
+        """
+        return self.region(0, 0, self.cols - 1, self.rows - 1)
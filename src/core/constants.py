@@ -0,0 +1,42 @@
+"""
+File: constants.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Constants of the game's rules, shared by the server,
+bots and the GUI.
+
+"""
+
+#########################################################################
+# CONSTANTS
+
+# Units per player
+MAX_UNITS = 3
+
+# Unit_types
+NO_UNIT = 0
+P1_TRIANGLE = 1
+P1_DIAMOND = 2
+P1_CIRCLE = 3
+P2_TRIANGLE = 4
+P2_DIAMOND = 5
+P2_CIRCLE = 6
+
+# Max. health values
+TRIANGLE_HEALTH = 4
+DIAMOND_HEALTH = 5
+CIRCLE_HEALTH = 3
+
+# Tile_types
+BLANK = 0
+HEALTH = 1
+HARM = 2
+MOVABLE = 3
+ATTACKABLE = 4
+
+# Grid size
+GRID_COLUMNS = 14
+GRID_ROWS = 12
+
+#########################################################################
@@ -0,0 +1,271 @@
+"""
+File: gamestate.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+"""
+
+from functools import lru_cache
+
+from src.core.constants import *
+from src.core.unit import ARCHETYPES, get_archetype
+
+# Changes kept for clients that are behind.
+# Older clients get the whole GameState instead.
+MAX_CHANGES = 256
+
+# Starting layouts kept before the least recently used is dropped
+STARTING_LOCATIONS_CACHE_SIZE = 16
+
+@lru_cache(maxsize=STARTING_LOCATIONS_CACHE_SIZE)
+def starting_locations(cols, rows, army_size=MAX_UNITS):
+    """
+    Returns where each unit is placed when a game begins.
+
+    Player 1's units start down the left column and
+    player 2's down the right, spread from the top row to the
+    bottom row. Armies taller than the board fill the next
+    column in, as many units to a column as there are rows.
+
+    Arguments:
+        cols {int} -- Number of columns on the grid
+        rows {int} -- Number of rows on the grid
+
+    Keyword Arguments:
+        army_size {int} -- Units per player (default: {MAX_UNITS})
+
+    Returns:
+        dict -- (col, row) keyed by unit_type, shared between calls
+    """
+    if -(-army_size // rows) > cols // 2:
+        raise ValueError("%d units per player don't fit on a %dx%d grid" % (army_size, cols, rows))
+
+    locations = {}
+    for index in range(army_size):
+        column, place = divmod(index, rows)
+        # Units in this column
+        count = min(rows, army_size - column * rows)
+        if count == 1:
+            row = rows // 2
+        else:
+            # Evenly spaced from top to bottom, rounded
+            row = (2 * place * (rows - 1) + count - 1) // (2 * (count - 1))
+        locations[index + 1] = (column, row)
+    for unit_type in range(1, army_size + 1):
+        column, row = locations[unit_type]
+        locations[army_size + unit_type] = (cols - 1 - column, row)
+    return locations
+
+class GameState:
+    """
+    The state of a match, owned by the server.
+
+    Every mutation bumps version and is logged as a change:
+    (version, field, key, value), where field is one of
+    "location", "health", "turn", "ready" or "winner".
+    Copies held by clients set changes to None and
+    don't keep a log.
+
+    Player 1 owns unit types 1 to army_size and player 2
+    the next army_size.
+    """
+
+    # Copies built without __init__ get the usual army
+    army_size = MAX_UNITS
+
+    def __init__(self, army_size=MAX_UNITS):
+        self.army_size = army_size
+
+        # Set to true if two clients are connected
+        self.ready_state = {1 : False, 2 : False}
+
+        # Keeps track of player turn
+        self.turn = {1 : True, 2 : False}
+
+        # Holds locations of all units
+        self.unit_locations = self.initialize_locations()
+        # Unit on each tile a unit has moved to, keyed by (col, row)
+        self.unit_tiles = {}
+
+        # Server keeps track of unit health
+        self.unit_health = self.initialize_health()
+
+        self.game_is_over = False
+        self.winner = None
+
+        # Incremented by every change
+        self.version = 0
+        self.changes = []
+
+    def record(self, field, key, value):
+        """
+        Log a change so it can be sent to clients.
+        Does nothing on copies that don't keep a log.
+        """
+        if self.changes is None:
+            return
+        self.version += 1
+        self.changes.append((self.version, field, key, value))
+        if len(self.changes) > MAX_CHANGES:
+            del self.changes[:len(self.changes) - MAX_CHANGES]
+
+    def changes_since(self, version):
+        """
+        Returns the changes made after a given version.
+
+        Arguments:
+            version {int} -- The last version the client has
+
+        Returns:
+            [tuple] -- Changes oldest first; empty if nothing changed
+                       Will be None if the log doesn't reach back that far
+        """
+        if version == self.version:
+            return []
+        if version > self.version or not self.changes:
+            return None
+        first_version = self.changes[0][0]
+        if version < first_version - 1:
+            return None
+        return self.changes[version - first_version + 1:]
+
+    def apply_changes(self, changes):
+        """
+        Bring a client's copy up to date with changes from the server.
+        """
+        for version, field, key, value in changes:
+            if field == "location":
+                self.set_location(key, value)
+            elif field == "health":
+                self.unit_health[key] = value
+            elif field == "turn":
+                self.turn = {1 : value == 1, 2 : value == 2}
+            elif field == "ready":
+                self.ready_state[key] = value
+            elif field == "winner":
+                self.winner = value
+                self.game_is_over = True
+            self.version = version
+
+    def is_players_turn(self, player_num):
+        return self.turn[player_num]
+
+    def get_turn(self):
+        players_turn = 0
+        for player, is_turn in self.turn.items():
+            if is_turn:
+                players_turn = player
+        return players_turn
+
+    def get_unit_location_by_type(self, unit_type):
+        return self.unit_locations[unit_type]
+
+    def set_location(self, unit_type, location):
+        """
+        Put a unit on a tile, or take it off the board with None.
+        """
+        old_location = self.unit_locations[unit_type]
+        if old_location is not None and self.unit_tiles.get(tuple(old_location)) == unit_type:
+            del self.unit_tiles[tuple(old_location)]
+        self.unit_locations[unit_type] = location
+        if location is not None:
+            self.unit_tiles[tuple(location)] = unit_type
+
+    def index_unit_tiles(self):
+        """
+        Rebuild unit_tiles from unit_locations.
+        """
+        self.unit_tiles = {tuple(location): unit_type
+                           for unit_type, location in self.unit_locations.items() if location is not None}
+    
+    def change_turns(self):
+        self.turn[1] = not self.turn[1]
+        self.turn[2] = not self.turn[2]
+        self.record("turn", None, self.get_turn())
+
+    def apply_turn(self, turn):
+        """
+        Apply a player's move and attack, then pass the turn.
+
+        Arguments:
+            turn {dict} -- Has keys move and attack, as sent by the client
+        """
+        move = turn["move"]
+        attack = turn["attack"]
+        if move:
+            self.move_unit(move)
+        if attack:
+            self.attack_unit(attack)
+            self.determine_if_game_over()
+        self.change_turns()
+
+    def move_unit(self, move):
+        # move is [unit_type, col, row]
+        unit_type, col, row = move
+        self.set_location(unit_type, [col, row])
+        self.record("location", unit_type, [col, row])
+
+    def attack_unit(self, attack):
+        # attack is [unit_type, attack_power] where unit_type is the unit being attacked
+        unit_type, attack_power = attack
+        self.unit_health[unit_type] -= attack_power
+        if self.unit_health[unit_type] <= 0:
+            self.unit_health[unit_type] = 0
+            self.set_location(unit_type, None)
+        self.record("health", unit_type, self.unit_health[unit_type])
+        if self.unit_locations[unit_type] is None:
+            self.record("location", unit_type, None)
+
+    def set_ready(self, player_num):
+        self.ready_state[player_num] = True
+        self.record("ready", player_num, True)
+
+    def ready(self):
+        return all(ready for ready in self.ready_state.values())
+
+    def get_players_units(self, player_num):
+        """
+        Returns the unit types owned by a player.
+        """
+        first = (player_num - 1) * self.army_size + 1
+        return range(first, first + self.army_size)
+
+    def determine_if_game_over(self):
+        unit_health = self.unit_health
+
+        # Game is over if either player has no health left
+        game_is_over = False
+        if not any(unit_health[unit] for unit in self.get_players_units(1)):
+            # Player 1 died, Player 2 wins
+            self.winner = 2
+            game_is_over = True
+        if not any(unit_health[unit] for unit in self.get_players_units(2)):
+            # Player 2 died, Player 1 wins
+            self.winner = 1
+            game_is_over = True
+
+        if game_is_over:
+            self.game_is_over = True
+            self.record("winner", None, self.winner)
+
+    def reset(self):
+        self.unit_locations = self.initialize_locations()
+        self.unit_tiles = {}
+        self.unit_health = self.initialize_health()
+        for unit_type, health in self.unit_health.items():
+            self.record("location", unit_type, None)
+            self.record("health", unit_type, health)
+
+        # Set both players to not ready
+        for player in self.ready_state.keys():
+            self.ready_state[player] = False
+            self.record("ready", player, False)
+
+
+    def initialize_locations(self):
+        # None until a unit moves off its starting tile
+        return dict.fromkeys(range(1, 2 * self.army_size + 1))
+
+    def initialize_health(self):
+        # Max health of each unit's archetype
+        return {unit_type: ARCHETYPES[get_archetype(unit_type, self.army_size)][1]
+                for unit_type in range(1, 2 * self.army_size + 1)}
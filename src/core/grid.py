@@ -0,0 +1,245 @@
+"""
+File: grid.py
+Programmers: Fernando Rodriguez, Charles Davis
+"""
+import itertools
+
+import numpy
+
+from src.core.bitboard import Bitboard
+from src.core.chunks import ChunkedArray, FEW_TILES
+from src.core.constants import *
+from src.core.pathfinding import Pathfinder, HIGHLIGHTS, get_terrain_cost
+
+class Grid:
+    """
+    Data structure representing the game
+    board and the state of each tile.
+
+    Every tile has two values, kept in two
+    ChunkedArrays indexed [row, col]:
+    tile_types (uint8) and unit_types
+    (uint16, for armies of thousands).
+    Only the chunks holding something take
+    memory, so large, mostly blank maps
+    are cheap.
+
+    With bitboard=True the grid also keeps
+    a Bitboard of the same tiles up to date,
+    and with pathfinder=True a Pathfinder.
+
+    tile_type {int} --
+        0 is blank
+        1 is health
+        2 is harm
+        3 is movable
+        4 is attackable
+
+    unit_type {int} --
+        0 is empty
+        1 to army_size are player1's units
+        army_size + 1 to 2 * army_size are player2's units
+    """
+
+    def __init__(self, cols=GRID_COLUMNS, rows=GRID_ROWS, bitboard=False, pathfinder=False,
+                 army_size=MAX_UNITS):
+        """
+        Set up tile grid and units.
+
+        Keyword Arguments:
+            cols {int} -- Number of columns (default: {GRID_COLUMNS})
+            rows {int} -- Number of rows (default: {GRID_ROWS})
+            bitboard {bool} -- Keep a Bitboard of the grid (default: {False})
+            pathfinder {bool} -- Keep a Pathfinder of the grid (default: {False})
+            army_size {int} -- Units per player (default: {MAX_UNITS})
+        """
+        # 0 in both arrays means the tile
+        # is blank and no unit is present.
+        self.cols = cols
+        self.rows = rows
+        self.army_size = army_size
+        self.tile_types = ChunkedArray(cols, rows)
+        self.unit_types = ChunkedArray(cols, rows, numpy.uint16)
+        self.bitboard = Bitboard.from_grid(self) if bitboard else None
+        self.pathfinder = Pathfinder(cols, rows) if pathfinder else None
+
+    def tile_in_move_range(self, col, row):
+        return self.get_tile_type(col, row) == 3
+
+    def tile_in_attack_range(self, col, row):
+        return self.get_tile_type(col, row) == 4
+
+    def set_tile_type(self, col, row, tile_type=0):
+        """
+        Change the type of a given tile.
+
+        Arguments:
+            col {int} -- The column of the tile to change
+            row {int} -- The row of the tile to change
+
+        Keyword Arguments:
+            tile_type {int} -- 0=blank, 1=health, 2=harm (default: {0})
+        """
+
+        try:
+            old_type = self.tile_types[row, col]
+            self.tile_types[row, col] = tile_type
+        except IndexError as e:
+            print("[Error]: Tile at Column: {0} Row: {1} doesn't exist.".format(
+                col, row))
+            print("       ", e)
+            return
+        if self.bitboard is not None:
+            # Negative indices wrap around like they do in the arrays
+            self.bitboard.set_tile(col % self.cols, row % self.rows, tile_type, int(old_type))
+        if self.pathfinder is not None and tile_type not in HIGHLIGHTS:
+            self.pathfinder.set_cost(col % self.cols, row % self.rows, get_terrain_cost(tile_type))
+
+    def get_tile_type(self, col, row):
+        """
+        Returns the type of tile at given column and row.
+
+        Arguments:
+            col {int} -- The column of the tile
+            row {int} -- The row of the tile
+
+        Returns:
+            int -- The tile_type of given tile
+                   Will be -1 if tile doesn't exist
+        """
+
+        try:
+            return int(self.tile_types[row, col])
+        except IndexError as e:
+            print("[Error]: Tile at Column: {0} Row: {1} doesn't exist.".format(
+                col, row))
+            print("       ", e)
+            return -1
+
+    def get_unit_type(self, col, row):
+        """
+        Returns the unit type at given column and row.
+
+        Arguments:
+            column {int} -- The column of the tile
+            row {int} -- The row of the tile
+
+        Returns:
+            int -- The unit_type at a given tile
+                   Will be -1 if tile doesn't exist
+        """
+        try:
+            return int(self.unit_types[row, col])
+        except IndexError as e:
+            print("[Error]: Tile at Column: {0} Row: {1} doesn't exist.".format(
+                col, row))
+            print("       ", e)
+            return -1
+
+    def set_unit_type(self, col, row, unit_type):
+        """
+        Change the unit_type on a given grid tile.
+
+        Arguments:
+            col {int} -- The column of the tile
+            row {int} -- The row of the tile
+            unit_type {int} -- 0=blank, otherwise the unit's type
+        """
+
+        try:
+            old_type = self.unit_types[row, col]
+            self.unit_types[row, col] = unit_type
+        except IndexError as e:
+            print("[Error]: Tile at Column: {0} Row: {1} doesn't exist.".format(
+                col, row))
+            print("       ", e)
+            return
+        if self.bitboard is not None:
+            # Negative indices wrap around like they do in the arrays
+            self.bitboard.set_unit(col % self.cols, row % self.rows, unit_type, int(old_type))
+        if self.pathfinder is not None:
+            self.pathfinder.set_blocked(col % self.cols, row % self.rows, unit_type != 0)
+
+    def set_tile_types(self, positions, tile_type):
+        """
+        Change the type of many tiles at once.
+
+        Arguments:
+            positions {[(int, int)]} -- Column and row of each tile to change,
+                                        or an array of them with shape (N, 2)
+            tile_type {int} -- The tile_type to give them
+        """
+        if not len(positions):
+            return
+        few = not isinstance(positions, numpy.ndarray) and len(positions) <= FEW_TILES
+        try:
+            if few:
+                # A few tiles, like a unit's range on the usual board,
+                # are quicker one at a time than through numpy
+                self.tile_types.set_each(positions, tile_type)
+            else:
+                if not isinstance(positions, numpy.ndarray):
+                    # Much quicker than numpy.asarray for a list of pairs
+                    positions = numpy.fromiter(itertools.chain.from_iterable(positions),
+                                               dtype=numpy.intp, count=2 * len(positions)).reshape(-1, 2)
+                self.tile_types.set_many(positions[:, 0], positions[:, 1], tile_type)
+        except IndexError as e:
+            print("[Error]: Some of the tiles don't exist.")
+            print("       ", e)
+            return
+        if self.bitboard is None and (self.pathfinder is None or tile_type in HIGHLIGHTS):
+            return
+
+        # Only the changed tiles are updated, so this costs
+        # the same however big the board is
+        if few:
+            cols = [col % self.cols for col, _ in positions]
+            rows = [row % self.rows for _, row in positions]
+        else:
+            cols = positions[:, 0] % self.cols
+            rows = positions[:, 1] % self.rows
+        if self.bitboard is not None:
+            self.bitboard.set_tiles(cols, rows, tile_type)
+        if self.pathfinder is not None and tile_type not in HIGHLIGHTS:
+            self.pathfinder.set_costs(cols, rows, get_terrain_cost(tile_type))
+
+    def clear_tile_type(self, tile_type):
+        """
+        Set every tile of a given type back to blank,
+        e.g. to remove highlighting.
+
+        Arguments:
+            tile_type {int} -- The tile_type to clear
+        """
+        if tile_type == BLANK:
+            return
+        if self.pathfinder is not None:
+            # Only rough tiles cost other than blank: terrain of this type,
+            # or highlights that kept the cost of the terrain under them
+            for col, row in self.pathfinder.get_rough_tiles():
+                if self.tile_types[row, col] == tile_type:
+                    self.pathfinder.set_cost(col, row, get_terrain_cost(BLANK))
+        self.tile_types.replace(tile_type, BLANK)
+        if self.bitboard is not None:
+            self.bitboard.tiles.pop(tile_type, None)
+
+    def clear_tiles(self):
+        """
+        Set every tile back to blank, leaving units where they are.
+        """
+        if self.pathfinder is not None:
+            for col, row in self.pathfinder.get_rough_tiles():
+                self.pathfinder.set_cost(col, row, get_terrain_cost(BLANK))
+        self.tile_types.fill(BLANK)
+        if self.bitboard is not None:
+            self.bitboard.tiles.clear()
+
+    def find_tiles(self, tile_type):
+        """
+        Returns the (col, row) of every tile of a given type.
+        """
+        if tile_type == BLANK:
+            rows, cols = numpy.nonzero(self.tile_types.to_array() == BLANK)
+        else:
+            cols, rows = self.tile_types.find(tile_type)
+        return list(zip(cols.tolist(), rows.tolist()))
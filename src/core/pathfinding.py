@@ -0,0 +1,245 @@
+"""
+File: pathfinding.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Works out where a unit can get to and how, going around other
+units and paying for the terrain it crosses.
+
+A unit steps to any of the eight tiles around it. Entering a tile
+costs TERRAIN_COSTS of its tile type, 1 unless listed, and a unit
+may spend up to its speed. Tiles holding a unit can't be entered
+or crossed. On open, even ground this gives the same square as
+Unit.get_range.
+
+Searches are Dijkstra's algorithm, stopped once the budget is
+spent, so they only look at tiles near the unit however big the
+board is. Results are cached until something changes inside the
+square they could reach; the cache is bucketed by area so a move
+only throws away results near it.
+
+"""
+
+import collections
+import heapq
+
+from src.core.constants import HARM, MOVABLE, ATTACKABLE
+
+# Cost of entering a tile of each tile_type, 1 if not listed
+TERRAIN_COSTS = {HARM : 2}
+
+# Tile types drawn over the terrain that don't change what it costs
+HIGHLIGHTS = frozenset((MOVABLE, ATTACKABLE))
+
+# Searches kept before the least recently used is dropped
+MAX_CACHED_SEARCHES = 1024
+
+# Side in tiles of the square areas cached searches are filed under
+BUCKET_SIZE = 16
+
+# (col, row) offsets of the tiles a unit can step to
+STEPS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+def get_terrain_cost(tile_type):
+    return TERRAIN_COSTS.get(tile_type, 1)
+
+
+class Reach:
+    """
+    Everywhere a unit can get to from one tile with one budget.
+
+    Has attributes:
+        start {(int, int)} -- The tile searched from
+        budget {int} -- The most that could be spent
+        costs {dict} -- Cheapest cost of every tile reached, keyed by (col, row)
+    """
+
+    __slots__ = ("start", "budget", "costs", "previous", "box", "_tiles")
+
+    def __init__(self, start, budget, costs, previous, box):
+        self.start = start
+        self.budget = budget
+        self.costs = costs
+        # Tile each tile is cheapest reached from
+        self.previous = previous
+        # (first_col, first_row, last_col, last_row) that could affect the result
+        self.box = box
+        self._tiles = None
+
+    @property
+    def tiles(self):
+        """
+        frozenset -- (col, row) of every tile reached, including the start
+        """
+        if self._tiles is None:
+            self._tiles = frozenset(self.costs)
+        return self._tiles
+
+    def get_path(self, col, row):
+        """
+        Returns the cheapest path to a tile, from the start to the
+        tile, as a list of (col, row). Will be None if it can't be reached.
+        """
+        tile = (col, row)
+        if tile not in self.costs:
+            return None
+        path = [tile]
+        while tile != self.start:
+            tile = self.previous[tile]
+            path.append(tile)
+        path.reverse()
+        return path
+
+
+class Pathfinder:
+    """
+    Finds and caches reachable tiles on one board.
+    """
+
+    def __init__(self, cols, rows):
+        self.cols = cols
+        self.rows = rows
+
+        # Cost of entering and whether a unit is on each tile, indexed by row * cols + col
+        self.costs = [1] * (cols * rows)
+        self.blocked = bytearray(cols * rows)
+        # Indices of the tiles costing more than 1
+        self.rough = set()
+
+        # Reach keyed by (col, row, budget), least recently used first
+        self.cache = collections.OrderedDict()
+        # Keys of the cached searches that could reach into each bucket
+        self.buckets = collections.defaultdict(set)
+
+    def set_blocked(self, col, row, blocked):
+        """
+        Mark whether a tile holds a unit.
+        """
+        index = row * self.cols + col
+        if self.blocked[index] != blocked:
+            self.blocked[index] = blocked
+            self.invalidate(col, row)
+
+    def set_cost(self, col, row, cost):
+        """
+        Change what entering a tile costs. Costs are at least 1.
+        """
+        index = row * self.cols + col
+        if self.costs[index] != cost:
+            self.costs[index] = cost
+            if cost > 1:
+                self.rough.add(index)
+            else:
+                self.rough.discard(index)
+            self.invalidate(col, row)
+
+    def set_costs(self, cols, rows, cost):
+        """
+        Change what entering many tiles costs.
+
+        Arguments:
+            cols {list or array} -- Column of each tile
+            rows {list or array} -- Row of each tile
+            cost {int} -- What entering each of them costs
+        """
+        if not isinstance(cols, list):
+            cols, rows = cols.tolist(), rows.tolist()
+        for col, row in zip(cols, rows):
+            self.set_cost(col, row, cost)
+
+    def get_rough_tiles(self):
+        """
+        Returns the (col, row) of every tile costing more than 1.
+        """
+        return [(index % self.cols, index // self.cols) for index in self.rough]
+
+    def clear(self):
+        self.cache.clear()
+        self.buckets.clear()
+
+    def invalidate(self, col, row):
+        """
+        Drop cached searches that could have reached a tile.
+        """
+        bucket = self.buckets.get((col // BUCKET_SIZE, row // BUCKET_SIZE))
+        if not bucket:
+            return
+        for key in list(bucket):
+            first_col, first_row, last_col, last_row = self.cache[key].box
+            if first_col <= col <= last_col and first_row <= row <= last_row:
+                self.forget(key)
+
+    def forget(self, key):
+        first_col, first_row, last_col, last_row = self.cache.pop(key).box
+        for bucket_row in range(first_row // BUCKET_SIZE, last_row // BUCKET_SIZE + 1):
+            for bucket_col in range(first_col // BUCKET_SIZE, last_col // BUCKET_SIZE + 1):
+                bucket = self.buckets[(bucket_col, bucket_row)]
+                bucket.discard(key)
+                if not bucket:
+                    del self.buckets[(bucket_col, bucket_row)]
+
+    def get_reach(self, col, row, budget):
+        """
+        Returns everywhere a unit on a tile can get to, spending up to budget.
+
+        Arguments:
+            col {int} -- Column of the unit
+            row {int} -- Row of the unit
+            budget {int} -- Most the unit may spend, i.e. its speed
+
+        Returns:
+            Reach -- Tiles reached and the paths to them, shared between calls
+        """
+        key = (col, row, budget)
+        reach = self.cache.get(key)
+        if reach is not None:
+            self.cache.move_to_end(key)
+            return reach
+
+        reach = self.search(col, row, budget)
+        self.cache[key] = reach
+        first_col, first_row, last_col, last_row = reach.box
+        for bucket_row in range(first_row // BUCKET_SIZE, last_row // BUCKET_SIZE + 1):
+            for bucket_col in range(first_col // BUCKET_SIZE, last_col // BUCKET_SIZE + 1):
+                self.buckets[(bucket_col, bucket_row)].add(key)
+        if len(self.cache) > MAX_CACHED_SEARCHES:
+            self.forget(next(iter(self.cache)))
+        return reach
+
+    def search(self, col, row, budget):
+        cols, rows = self.cols, self.rows
+        costs, blocked = self.costs, self.blocked
+        start = row * cols + col
+        spent_on = {start : 0}
+        previous = {}
+        heap = [(0, start)]
+        while heap:
+            spent, index = heapq.heappop(heap)
+            if spent > spent_on[index]:
+                # Already reached for less
+                continue
+            tile_col, tile_row = index % cols, index // cols
+            for step_col, step_row in STEPS:
+                next_col = tile_col + step_col
+                next_row = tile_row + step_row
+                if not (0 <= next_col < cols and 0 <= next_row < rows):
+                    continue
+                next_index = next_row * cols + next_col
+                if blocked[next_index]:
+                    continue
+                total = spent + costs[next_index]
+                if total <= budget and total < spent_on.get(next_index, budget + 1):
+                    spent_on[next_index] = total
+                    previous[next_index] = index
+                    heapq.heappush(heap, (total, next_index))
+
+        # Every step costs at least 1, so nothing past budget tiles away matters
+        box = (max(col - budget, 0), max(row - budget, 0),
+               min(col + budget, cols - 1), min(row + budget, rows - 1))
+        return Reach(
+            (col, row),
+            budget,
+            {(index % cols, index // cols): spent for index, spent in spent_on.items()},
+            {(index % cols, index // cols): (tile % cols, tile // cols) for index, tile in previous.items()},
+            box)
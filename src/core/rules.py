@@ -0,0 +1,221 @@
+"""
+File: rules.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Checks turns against the rules of the game before the
+server applies them.
+
+A turn is a move of one of the player's living units to an
+empty tile it can reach, optionally followed by that unit
+attacking an enemy in its attack range with its own attack
+power. A turn with neither a move nor an attack passes.
+
+Where a unit can reach is decided by pathfinding.py, the same way
+the client's Board highlights it: eight directions, spending up to
+the unit's speed and going around other units. The server has no
+terrain, so every tile costs what a blank one does. Each GameState
+checked gets its own Pathfinder, brought up to date from the
+GameState's change log, or by checking every unit's tile if it keeps
+none, so its searches stay cached between turns.
+
+Attack ranges come from range_tiles() in unit.py, but are worked
+out once per board size: each tile gets a bitmask of the tiles in
+range, with bit (row * cols + col) set for tile (col, row). Checking
+an attack is then a shift and an AND instead of building a list.
+
+"""
+
+import weakref
+from functools import lru_cache
+
+from src.core.constants import MAX_UNITS
+from src.core.gamestate import starting_locations
+from src.core.pathfinding import Pathfinder
+from src.core.unit import Unit, range_tiles
+
+# Range tables kept before the least recently used is dropped
+RANGE_TABLE_CACHE_SIZE = 16
+
+
+@lru_cache(maxsize=RANGE_TABLE_CACHE_SIZE)
+def range_table(cols, rows, distance):
+    """
+    Returns the tiles within a distance of every tile.
+
+    Arguments:
+        cols {int} -- Number of columns on the grid
+        rows {int} -- Number of rows on the grid
+        distance {int} -- A unit's speed or attack range
+
+    Returns:
+        [int] -- Bitmask of tiles in range, indexed by row * cols + col
+    """
+    table = []
+    for row in range(rows):
+        for col in range(cols):
+            mask = 0
+            for tile_col, tile_row in range_tiles(col, row, distance, cols, rows):
+                mask |= 1 << (tile_row * cols + tile_col)
+            table.append(mask)
+    return table
+
+
+class TurnValidator:
+    """
+    Decides whether a turn is legal for a given GameState.
+    """
+
+    def __init__(self, cols, rows, army_size=MAX_UNITS):
+        self.cols = cols
+        self.rows = rows
+        self.army_size = army_size
+        self.starting_locations = starting_locations(cols, rows, army_size)
+
+        # Unit types owned by each player
+        self.player_units = {
+            1 : frozenset(range(1, army_size + 1)),
+            2 : frozenset(range(army_size + 1, 2 * army_size + 1)),
+        }
+
+        # Starting tile of every unit type, keyed by tile
+        self.starting_tiles = {row * cols + col: unit_type
+                               for unit_type, (col, row) in self.starting_locations.items()}
+
+        # Speed, attack range table and attack power of every unit type
+        self.speed = {}
+        self.attack_ranges = {}
+        self.attack_power = {}
+        for unit_type in self.starting_locations:
+            unit = Unit(unit_type, army_size)
+            self.speed[unit_type] = unit.speed
+            self.attack_ranges[unit_type] = range_table(cols, rows, unit.attack_range)
+            self.attack_power[unit_type] = unit.attack_power
+
+        # (Pathfinder, tile of each living unit, version) of each GameState checked
+        self.pathfinders = weakref.WeakKeyDictionary()
+
+    def get_tile(self, gamestate, unit_type):
+        # Units that haven't moved yet are on their starting tile
+        location = gamestate.unit_locations[unit_type]
+        if location is None:
+            col, row = self.starting_locations[unit_type]
+        else:
+            col, row = location
+        return row * self.cols + col
+
+    def get_pathfinder(self, gamestate):
+        """
+        Returns a Pathfinder of a GameState's board, with a tile
+        blocked for each living unit.
+        """
+        entry = self.pathfinders.get(gamestate)
+        if entry is None:
+            pathfinder = Pathfinder(self.cols, self.rows)
+            unit_tiles = {}
+            changed = gamestate.unit_health
+        else:
+            pathfinder, unit_tiles, version = entry
+            changes = None
+            # Copies that keep no change log never move their version
+            if gamestate.changes is not None:
+                changes = gamestate.changes_since(version)
+            if changes is None:
+                # Every unit is checked against the tile it had
+                changed = gamestate.unit_health
+            else:
+                changed = {unit_type for _, field, unit_type, _ in changes if field in ("location", "health")}
+
+        tiles = {}
+        for unit_type in changed:
+            tile = self.get_tile(gamestate, unit_type) if gamestate.unit_health[unit_type] > 0 else None
+            if tile != unit_tiles.get(unit_type):
+                tiles[unit_type] = tile
+        # Every unit leaves its old tile before any takes a new one
+        for unit_type in tiles:
+            old_tile = unit_tiles.pop(unit_type, None)
+            if old_tile is not None:
+                pathfinder.set_blocked(old_tile % self.cols, old_tile // self.cols, False)
+        for unit_type, tile in tiles.items():
+            if tile is not None:
+                unit_tiles[unit_type] = tile
+                pathfinder.set_blocked(tile % self.cols, tile // self.cols, True)
+
+        self.pathfinders[gamestate] = (pathfinder, unit_tiles, gamestate.version)
+        return pathfinder
+
+    def get_reach(self, gamestate, unit_type):
+        """
+        Returns everywhere a unit can move to this turn,
+        as a Reach that includes the tile it's on.
+        """
+        tile = self.get_tile(gamestate, unit_type)
+        return self.get_pathfinder(gamestate).get_reach(
+            tile % self.cols, tile // self.cols, self.speed[unit_type])
+
+    def is_occupied(self, gamestate, col, row):
+        """
+        Returns true if a living unit is on a tile.
+        Dead units have no location.
+        """
+        if (col, row) in gamestate.unit_tiles:
+            return True
+        # A unit that hasn't moved or died is still on its starting tile
+        unit_type = self.starting_tiles.get(row * self.cols + col)
+        return (unit_type is not None and gamestate.unit_locations[unit_type] is None
+                and gamestate.unit_health[unit_type] > 0)
+
+    def validate(self, gamestate, player_num, turn):
+        """
+        Check a turn before it's applied.
+
+        Arguments:
+            gamestate {GameState} -- The match's state before the turn
+            player_num {int} -- Player who sent the turn
+            turn {dict} -- Has keys move and attack, as sent by the client
+
+        Returns:
+            str -- Why the turn is illegal
+                   Will be None if the turn can be applied
+        """
+        if gamestate.game_is_over:
+            return "game is over"
+        if not gamestate.turn[player_num]:
+            return "not your turn"
+
+        move = turn["move"]
+        attack = turn["attack"]
+        if move is None:
+            if attack is not None:
+                return "attack without a move"
+            return None
+
+        # Move
+        unit_type, col, row = move
+        unit_health = gamestate.unit_health
+        if unit_type not in self.player_units[player_num]:
+            return "not your unit"
+        if not unit_health[unit_type]:
+            return "unit is dead"
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return "off the board"
+        if (col, row) not in self.get_reach(gamestate, unit_type).tiles:
+            return "out of move range"
+        if self.is_occupied(gamestate, col, row):
+            return "tile is occupied"
+
+        if attack is None:
+            return None
+
+        # Attack, made by the unit that just moved
+        target_type, attack_power = attack
+        if target_type not in self.player_units[3 - player_num]:
+            return "not an enemy unit"
+        if not unit_health[target_type]:
+            return "target is dead"
+        if attack_power != self.attack_power[unit_type]:
+            return "wrong attack power"
+        if not self.attack_ranges[unit_type][row * self.cols + col] >> self.get_tile(gamestate, target_type) & 1:
+            return "out of attack range"
+
+        return None
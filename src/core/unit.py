@@ -0,0 +1,188 @@
+"""
+File: unit.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+"""
+from functools import lru_cache
+
+from src.core.constants import *
+
+# Ranges kept by range_tiles() before the least recently used is dropped
+RANGE_CACHE_SIZE = 4096
+
+# Name, max health, attack power, attack range and speed of each kind of unit
+ARCHETYPES = (
+    ("triangle", TRIANGLE_HEALTH, 1, 3, 3),
+    ("diamond", DIAMOND_HEALTH, 2, 2, 2),
+    ("circle", CIRCLE_HEALTH, 3, 1, 2),
+)
+
+
+@lru_cache(maxsize=RANGE_CACHE_SIZE)
+def range_tiles(col, row, distance, max_col, max_row):
+    """
+    Returns the tiles up to distance away from a tile in both
+    directions, including the tile itself, that are on the board.
+
+    Arguments:
+        col {int} -- Column of the tile
+        row {int} -- Row of the tile
+        distance {int} -- A unit's speed or attack range
+        max_col {int} -- Number of columns
+        max_row {int} -- Number of rows
+
+    Returns:
+        frozenset -- (col, row) of every tile in range
+    """
+    cols = range(max(col - distance, 0), min(col + distance + 1, max_col))
+    rows = range(max(row - distance, 0), min(row + distance + 1, max_row))
+    return frozenset((tile_col, tile_row) for tile_col in cols for tile_row in rows)
+
+
+def get_archetype(unit_type, army_size=MAX_UNITS):
+    """
+    Returns the index in ARCHETYPES of a unit type. Each army
+    cycles through them: triangle, diamond, circle, triangle...
+    """
+    return (unit_type - 1) % army_size % len(ARCHETYPES)
+
+
+def get_owner(unit_type, army_size=MAX_UNITS):
+    """
+    Returns the player who owns a unit type, 0 if nobody does.
+    Player 1 has types 1 to army_size and player 2 the next army_size.
+    """
+    if 1 <= unit_type <= army_size:
+        return 1
+    if army_size < unit_type <= 2 * army_size:
+        return 2
+    return 0
+
+
+class Unit:
+    """
+    A player's unit on the gameboard.
+
+    Has attributes: health, speed, attack_power
+    """
+
+    __slots__ = ("type", "army_size", "max_health", "health", "attack_power", "attack_range",
+                 "speed", "is_moving", "is_alive", "pos", "archetype")
+
+    def __init__(self, unit_type, army_size=MAX_UNITS):
+        """
+        Sets up player unit.
+
+        Arguments:
+            unit_type -- Determines player number and unit attributes
+
+        Keyword Arguments:
+            army_size {int} -- Units per player (default: {MAX_UNITS})
+        """
+        self.type = unit_type
+        self.army_size = army_size
+
+        # Determine unit attributes
+        archetype, max_health, attack_power, attack_range, speed = \
+            ARCHETYPES[get_archetype(unit_type, army_size)]
+
+        self.max_health = max_health
+        self.health = max_health
+        self.attack_power = attack_power
+        self.attack_range = attack_range
+        self.speed = speed
+        self.is_moving = False
+        self.is_alive = True
+        # pos = [col, row]
+        self.pos = [None, None]
+        self.archetype = archetype
+
+    def reduce_health(self, amount):
+        """
+        Subtracts the given amount from health.
+
+        Arguments:
+            amount {int} -- The health to remove
+        """
+        self.health = self.health - amount
+
+        if self.health <= 0:
+            self.health = 0
+            self.is_alive = False
+
+    def add_health(self, amount):
+        """
+        Heals the unit by given amount.
+
+        Arguments:
+            amount {int} -- The health to add
+        """
+        self.health = self.health + amount
+
+        if self.health > self.max_health:
+            self.health = self.max_health
+
+    def change_health(self, health):
+        """
+        Change the health of the unit.
+        """
+        self.health = health
+        if self.health <= 0:
+            self.health = 0
+            self.is_alive = False
+
+    def attack(self, enemy_unit):
+        """
+        Effects health of given unit.
+        
+        Arguments:
+            enemy_unit {Unit} -- The unit to attack
+        """
+        enemy_unit.reduce_health(self.attack_power)
+
+
+    def get_range(self, range_type, max_col, max_row):
+        """
+        Returns the tiles the unit can move to or attack.
+
+        Arguments:
+            range_type {string} -- Range type to calculate (attack, move)
+            max_col {int}       -- Number of columns
+            max_row {int}       -- Number of rows
+
+        Returns:
+            frozenset -- (col, row) of every tile in range, shared between calls
+        """
+        #Determine range type based on input
+        if range_type == "attack":
+            unit_range = self.attack_range
+        elif range_type == "move":
+            unit_range = self.speed
+        else:
+            return frozenset()
+
+        # Unit pos is [col, row]
+        return range_tiles(self.pos[0], self.pos[1], unit_range, max_col, max_row)
+
+    def is_triangle(self):
+        return self.archetype == "triangle"
+
+    def is_diamond(self):
+        return self.archetype == "diamond"
+
+    def is_circle(self):
+        return self.archetype == "circle"
+
+    def is_players_unit(self, player_num):
+        return get_owner(self.type, self.army_size) == player_num
+
+    def get_owning_player(self):
+        """
+        Returns the player who owns this unit.
+        """
+        return get_owner(self.type, self.army_size)
+    
+    def col(self):
+        return self.pos[0]
+    
+    def row(self):
+        return self.pos[1]
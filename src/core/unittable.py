@@ -0,0 +1,266 @@
+"""
+File: unittable.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Every unit of a match in a handful of numpy arrays, for armies
+of hundreds or thousands of units a side.
+
+A Unit object per unit costs a few hundred bytes and updating
+many of them is a Python loop. UnitTable keeps one array per
+stat instead, indexed by unit_type (index 0 is unused), so a
+unit is a couple of dozen bytes and a whole turn of attacks or
+moves is a few array operations.
+
+table[unit_type] gives a UnitView, which reads and writes the
+arrays but answers like a Unit, for code that works on one unit
+at a time.
+
+Bots keep one for the match, built from the GameState and then
+updated with the server's changes (see Bot.get_units), so a
+server can be loaded with armies of any size.
+
+"""
+
+import numpy
+
+from src.core.constants import MAX_UNITS
+from src.core.gamestate import starting_locations
+from src.core.unit import ARCHETYPES, get_archetype, get_owner, range_tiles
+
+# Column and row of a unit that isn't on the board
+NO_POSITION = -1
+
+
+class UnitTable:
+    """
+    Stats and positions of both players' units.
+
+    Has attributes, all arrays indexed by unit_type:
+        health, max_health {int16} -- Current and full health
+        attack_power, attack_range, speed {uint8} -- The unit's archetype's stats
+        owner {uint8} -- Player who owns the unit
+        archetype {uint8} -- Index of the unit's archetype in ARCHETYPES
+        col, row {int16} -- Where the unit is, NO_POSITION if it isn't on the board
+    """
+
+    def __init__(self, army_size=MAX_UNITS):
+        self.army_size = army_size
+        unit_types = numpy.arange(2 * army_size + 1)
+
+        self.owner = numpy.zeros(len(unit_types), numpy.uint8)
+        self.owner[1:army_size + 1] = 1
+        self.owner[army_size + 1:] = 2
+
+        # Each army cycles through the archetypes, as get_archetype does
+        self.archetype = ((unit_types - 1) % army_size % len(ARCHETYPES)).astype(numpy.uint8)
+        self.archetype[0] = 0
+        stats = numpy.array([archetype[1:] for archetype in ARCHETYPES])[self.archetype]
+        self.max_health = stats[:, 0].astype(numpy.int16)
+        self.attack_power = stats[:, 1].astype(numpy.uint8)
+        self.attack_range = stats[:, 2].astype(numpy.uint8)
+        self.speed = stats[:, 3].astype(numpy.uint8)
+        self.max_health[0] = 0
+        self.health = self.max_health.copy()
+
+        self.col = numpy.full(len(unit_types), NO_POSITION, numpy.int16)
+        self.row = numpy.full(len(unit_types), NO_POSITION, numpy.int16)
+
+    @classmethod
+    def from_gamestate(cls, gamestate, cols, rows):
+        """
+        Returns the units of a GameState. Units that haven't
+        moved are on their starting tile.
+        """
+        table = cls(gamestate.army_size)
+        table.place(starting_locations(cols, rows, gamestate.army_size))
+        unit_health = gamestate.unit_health
+        table.health[list(unit_health)] = list(unit_health.values())
+        table.place({unit_type: location for unit_type, location in gamestate.unit_locations.items()
+                     if location is not None})
+        # Dead units are off the board
+        dead = table.health <= 0
+        table.col[dead] = table.row[dead] = NO_POSITION
+        return table
+
+    def __len__(self):
+        return 2 * self.army_size
+
+    def __getitem__(self, unit_type):
+        if not 1 <= unit_type <= 2 * self.army_size:
+            raise IndexError("no unit type %d" % unit_type)
+        return UnitView(self, unit_type)
+
+    @property
+    def nbytes(self):
+        """
+        int -- Bytes held by the arrays
+        """
+        return sum(array.nbytes for array in (
+            self.health, self.max_health, self.attack_power, self.attack_range,
+            self.speed, self.owner, self.archetype, self.col, self.row))
+
+    def place(self, locations):
+        """
+        Put units on the board.
+
+        Arguments:
+            locations {dict} -- (col, row) keyed by unit_type, as starting_locations returns
+        """
+        if not locations:
+            return
+        unit_types = numpy.fromiter(locations.keys(), numpy.intp, len(locations))
+        positions = numpy.array(list(locations.values()), numpy.int16).reshape(-1, 2)
+        self.col[unit_types] = positions[:, 0]
+        self.row[unit_types] = positions[:, 1]
+
+    def move(self, unit_types, cols, rows):
+        """
+        Move many units at once.
+
+        Arguments:
+            unit_types {array} -- Units to move
+            cols {array} -- Column each unit moves to
+            rows {array} -- Row each unit moves to
+        """
+        self.col[unit_types] = cols
+        self.row[unit_types] = rows
+
+    def damage(self, unit_types, amounts):
+        """
+        Take health from many units at once. A unit listed
+        more than once takes every amount.
+
+        Arguments:
+            unit_types {array} -- Units hit
+            amounts {array or int} -- Health taken from each
+
+        Returns:
+            array -- Unit types that were alive and now aren't
+        """
+        unit_types = numpy.asarray(unit_types, numpy.intp)
+        was_alive = self.health[unit_types] > 0
+        numpy.subtract.at(self.health, unit_types, amounts)
+        numpy.maximum(self.health, 0, out=self.health)
+
+        killed = numpy.unique(unit_types[was_alive & (self.health[unit_types] == 0)])
+        self.col[killed] = NO_POSITION
+        self.row[killed] = NO_POSITION
+        return killed
+
+    def apply_changes(self, changes):
+        """
+        Bring the units up to date with GameState changes.
+        Changes to fields other than units are ignored.
+        """
+        for version, field, unit_type, value in changes:
+            if field == "location":
+                if value is None:
+                    self.col[unit_type] = self.row[unit_type] = NO_POSITION
+                else:
+                    self.col[unit_type], self.row[unit_type] = value
+            elif field == "health":
+                self.health[unit_type] = value
+
+    def living(self, player_num=None):
+        """
+        Returns the unit types with health left, of one player or both.
+        """
+        alive = self.health > 0
+        if player_num is not None:
+            alive &= self.owner == player_num
+        return numpy.flatnonzero(alive)
+
+    def is_defeated(self, player_num):
+        return not numpy.any(self.health[self.owner == player_num])
+
+
+class UnitView:
+    """
+    One unit of a UnitTable, answering like a Unit.
+    """
+
+    __slots__ = ("table", "type")
+
+    def __init__(self, table, unit_type):
+        self.table = table
+        self.type = unit_type
+
+    @property
+    def health(self):
+        return int(self.table.health[self.type])
+
+    @property
+    def max_health(self):
+        return int(self.table.max_health[self.type])
+
+    @property
+    def attack_power(self):
+        return int(self.table.attack_power[self.type])
+
+    @property
+    def attack_range(self):
+        return int(self.table.attack_range[self.type])
+
+    @property
+    def speed(self):
+        return int(self.table.speed[self.type])
+
+    @property
+    def is_alive(self):
+        return self.health > 0
+
+    @property
+    def archetype(self):
+        return ARCHETYPES[get_archetype(self.type, self.table.army_size)][0]
+
+    @property
+    def pos(self):
+        """
+        [col, row] -- Where the unit is, [None, None] if it isn't on the board
+        """
+        col = int(self.table.col[self.type])
+        if col == NO_POSITION:
+            return [None, None]
+        return [col, int(self.table.row[self.type])]
+
+    @pos.setter
+    def pos(self, pos):
+        col, row = pos
+        if col is None:
+            col = row = NO_POSITION
+        self.table.col[self.type] = col
+        self.table.row[self.type] = row
+
+    def col(self):
+        return self.pos[0]
+
+    def row(self):
+        return self.pos[1]
+
+    def change_health(self, health):
+        self.table.health[self.type] = max(health, 0)
+
+    def reduce_health(self, amount):
+        self.table.damage([self.type], amount)
+
+    def get_range(self, range_type, max_col, max_row):
+        """
+        Returns the tiles the unit can move to or attack,
+        as Unit.get_range does.
+        """
+        if range_type == "attack":
+            unit_range = self.attack_range
+        elif range_type == "move":
+            unit_range = self.speed
+        else:
+            return frozenset()
+
+        col, row = self.pos
+        return range_tiles(col, row, unit_range, max_col, max_row)
+
+    def is_players_unit(self, player_num):
+        return self.get_owning_player() == player_num
+
+    def get_owning_player(self):
+        return get_owner(self.type, self.table.army_size)
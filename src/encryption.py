@@ -5,21 +5,147 @@ Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
 
 Encrypts and decrypts binary data.
 
+Each connection starts with a handshake: both sides send
+a fresh X25519 public key and derive a pair of session keys
+from the shared secret. Messages are then sealed with
+ChaCha20-Poly1305 using a per-direction counter as the nonce,
+so every message costs only a 16 byte tag.
+
+Updates to a match's spectators are sealed once for all of them
+with a shared broadcast key, handed to each spectator over its
+own session.
+
 """
-from cryptography.fernet import Fernet
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric.x25519 import X25519PrivateKey, X25519PublicKey
+from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+# HKDF salt for session keys. It only separates this game's keys
+# from other uses of X25519; it ships with the client, so it
+# authenticates nothing and the handshake can be completed by anyone.
+PRESHARED_KEY = b"REaIOWIUaGqGv7kvCgq24ilu0BNQhGiGF2Ahq-f1Hv8="
+
+PUBLIC_KEY_SIZE = 32
+SESSION_KEY_SIZE = 32
+TAG_SIZE = 16
+NONCE_SIZE = 12
+
+
+class EncryptionError(Exception):
+    """
+    Raised when a message or handshake can't be decrypted.
+    """
+
+
+class Handshake:
+    """
+    One side of the key exchange that starts a connection.
+    """
+
+    def __init__(self):
+        self.private_key = X25519PrivateKey.generate()
+        self.public_key = self.private_key.public_key().public_bytes_raw()
+
+    def create_session(self, peer_public_key, is_client):
+        """
+        Derive the session from the other side's public key.
+
+        Arguments:
+            peer_public_key {bytes} -- Public key sent by the other side
+            is_client {bool} -- True on the client, False on the server
+
+        Returns:
+            Session -- Cipher for the rest of the connection
+        """
+        if len(peer_public_key) != PUBLIC_KEY_SIZE:
+            raise EncryptionError("Invalid handshake.")
+
+        try:
+            peer_key = X25519PublicKey.from_public_bytes(peer_public_key)
+            shared_secret = self.private_key.exchange(peer_key)
+        except ValueError as e:
+            raise EncryptionError(str(e))
+
+        key_material = HKDF(
+            algorithm=hashes.SHA256(),
+            length=2 * SESSION_KEY_SIZE,
+            salt=PRESHARED_KEY,
+            info=b"sfasu-strategy-game session",
+        ).derive(shared_secret)
+        client_key = key_material[:SESSION_KEY_SIZE]
+        server_key = key_material[SESSION_KEY_SIZE:]
+
+        if is_client:
+            return Session(client_key, server_key)
+        return Session(server_key, client_key)
+
+
+class Session:
+    """
+    Encrypts outgoing and decrypts incoming messages
+    for one connection. Messages must be decrypted in
+    the order they were encrypted.
+    """
+
+    def __init__(self, send_key, receive_key):
+        self.send_cipher = ChaCha20Poly1305(send_key)
+        self.receive_cipher = ChaCha20Poly1305(receive_key)
+
+        # Nonces are message counters, never reused
+        self.send_count = 0
+        self.receive_count = 0
+
+    def encrypt(self, message):
+        # Encrypt bytecode
+        nonce = self.send_count.to_bytes(12, "little")
+        self.send_count += 1
+        return self.send_cipher.encrypt(nonce, message, None)
+
+    def decrypt(self, cipher):
+        # Decrypt bytecode
+        nonce = self.receive_count.to_bytes(12, "little")
+        try:
+            message = self.receive_cipher.decrypt(nonce, cipher, None)
+        except InvalidTag:
+            raise EncryptionError("Message failed authentication.")
+        self.receive_count += 1
+        return message
+
 
-key = b"REaIOWIUaGqGv7kvCgq24ilu0BNQhGiGF2Ahq-f1Hv8="
-f = Fernet(key)
+class BroadcastCipher:
+    """
+    Seals messages once for every spectator of a match.
 
-#TODO: fix encryption. Getting cryptography.fernet.InvalidToken error
+    Spectators join late and may skip messages, so the nonce
+    travels with each message instead of being counted on
+    both sides; it must still go up every time.
+    """
 
-def encrypt(message):
-    # Encrypt bytecode
-    return f.encrypt(message)
-    #return message
+    def __init__(self, key=None, count=0):
+        """
+        Arguments:
+            key {bytes} -- Shared key, a new one is made if None
+            count {int} -- Nonce of the last message already sent
+        """
+        self.key = key or ChaCha20Poly1305.generate_key()
+        self.cipher = ChaCha20Poly1305(self.key)
+        self.count = count
 
+    def encrypt(self, message):
+        self.count += 1
+        nonce = self.count.to_bytes(NONCE_SIZE, "little")
+        return nonce + self.cipher.encrypt(nonce, message, None)
 
-def decrypt(cipher):
-    # Decrypt bytecode
-    return f.decrypt(cipher)
-    #return cipher
+    def decrypt(self, cipher):
+        nonce = cipher[:NONCE_SIZE]
+        count = int.from_bytes(nonce, "little")
+        if count <= self.count:
+            raise EncryptionError("Broadcast message replayed.")
+        try:
+            message = self.cipher.decrypt(nonce, cipher[NONCE_SIZE:], None)
+        except InvalidTag:
+            raise EncryptionError("Message failed authentication.")
+        self.count = count
+        return message
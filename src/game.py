@@ -13,10 +13,12 @@ import src.colors as colors
 from src.constants import *
 
 # Classes
-from src.gamestate import GameState
+from src.camera import SCROLL_SPEED
+from src.core.gamestate import GameState
 from src.network import Network
+from src.protocol import EVENT_YOUR_TURN, EVENT_OPPONENT_READY, EVENT_GAME_OVER
 from src.map import Map
-from src.unit import Unit
+from src.core.unit import Unit
 
 class Game:
     """
@@ -42,6 +44,10 @@ class Game:
         self.player_num = self.network.get_player_num()
         print("You are player", self.player_num)
 
+        # Have the server tell us when things happen
+        # instead of asking it every frame
+        self.network.subscribe()
+
         # Set up display window
         pygame.display.set_caption("A Game of Shapes - Player " + str(self.player_num))     # NOTE: Display player num here?
         screen_res = (WINDOW_WIDTH, WINDOW_HEIGHT)
@@ -52,12 +58,13 @@ class Game:
         pygame.font.init()
         self.game_font = pygame.font.SysFont("Verdana", 60)
 
-        # Set up gameplay map
-        self.map = Map(self.screen, self.player_num)
-
         # Represents the state of game
         # Modified by server and sent to clients
         self.gamestate = self.network.get_gamestate()
+
+        # Set up gameplay map, with as many units as the server plays with
+        self.map = Map(self.screen, self.player_num, army_size=self.gamestate.army_size)
+
         is_turn = self.gamestate.is_players_turn(self.player_num)
 
         # Effects of turn that are sent across network
@@ -74,6 +81,9 @@ class Game:
         # Clock tracks time from beginning of game
         self.clock = pygame.time.Clock()
 
+        # Ticks after which reconnect() may try again
+        self.next_reconnect = 0
+
         # Keep track of user's cursor. Updates every frame
         self.mouse_position = pygame.mouse.get_pos()
 
@@ -110,6 +120,10 @@ class Game:
             if event.type == pygame.MOUSEMOTION:
                 self.map.handle_hover(self.mouse_position)
 
+            # User zooms the map with the mouse wheel
+            if event.type == pygame.MOUSEWHEEL:
+                self.map.handle_zoom(event.y, self.mouse_position)
+
             # Only process clicks if it's this player's turn
             if self.gamestate.is_players_turn(self.player_num):
                 # User is placing tiles
@@ -117,7 +131,8 @@ class Game:
                     pass
                 else: # Attack!
                     # User clicks button
-                    if event.type == pygame.MOUSEBUTTONDOWN:
+                    # The wheel also sends buttons 4 and 5
+                    if event.type == pygame.MOUSEBUTTONDOWN and event.button not in (4, 5):
                         self.turn = self.map.handle_click(self.mouse_position, self.turn)
                     # User presses a key
                     # TODO: Delete or implement keydown
@@ -132,37 +147,142 @@ class Game:
         self.time = self.clock.tick(60)
         self.mouse_position = pygame.mouse.get_pos()
 
+        # Arrow keys scroll maps bigger than the window
+        keys = pygame.key.get_pressed()
+        dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * SCROLL_SPEED
+        dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * SCROLL_SPEED
+        if dx or dy:
+            self.map.handle_scroll(dx, dy)
+
+        if not self.pump_network():
+            return
+
         # Other player's turn
         if self.turn["phase"] == NOT_TURN:
-            players_turn = self.network.request_turn()
-            if players_turn == self.player_num:
-                self.update_gamestate()
-                self.turn["phase"] = SELECT_UNIT_TO_MOVE
+            for event in self.network.poll_events():
+                if event == EVENT_YOUR_TURN:
+                    self.update_gamestate()
+                    self.turn["phase"] = SELECT_UNIT_TO_MOVE
+                elif event == EVENT_GAME_OVER:
+                    self.update_gamestate()
 
         # Check if turn ended
         if self.turn["phase"] == END_TURN:
             # Send moves and attacks made to server
-            self.network.send_turn(self.turn)
-            self.gamestate.change_turns()
-            self.turn["phase"] = NOT_TURN
+            reply = self.network.send_turn(self.turn)
+            if reply == "ok":
+                self.gamestate.change_turns()
+                self.turn["phase"] = NOT_TURN
+            else:
+                print("[Error]: Server rejected turn:", reply)
+                self.undo_turn()
 
         # Check if someone has won
         if self.gamestate.game_is_over:
             self.gameover()
 
+    def undo_turn(self):
+        """
+        Put the map back the way the server has it
+        and let the player take their turn again.
+        """
+        # Units the turn moved or killed locally may not match
+        # the server any more, so reload the whole state
+        gamestate = self.network.get_gamestate()
+        if gamestate is not None:
+            self.gamestate = gamestate
+            self.map.load_gamestate(gamestate)
+
+        self.turn["attack"] = None
+        self.turn["move"] = None
+        if self.gamestate.is_players_turn(self.player_num):
+            self.turn["phase"] = SELECT_UNIT_TO_MOVE
+        else:
+            self.turn["phase"] = NOT_TURN
+
+    def pump_network(self):
+        """
+        Keep the connection alive from any loop that polls the server:
+        send heartbeats, or get back into the match if it dropped.
+
+        Returns:
+            bool -- True if connected and the server can be polled
+        """
+        if not self.network.connected:
+            self.reconnect()
+            return False
+        self.network.heartbeat()
+        return True
+
+    def reconnect(self):
+        """
+        Resume the match after the connection dropped,
+        catching up on whatever happened meanwhile.
+        """
+        now = pygame.time.get_ticks()
+        if now < self.next_reconnect:
+            return
+        self.next_reconnect = now + RECONNECT_DELAY
+
+        print("[Debug]: Connection lost, resuming match...")
+        reply = self.network.resume(self.gamestate.version)
+        if reply is None:
+            return
+        self.network.subscribe()
+
+        # Drop a turn in progress, the server may have moved on
+        if self.turn["phase"] != NOT_TURN:
+            self.undo_turn()
+        else:
+            self.apply_update(reply)
+        if self.gamestate.is_players_turn(self.player_num):
+            self.turn["phase"] = SELECT_UNIT_TO_MOVE
+        else:
+            self.turn["phase"] = NOT_TURN
+
     def update_gamestate(self):
         """
         Pull in new information from server and apply changes.
         """
-        new_gamestate = self.network.get_gamestate()
+        self.apply_update(self.network.sync_gamestate(self.gamestate.version))
+
+    def apply_update(self, reply):
+        """
+        Apply the server's reply to a sync.
 
-        self.update_health(new_gamestate)
-        self.update_positions(new_gamestate)
+        Arguments:
+            reply -- Changes or a whole GameState, see Network.sync_gamestate()
+        """
+        if isinstance(reply, GameState):
+            # Server couldn't send a delta; compare whole states
+            self.update_health(reply)
+            self.update_positions(reply)
+            self.gamestate = reply
+        elif reply:
+            self.apply_changes(reply)
+            self.gamestate.apply_changes(reply)
 
         self.turn["attack"] = None
         self.turn["move"] = None
 
-        self.gamestate = new_gamestate
+    def apply_changes(self, changes):
+        """
+        Update units with changes sent by the server.
+
+        Arguments:
+            changes {[tuple]} -- (version, field, key, value) for each change
+        """
+        for version, field, unit_type, value in changes:
+            if field == "health":
+                unit = self.map.get_unit_by_type(unit_type)
+                if unit:
+                    unit.change_health(value)
+                    if not unit.is_alive:
+                        self.map.kill_unit(unit)
+            elif field == "location" and value:
+                col, row = value
+                unit = self.map.get_unit_by_type(unit_type)
+                self.map.move(unit, col, row)
 
     def update_health(self, new_gamestate):
         """
@@ -236,22 +356,22 @@ class Game:
             location = [20, SIZE*5]  # Beginning of unit info.
             textsurface = font.render("Your Units", False, colors.white)
             self.screen.blit(textsurface, location)
-            for unit in self.map.players_units:
+            for unit in self.map.players_units.values():
                 # Increment horizontal placement
                 location[1] += SIZE
                 health = str(unit.health) + "/" + str(unit.max_health)
-                textsurface = font.render(unit.archetype + ": " + health, False, unit.color)
+                textsurface = font.render(unit.archetype + ": " + health, False, colors.get_unit_color(unit))
                 self.screen.blit(textsurface, location)
 
             # Display "Enemy Unit Information"
             location = [self.screen.get_width() - 150, SIZE*5]  # Beginning of unit info.
             textsurface = font.render("Enemy Units", False, colors.white)
             self.screen.blit(textsurface, location)
-            for unit in self.map.enemy_units:
+            for unit in self.map.enemy_units.values():
                 # Increment horizontal placement
                 location[1] += SIZE
                 health = str(unit.health) + "/" + str(unit.max_health)
-                textsurface = font.render(unit.archetype + ": " + health, False, unit.color)
+                textsurface = font.render(unit.archetype + ": " + health, False, colors.get_unit_color(unit))
                 self.screen.blit(textsurface, location)
 
         elif self.player_num == 2:
@@ -259,22 +379,22 @@ class Game:
             location = [self.screen.get_width() - 150, SIZE*5]  # Beginning of unit info.
             textsurface = font.render("Your Units", False, colors.white)
             self.screen.blit(textsurface, location)
-            for unit in self.map.players_units:
+            for unit in self.map.players_units.values():
                 # Increment horizontal placement
                 location[1] += SIZE
                 health = str(unit.health) + "/" + str(unit.max_health)
-                textsurface = font.render(unit.archetype + ": " + health, False, unit.color)
+                textsurface = font.render(unit.archetype + ": " + health, False, colors.get_unit_color(unit))
                 self.screen.blit(textsurface, location)
 
             # Display "Enemy Information"
             location = [20, SIZE*5]  # Beginning of unit info.
             textsurface = font.render("Enemy Units", False, colors.white)
             self.screen.blit(textsurface, location)
-            for unit in self.map.enemy_units:
+            for unit in self.map.enemy_units.values():
                 # Increment horizontal placement
                 location[1] += SIZE
                 health = str(unit.health) + "/" + str(unit.max_health)
-                textsurface = font.render(unit.archetype + ": " + health, False, unit.color)
+                textsurface = font.render(unit.archetype + ": " + health, False, colors.get_unit_color(unit))
                 self.screen.blit(textsurface, location)
 
     def display_help(self):
@@ -301,8 +421,7 @@ class Game:
         Display a waiting message until
         other client connects.
         """
-        self.network.send_command("start")
-        reply = self.network.receive()
+        self.network.send_ready()
         self.gamestate = self.network.get_gamestate()
 
         while not self.gamestate.ready():
@@ -318,12 +437,15 @@ class Game:
             text_rect = textsurface.get_rect(center=(WINDOW_CENTER))
             self.screen.blit(textsurface, text_rect)
             pygame.display.update()
+            self.clock.tick(60)
 
-            # Update gamestate to check if other player is connected
-            self.gamestate = self.network.get_gamestate()
+            # Server tells us once the other player is ready
+            if not self.pump_network():
+                continue
+            if EVENT_OPPONENT_READY in self.network.poll_events():
+                self.gamestate = self.network.get_gamestate()
 
     def gameover(self):
-        self.network.send_turn(self.turn)
         # Loop until player resets or quits
         # while not self.gamestate.ready():
         while True:
@@ -340,12 +462,17 @@ class Game:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         # Tell server that you're ready
-                        self.network.send_command("start")
+                        self.network.send_ready()
                     elif event.key == pygame.K_ESCAPE:
                         self.exit_game()
 
-            # Update gamestate to check if other player is ready
-            self.gamestate = self.network.get_gamestate()
+            self.clock.tick(60)
+
+            # Server tells us once the other player is ready
+            if not self.pump_network():
+                continue
+            if EVENT_OPPONENT_READY in self.network.poll_events():
+                self.gamestate = self.network.get_gamestate()
 
         # Clear the map
         self.map.reset()    
@@ -0,0 +1,317 @@
+"""
+File: journal.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Keeps every match's GameState on disk so the server can
+rebuild its matches after a crash.
+
+Each match has an append-only log of the changes made to its
+GameState (match-<id>.log) and, every SNAPSHOT_INTERVAL changes,
+a compact snapshot of the whole state (match-<id>.snap) that
+lets the log be emptied. Recovering a match loads the snapshot
+and replays the changes logged after it. The session tokens of
+a match's players are kept in match-<id>.session so they can
+resume once the server is back.
+
+Files are written by a background thread so the server never
+waits on the disk. Whatever was queued while the thread was busy
+goes out as one group commit: one write and at most one fsync per
+match. Anything queued but not yet committed is lost in a crash.
+
+Every record and snapshot is stored as:
+    length {uint32} -- Size of the payload in bytes
+    checksum {uint32} -- CRC-32 of the payload
+    payload -- Output of encode_changes() or encode_gamestate()
+
+"""
+
+import json
+import os
+import queue
+import re
+import struct
+import threading
+import time
+import zlib
+
+from src.codec import encode_gamestate, decode_gamestate, encode_changes, decode_changes, CodecError
+from src.core.constants import MAX_UNITS
+from src.core.gamestate import GameState
+
+RECORD_HEADER = struct.Struct("<II")
+
+# Changes logged between snapshots of a match
+SNAPSHOT_INTERVAL = 128
+
+# When log files are flushed to disk
+FSYNC_ALWAYS = "always"     # After every group commit
+FSYNC_INTERVAL = "interval" # At most every FSYNC_INTERVAL_SECONDS
+FSYNC_NEVER = "never"       # Left to the operating system
+FSYNC_MODES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+FSYNC_INTERVAL_SECONDS = 1.0
+
+# Work queued for the writer thread
+APPEND = 0
+SNAPSHOT = 1
+REMOVE = 2
+SESSIONS = 3
+
+MATCH_FILE = re.compile(r"match-(\d+)\.(log|snap|session)$")
+
+
+def pack_record(payload):
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(data):
+    """
+    Split a file into the payloads of its records.
+
+    A crash can leave the last record half written;
+    reading stops at the first record that doesn't check out.
+
+    Returns:
+        ([bytes], int) -- The payloads and the length of the valid part
+    """
+    payloads = []
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        length, checksum = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        payload = data[start:start + length]
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            break
+        payloads.append(payload)
+        offset = start + length
+    return payloads, offset
+
+
+class Journal:
+    """
+    Writes match logs and snapshots to one directory.
+
+    Methods other than recover() only queue work for the
+    writer thread and are safe to call from the event loop.
+    """
+
+    def __init__(self, directory, fsync=FSYNC_ALWAYS):
+        """
+        Arguments:
+            directory {str} -- Where match files are kept, created if missing
+            fsync {str} -- One of FSYNC_MODES
+        """
+        if fsync not in FSYNC_MODES:
+            raise ValueError("fsync must be one of " + ", ".join(FSYNC_MODES))
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="journal", daemon=True)
+
+        # Logs written since their last fsync, for FSYNC_INTERVAL
+        self.unsynced = set()
+        self.last_sync = time.monotonic()
+
+    def log_path(self, match_id):
+        return os.path.join(self.directory, "match-{}.log".format(match_id))
+
+    def snapshot_path(self, match_id):
+        return os.path.join(self.directory, "match-{}.snap".format(match_id))
+
+    def session_path(self, match_id):
+        return os.path.join(self.directory, "match-{}.session".format(match_id))
+
+    def start(self):
+        self.thread.start()
+
+    def close(self):
+        """
+        Commit everything queued and stop the writer thread.
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def append(self, match_id, changes):
+        """
+        Queue GameState changes to be added to a match's log.
+
+        Arguments:
+            match_id {int} -- The match that changed
+            changes {[tuple]} -- (version, field, key, value) for each change
+        """
+        # Logged changes are never modified, so the
+        # writer thread can encode them
+        self.queue.put((APPEND, match_id, changes))
+
+    def snapshot(self, match_id, gamestate):
+        """
+        Queue a snapshot of a match; its log is emptied once it's written.
+        """
+        self.queue.put((SNAPSHOT, match_id, pack_record(encode_gamestate(gamestate))))
+
+    def save_sessions(self, match_id, tokens):
+        """
+        Queue saving the session tokens of a match's players.
+
+        Arguments:
+            tokens {dict} -- Session token keyed by player_num
+        """
+        data = json.dumps({str(player_num) : token for player_num, token in tokens.items()})
+        self.queue.put((SESSIONS, match_id, data.encode()))
+
+    def remove(self, match_id):
+        """
+        Queue deleting a finished match's files.
+        """
+        self.queue.put((REMOVE, match_id, None))
+
+    def run(self):
+        # Writer thread: commit whatever has queued up, then wait for more
+        while True:
+            timeout = FSYNC_INTERVAL_SECONDS if self.unsynced else None
+            try:
+                batch = [self.queue.get(timeout=timeout)]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            try:
+                self.commit([work for work in batch if work is not None])
+            except OSError as e:
+                print("[Error]: Journal write failed:", str(e))
+            if stop:
+                self.sync_logs()
+                return
+
+    def commit(self, batch):
+        """
+        Write a batch of queued work, one write per log.
+        """
+        pending = {}
+        for kind, match_id, data in batch:
+            if kind == APPEND:
+                pending.setdefault(match_id, []).append(pack_record(encode_changes(data)))
+            elif kind == SNAPSHOT:
+                # The snapshot covers every change logged before it
+                pending.pop(match_id, None)
+                self.write_snapshot(match_id, data)
+            elif kind == SESSIONS:
+                self.replace_file(self.session_path(match_id), data)
+            elif kind == REMOVE:
+                pending.pop(match_id, None)
+                self.unsynced.discard(match_id)
+                for path in (self.log_path(match_id), self.snapshot_path(match_id), self.session_path(match_id)):
+                    if os.path.exists(path):
+                        os.remove(path)
+
+        for match_id, records in pending.items():
+            with open(self.log_path(match_id), "ab") as log:
+                log.write(b"".join(records))
+                if self.fsync == FSYNC_ALWAYS:
+                    log.flush()
+                    os.fsync(log.fileno())
+            if self.fsync == FSYNC_INTERVAL:
+                self.unsynced.add(match_id)
+
+        if self.unsynced and time.monotonic() - self.last_sync >= FSYNC_INTERVAL_SECONDS:
+            self.sync_logs()
+
+    def sync_logs(self):
+        for match_id in self.unsynced:
+            path = self.log_path(match_id)
+            if os.path.exists(path):
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        self.unsynced.clear()
+        self.last_sync = time.monotonic()
+
+    def replace_file(self, path, data):
+        # Write a new copy beside the old one and swap it in
+        temporary_path = path + ".tmp"
+        with open(temporary_path, "wb") as new_file:
+            new_file.write(data)
+            if self.fsync != FSYNC_NEVER:
+                new_file.flush()
+                os.fsync(new_file.fileno())
+        os.replace(temporary_path, path)
+
+    def write_snapshot(self, match_id, data):
+        # Replace the snapshot in one step, then empty the log
+        self.replace_file(self.snapshot_path(match_id), data)
+        open(self.log_path(match_id), "wb").close()
+        self.unsynced.discard(match_id)
+
+    def recover(self, army_size=MAX_UNITS):
+        """
+        Rebuild every match that has files in the directory.
+        Call before start(); damaged log tails are cut off.
+
+        Keyword Arguments:
+            army_size {int} -- Units per player of matches logged
+                               before their first snapshot (default: {MAX_UNITS})
+
+        Returns:
+            dict -- (GameState, session tokens keyed by player_num)
+                    of each match, keyed by match_id
+        """
+        match_ids = set()
+        for name in os.listdir(self.directory):
+            found = MATCH_FILE.match(name)
+            if found:
+                match_ids.add(int(found.group(1)))
+
+        matches = {}
+        for match_id in sorted(match_ids):
+            try:
+                matches[match_id] = (self.recover_match(match_id, army_size), self.recover_sessions(match_id))
+            except (OSError, CodecError) as e:
+                print("[Error]: Unable to recover match", match_id, "-", str(e))
+        return matches
+
+    def recover_sessions(self, match_id):
+        path = self.session_path(match_id)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as sessions:
+            try:
+                tokens = json.load(sessions)
+            except ValueError:
+                return {}
+        return {int(player_num) : token for player_num, token in tokens.items()}
+
+    def recover_match(self, match_id, army_size):
+        gamestate = GameState(army_size)
+        snapshot_path = self.snapshot_path(match_id)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "rb") as snapshot:
+                payloads, _ = read_records(snapshot.read())
+            if payloads:
+                gamestate = decode_gamestate(payloads[0])
+                # Now the server's copy, so start a new change log
+                gamestate.changes = []
+
+        log_path = self.log_path(match_id)
+        if os.path.exists(log_path):
+            with open(log_path, "rb") as log:
+                data = log.read()
+            payloads, valid_length = read_records(data)
+            if valid_length < len(data):
+                with open(log_path, "r+b") as log:
+                    log.truncate(valid_length)
+            for payload in payloads:
+                # Changes older than the snapshot are already in it
+                changes = [change for change in decode_changes(payload) if change[0] > gamestate.version]
+                gamestate.apply_changes(changes)
+
+        return gamestate
@@ -11,20 +11,19 @@ import src.colors as colors
 from src.constants import *
 
 # Classes
-from src.grid import Grid
-from src.unit import Unit
+from src.camera import Camera, ZOOM_STEP
+from src.core.board import Board
 
-class Map:
+class Map(Board):
     """
     The surface on which gameplay occurs.
-    
-    Comprised of a grid of tiles, where each tile
-    has a tile_type and a unit_type. Units move
-    across tiles and are affected by tile_type.
+
+    Draws a Board and turns the player's clicks
+    into moves and attacks on it.
 
     """
 
-    def __init__(self, screen, player_num):
+    def __init__(self, screen, player_num, cols=GRID_COLUMNS, rows=GRID_ROWS, army_size=MAX_UNITS):
         """
         Set up tile grid and units.
 
@@ -32,15 +31,16 @@ class Map:
         Arguments:
             screen {pygame.Surface} -- The main display window
             player_num {int} -- The player identifier; 1 or 2
+
+        Keyword Arguments:
+            cols {int} -- Number of columns (default: {GRID_COLUMNS})
+            rows {int} -- Number of rows (default: {GRID_ROWS})
+            army_size {int} -- Units per player (default: {MAX_UNITS})
         """
 
-        self.screen = screen
-        self.player_num = player_num
+        super().__init__(player_num, cols, rows, army_size)
 
-        # The grid is a 2D array with columns and rows
-        self.grid = Grid()
-        cols = self.grid.cols
-        rows = self.grid.rows
+        self.screen = screen
 
         # TODO: create function to return a tile, and one to get tile based on mouse_position
 
@@ -52,12 +52,16 @@ class Map:
         # Full map size in pixels (calculated from grid and tile sizes)
         map_w = (cols * (self.tile_w + self.margin)) + self.margin
         map_h = (rows * (self.tile_h + self.margin)) + self.margin
-        self.map_size = (map_w, map_h)
+
+        # Maps bigger than the viewport scroll inside it
+        self.map_size = (min(map_w, VIEWPORT_WIDTH), min(map_h, VIEWPORT_HEIGHT))
+        self.camera = Camera(self.map_size[0], self.map_size[1], cols, rows,
+                             self.tile_w, self.tile_h, self.margin)
 
         # Determine placement of map within display window
         map_x = (self.screen.get_size()[0] // 2) - (self.map_size[0] // 2)
         map_y = (self.screen.get_size()[1] // 2) - (self.map_size[1] // 2)
-        map_rect = pygame.Rect(map_x, map_y, map_w, map_h)
+        map_rect = pygame.Rect(map_x, map_y, self.map_size[0], self.map_size[1])
 
         # Create map surface
         self.surface = self.screen.subsurface(map_rect)
@@ -67,12 +71,10 @@ class Map:
         self.selected_unit = None
         self.hover_location = None
 
-        # Set up player units
-        self.all_units = []
-        self.players_units = []
-        self.enemy_units = []
-        self.initialize_units()
-        
+        # Start looking at this player's first unit
+        first_unit = next(iter(self.players_units.values()))
+        self.camera.center_on(first_unit.col(), first_unit.row())
+
 
     def handle_hover(self, mouse_position):
         """
@@ -102,10 +104,9 @@ class Map:
         clicked_column, clicked_row = self.determine_tile_from_mouse_position(mouse_position)
         print("[Debug]: Click", mouse_position, "Grid coords:", clicked_column, clicked_row)
 
-        clicked_unit = None
-        for unit in self.players_units:
-            if unit.pos == [clicked_column, clicked_row]:
-                clicked_unit = unit
+        clicked_unit = self.get_unit_at(clicked_column, clicked_row)
+        if clicked_unit and clicked_unit.type not in self.players_units:
+            clicked_unit = None
 
         # Player hasn't moved yet
         if turn["phase"] == SELECT_UNIT_TO_MOVE:
@@ -127,7 +128,7 @@ class Map:
                         turn["move"] = move
                         turn["phase"] = ATTACKING
                         # Highlight attackable tiles if enemy is in attack range
-                        if self.enemy_in_attack_range():
+                        if self.enemy_in_attack_range(movable_unit):
                             self.highlight_tiles(movable_unit, "attack")
                         else:
                             self.selected_unit = None
@@ -142,48 +143,13 @@ class Map:
         elif turn["phase"] == ATTACKING:
             # If user clicks on self, forfeit attack
             if not self.selected_unit.pos == [clicked_column, clicked_row]:
-                turn["attack"] = self.attack(clicked_column, clicked_row)
+                turn["attack"] = self.attack(self.selected_unit, clicked_column, clicked_row)
             turn["phase"] = END_TURN
             self.remove_highlight("attack")
             self.selected_unit = None
 
         return turn
 
-    def move(self, unit, col, row):
-        """
-        Move unit to given location if possible.
-
-        Arguments:
-            unit {Unit} -- The unit to move
-            col {int}   -- A column on the grid
-            row {int}   -- A row on the grid
-        """
-        move = None
-        if unit:
-            if self.grid.get_unit_type(col, row) == 0:
-                # Set old tile to unit_type of blank
-                self.grid.set_unit_type(unit.col(), unit.row(), 0)
-                # Update grid with new unit position
-                self.grid.set_unit_type(col, row, unit.type)
-                unit.pos = [col, row]
-                move = [unit.type, col, row]
-
-        return move
-
-    def attack(self, col, row):
-        """
-        Attack another unit at given col, row.
-        """
-        attack = None
-        if self.grid.tile_in_attack_range(col, row):
-            for enemy_unit in self.enemy_units:
-                if enemy_unit.pos == [col, row]:
-                    self.selected_unit.attack(enemy_unit)
-                    if not enemy_unit.is_alive:
-                        self.kill_unit(enemy_unit)
-                    attack = [enemy_unit.type, self.selected_unit.attack_power]
-        return attack
-
     def determine_tile_from_mouse_position(self, mouse_position):
         """
         To get position relative to map, we must subtract the
@@ -199,51 +165,50 @@ class Map:
         mouse_x, mouse_y = mouse_position
         offset_x, offset_y = self.get_rect().topleft
 
-        col = (mouse_x - offset_x) // (self.tile_w + self.margin)
-        row = (mouse_y - offset_y) // (self.tile_h + self.margin)
-
-        return (col, row)
-
-    def highlight_tiles(self, unit, range_type):
-        if range_type == "move":
-            tile_type = 3
-        elif range_type == "attack":
-            tile_type = 4
-        movable_list = unit.get_range(range_type, self.grid.cols, self.grid.rows)
-        print(movable_list)
-        for position in movable_list:
-            col = position[0]
-            row = position[1]
-            self.grid.set_tile_type(col, row, tile_type)
-
-    def remove_highlight(self, range_type):
-        if range_type == "move":
-            highlight_type = 3
-        elif range_type == "attack":
-            highlight_type = 4
-        for row in range(self.grid.rows):
-            for col in range(self.grid.cols):
-                tile_type = self.grid.get_tile_type(col, row)
-                if tile_type == highlight_type:
-                    self.grid.set_tile_type(col, row, 0)
+        return self.camera.tile_at(mouse_x - offset_x, mouse_y - offset_y)
+
+    def handle_scroll(self, dx, dy):
+        """
+        Scroll the map by a number of pixels.
+        """
+        self.camera.scroll(dx, dy)
+        self.handle_hover(pygame.mouse.get_pos())
+
+    def handle_zoom(self, steps, mouse_position):
+        """
+        Zoom in or out around the mouse, or around the
+        middle of the map if the mouse is off it.
+
+        Arguments:
+            steps {int} -- Mouse wheel steps, positive zooms in
+            mouse_position {(float, float)} -- The (x, y) position of mouse on window
+        """
+        focus = None
+        if self.get_rect().collidepoint(mouse_position):
+            offset_x, offset_y = self.get_rect().topleft
+            focus = (mouse_position[0] - offset_x, mouse_position[1] - offset_y)
+        self.camera.zoom_by(ZOOM_STEP ** steps, focus)
+        self.handle_hover(mouse_position)
 
     def draw(self):
         """
         Draw map onto surface.
+
+        Only the tiles in the camera's view are drawn,
+        so drawing takes as long on a huge map as a small one.
         """
 
         self.surface.fill(colors.white)
 
-        # Loop through the grid data structure
-        for row in range(self.grid.rows):
-            for col in range(self.grid.cols):
+        # Only the part of the grid the camera can see
+        first_col, first_row, last_col, last_row = self.camera.visible_tiles()
+        tile_types = self.grid.tile_types.region(first_col, first_row, last_col, last_row).tolist()
+        unit_types = self.grid.unit_types.region(first_col, first_row, last_col, last_row)
 
-                # Get current unit and tile
-                unit_type = self.grid.get_unit_type(col, row)
-                unit = None
-                if unit_type != 0:
-                    unit = self.get_unit_by_type(unit_type)
-                tile_type = self.grid.get_tile_type(col, row)
+        for row in range(first_row, last_row + 1):
+            row_types = tile_types[row - first_row]
+            for col in range(first_col, last_col + 1):
+                tile_type = row_types[col - first_col]
 
                 # Determine color of tiles
                 tile_color = colors.darkgray
@@ -256,61 +221,61 @@ class Map:
                 elif tile_type == ATTACKABLE:
                     tile_color = colors.purple
 
+                # Highlight hovered tile
+                if self.hover_location == (col, row):
+                    tile_color = colors.get_hover_color(tile_color)
+
                 # Display tiles
-                tile_rect = pygame.draw.rect(self.surface,
-                                        tile_color,
-                                        [(self.margin + self.tile_w) * col + self.margin,
-                                         (self.margin + self.tile_h) * row + self.margin,
-                                         self.tile_w,
-                                         self.tile_h])
+                pygame.draw.rect(self.surface, tile_color, self.camera.tile_rect(col, row))
 
-                # Highlight hovered tile
-                if self.hover_location:
-                    if self.hover_location == (col, row):
-                        pygame.draw.rect(self.surface,
-                                     colors.get_hover_color(tile_color),
-                                     tile_rect)
-
-
-                # TODO: Draw units inside Unit class. Pass in tile_rect
-                # Determine unit color and shape
-                # using tile's rect as reference
-                pointlist = None
-                if unit:
-                    if unit.is_triangle():
-                        # Green triangle
-                        pointlist = [
-                            tile_rect.midtop,
-                            tile_rect.bottomleft,
-                            tile_rect.bottomright
-                        ]
-                    elif unit.is_diamond():
-                        # Red diamond
-                        pointlist = [
-                            tile_rect.midtop,
-                            tile_rect.midleft,
-                            tile_rect.midbottom,
-                            tile_rect.midright
-                        ]
-                    elif unit.is_circle():
-                        # Blue circle
-                        pos = tile_rect.center
-                        radius = tile_rect.width / 2
-
-                    # Draw unit
-                    if pointlist is not None:
-                        pygame.draw.polygon(
-                            self.surface,
-                            unit.color,
-                            pointlist
-                        )
-                    else:
-                        pygame.draw.circle(
-                            self.surface,
-                            unit.color,
-                            pos,
-                            int(radius)
-                        )
+        # Units on the tiles in view
+        rows, cols = unit_types.nonzero()
+        for col, row in zip((cols + first_col).tolist(), (rows + first_row).tolist()):
+            unit = self.get_unit_at(col, row)
+            if unit:
+                self.draw_unit(unit, pygame.Rect(self.camera.tile_rect(col, row)))
+
+    def draw_unit(self, unit, tile_rect):
+        """
+        Draw a unit's shape in its color, using
+        its tile's rect as reference.
+        """
+        # TODO: Draw units inside Unit class. Pass in tile_rect
+        pointlist = None
+        if unit.is_triangle():
+            # Green triangle
+            pointlist = [
+                tile_rect.midtop,
+                tile_rect.bottomleft,
+                tile_rect.bottomright
+            ]
+        elif unit.is_diamond():
+            # Red diamond
+            pointlist = [
+                tile_rect.midtop,
+                tile_rect.midleft,
+                tile_rect.midbottom,
+                tile_rect.midright
+            ]
+        elif unit.is_circle():
+            # Blue circle
+            pos = tile_rect.center
+            radius = tile_rect.width / 2
+
+        # Draw unit
+        if pointlist is not None:
+            pygame.draw.polygon(
+                self.surface,
+                colors.get_unit_color(unit),
+                pointlist
+            )
+        else:
+            pygame.draw.circle(
+                self.surface,
+                colors.get_unit_color(unit),
+                pos,
+                int(radius)
+            )
 
     def get_rect(self):
         """
@@ -324,96 +289,13 @@ class Map:
         w, h = self.map_size
         return pygame.Rect(x, y, w, h)
 
-    def get_unit_by_type(self, unit_type):
-        target_unit = None
-
-        if unit_type == 0:
-            return None
-
-        for unit in self.all_units:
-            if unit.type == unit_type:
-                target_unit = unit
-                break
-        else:
-            print("[Error]: Could not get unit by type.")
-
-        return target_unit
-
-    def initialize_units(self):
-        """
-        Place all units on map in initial positions.
-        """
-        # Create Unit objects and add to list
-        total_units = (2 * MAX_UNITS)
-        for unit_type in range(1, total_units + 1):
-            unit = Unit(unit_type)
-            self.all_units.append(unit)
-
-        # Determine this player's units
-        for unit in self.all_units:
-            if unit.is_players_unit(self.player_num):
-                self.players_units.append(unit)
-            else:
-                self.enemy_units.append(unit)
-
-        # Place units on grid
-        left_column = 0
-        right_column = self.grid.cols - 1
-        top_row = 0
-        middle_row = self.grid.rows // 2
-        bottom_row = self.grid.rows - 1
-        positions = {
-            1 : (left_column, top_row),
-            2 : (left_column, middle_row),
-            3 : (left_column, bottom_row),
-            4 : (right_column, top_row),
-            5 : (right_column, middle_row),
-            6 : (right_column, bottom_row)
-        }
-        for unit in self.all_units:
-            col, row = positions[unit.type]
-            unit.pos = [col, row]
-            self.grid.set_unit_type(col, row, unit.type)
-
     def mouse_position_inside_map(self, mouse_position):
         """
-        Returns true if mouse is positioned over map.
-        """
-        return self.get_rect().collidepoint(mouse_position)
-
-    def enemy_in_attack_range(self):
+        Returns true if mouse is positioned over a tile of the map.
         """
-        Returns true if an enemy unit is in self.selected_unit's attack range.
-        """
-        is_in_range = False
-        attack_range = self.selected_unit.get_range("attack", self.grid.cols, self.grid.rows)
-        for enemy_unit in self.enemy_units:
-            if enemy_unit.pos in attack_range:
-                is_in_range = True
-
-        return is_in_range
-
-    def kill_unit(self, unit):
-        column, row = unit.pos
-        self.grid.set_unit_type(column, row, 0)
-        if unit in self.all_units:
-            self.all_units.remove(unit)
-        if unit in self.players_units:
-            self.players_units.remove(unit)
-        if unit in self.enemy_units:
-            self.enemy_units.remove(unit)
-
-    def reset(self):
-        """
-        Initialize the map.
-
-        Removes special tile_types and
-        resets unit health and positions.
-        """
-        for row in range(self.grid.rows):
-            for col in range(self.grid.cols):
-                self.grid.set_tile_type(col, row, 0)
-
-        self.initialize_units()
+        if not self.get_rect().collidepoint(mouse_position):
+            return False
+        # Zoomed out, the map may not fill its rect
+        col, row = self.determine_tile_from_mouse_position(mouse_position)
+        return 0 <= col < self.grid.cols and 0 <= row < self.grid.rows
 
-        print("[Debug]: Map reset.")
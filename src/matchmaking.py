@@ -0,0 +1,176 @@
+"""
+File: matchmaking.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Queues players waiting for an opponent and decides who plays whom.
+
+Players are paired oldest first. A player may give a rating; rated
+players are only paired with players in the same or a neighbouring
+rating band, or with unrated players, until they have waited
+widen_after seconds, after which anyone will do. Unrated players
+take whoever has waited longest.
+
+Every band keeps a heap ordered by arrival, plus one heap for
+unrated players and one holding everyone, so joining and pairing
+cost O(log n) however many players are waiting. Players who leave
+are only marked; heaps skip them when they reach the top.
+
+"""
+
+import heapq
+import itertools
+import time
+
+# Width of a rating band
+DEFAULT_BAND_WIDTH = 100
+
+# Seconds before a rated player will take any opponent
+DEFAULT_WIDEN_AFTER = 30
+
+
+class Ticket:
+    """
+    A player's place in the queue.
+
+    Has attributes:
+        player -- Whatever the caller is queueing, e.g. a connection
+        rating {int} -- The player's rating, None if unrated
+        arrival {float} -- time.perf_counter() when the player joined
+        waiting {bool} -- False once paired or removed
+    """
+
+    __slots__ = ("player", "rating", "sequence", "arrival", "waiting")
+
+    def __init__(self, player, rating, sequence, arrival):
+        self.player = player
+        self.rating = rating
+        self.sequence = sequence
+        self.arrival = arrival
+        self.waiting = True
+
+
+class Matchmaker:
+    """
+    Pairs waiting players by arrival and rating band.
+    """
+
+    def __init__(self, band_width=DEFAULT_BAND_WIDTH, widen_after=DEFAULT_WIDEN_AFTER):
+        self.band_width = band_width
+        self.widen_after = widen_after
+
+        # Heaps of (sequence, Ticket)
+        self.everyone = []
+        self.unrated = []
+        self.bands = {}
+
+        self.sequence = itertools.count()
+
+        # Number of players waiting
+        self.depth = 0
+
+    def band(self, rating):
+        return rating // self.band_width
+
+    def peek(self, heap):
+        # Oldest ticket still waiting, dropping the ones that aren't
+        while heap and not heap[0][1].waiting:
+            heapq.heappop(heap)
+        if heap:
+            return heap[0][1]
+        return None
+
+    def add(self, player, rating=None):
+        """
+        Put a player in the queue, or pair them straight away.
+
+        Arguments:
+            player -- Whatever identifies the player to the caller
+            rating {int} -- The player's rating, None if unrated
+
+        Returns:
+            (Ticket, Ticket) -- The player's ticket and their opponent's
+                                Opponent will be None if the player is waiting
+        """
+        ticket = Ticket(player, rating, next(self.sequence), time.perf_counter())
+        opponent = self.find_opponent(ticket)
+        if opponent is not None:
+            self.remove(opponent)
+            ticket.waiting = False
+            return ticket, opponent
+
+        entry = (ticket.sequence, ticket)
+        heapq.heappush(self.everyone, entry)
+        if rating is None:
+            heapq.heappush(self.unrated, entry)
+        else:
+            heapq.heappush(self.bands.setdefault(self.band(rating), []), entry)
+        self.depth += 1
+        return ticket, None
+
+    def find_opponent(self, ticket):
+        """
+        Returns the longest waiting player the ticket may be paired with,
+        None if there isn't one.
+        """
+        if ticket.rating is None:
+            return self.peek(self.everyone)
+
+        band = self.band(ticket.rating)
+        opponent = self.peek(self.unrated)
+        for nearby in (band - 1, band, band + 1):
+            heap = self.bands.get(nearby)
+            if heap is None:
+                continue
+            candidate = self.peek(heap)
+            if candidate is None:
+                # Don't keep a heap for every band ever seen
+                del self.bands[nearby]
+            elif opponent is None or candidate.sequence < opponent.sequence:
+                opponent = candidate
+        return opponent
+
+    def remove(self, ticket):
+        """
+        Take a player out of the queue, e.g. when they disconnect.
+        """
+        if ticket.waiting:
+            ticket.waiting = False
+            self.depth -= 1
+
+    def sweep(self, now=None):
+        """
+        Pair players who have waited longer than widen_after
+        with whoever else has waited longest, ignoring ratings.
+
+        Returns:
+            [(Ticket, Ticket)] -- The pairs made, older player first
+        """
+        if now is None:
+            now = time.perf_counter()
+        pairs = []
+        while True:
+            oldest = self.peek(self.everyone)
+            if oldest is None or now - oldest.arrival < self.widen_after:
+                break
+            heapq.heappop(self.everyone)
+            opponent = self.peek(self.everyone)
+            if opponent is None:
+                # Nobody else is waiting
+                heapq.heappush(self.everyone, (oldest.sequence, oldest))
+                break
+            self.remove(oldest)
+            self.remove(opponent)
+            pairs.append((oldest, opponent))
+        return pairs
+
+    def oldest_wait(self, now=None):
+        """
+        Returns seconds the longest waiting player has waited, 0 if none.
+        """
+        oldest = self.peek(self.everyone)
+        if oldest is None:
+            return 0
+        if now is None:
+            now = time.perf_counter()
+        return now - oldest.arrival
@@ -7,11 +7,19 @@ Contains the Network class which adds connectivity to a client.
 
 """
 
+import select
 import socket
-import pickle
+import time
 
-from src.encryption import encrypt, decrypt
-from src.gamestate import GameState
+from src.codec import encode_turn, decode_gamestate, decode_changes, CodecError
+from src.encryption import Handshake, BroadcastCipher, EncryptionError
+from src.core.gamestate import GameState
+from src.protocol import pack_frame, FrameReader, ProtocolError, MSG_TEXT, MSG_GAMESTATE, MSG_EVENT
+from src.protocol import MSG_DELTA, MSG_TURN, MSG_HELLO, MSG_BROADCAST, INVALID_SESSION
+from src.protocol import HEARTBEAT_INTERVAL, HELLO_WATCH
+
+# Bytes read from the socket at a time
+RECEIVE_SIZE = 65536
 
 class Network:
     """
@@ -27,85 +35,407 @@ class Network:
         self.ADDR = (self.HOST, self.PORT)
         self.player_num = None
 
+        # Given by the server when seated, lets a dropped connection resume
+        self.token = None
+
+        # False once the server can't be reached, until resume() succeeds
+        self.connected = False
+
+        # When anything was last sent, for heartbeat()
+        self.last_send = time.monotonic()
+
+        # Holds received bytes until a whole frame arrives
+        self.frames = FrameReader()
+
+        # Cipher agreed on with the server in connect()
+        self.session = None
+
+        # Opens a watched match's updates, set by watch()
+        self.broadcast = None
+
+        # Events pushed by the server that haven't been handled
+        self.events = []
+
         gamestate = GameState()
 
     def get_gamestate(self):
         self.send_command("get")
-        return self.receive_pickle()
+        return self.receive_gamestate()
+
+    def sync_gamestate(self, version):
+        """
+        Ask the server what changed since a given version.
 
-    def send_movelist(self, movelist):
-        self.send_command("movelist")
-        reply = self.receive() # Check for reply?
-        self.send_pickle(movelist)
+        Arguments:
+            version {int} -- Version of the client's GameState
+
+        Returns:
+            [tuple] -- Changes to apply; empty if nothing changed
+            {GameState} -- The whole state if the server has no delta
+            Will be None if the connection failed
+        """
+        self.send_command("sync " + str(version))
+        return self.receive_changes()
+
+    def receive_changes(self):
+        # Reply to "sync" or "resume", see sync_gamestate()
+        frame = self.receive_frame()
+        if frame is None:
+            return None
+        msg_type, data = frame
+        try:
+            if msg_type == MSG_DELTA:
+                return decode_changes(data)
+            if msg_type == MSG_GAMESTATE:
+                return decode_gamestate(data)
+        except CodecError as e:
+            print(str(e))
+            return None
+        return []
 
     def send_turn(self, turn):
-        self.send_command("turn")
-        reply = self.receive() # Check for reply?
-        self.send_pickle(turn)
+        # Send the turn right behind the command instead of
+        # waiting for the server's reply first, in one write
+        # so Nagle's algorithm doesn't hold the turn back
+        self.send_frames([(MSG_TEXT, b"turn"), (MSG_TURN, encode_turn(turn))])
+        return self.receive()
+
+    def send_ready(self):
+        # Tell the server this player is ready to start
+        self.send_command("start")
+        return self.receive()
 
     def request_turn(self):
         self.send_command("request_turn")
         turn = self.receive_integer()
         return turn
 
+    def subscribe(self):
+        """
+        Ask the server to push turn and game events
+        instead of waiting for request_turn polls.
+        """
+        self.send_command("subscribe")
+        return self.receive()
+
+    def poll_events(self):
+        """
+        Collect events pushed by the server without blocking.
+
+        Returns:
+            [str] -- Events received since the last call, oldest first
+        """
+        try:
+            # Frames may have arrived along with the last reply
+            self.buffer_events()
+            while select.select([self.CLIENT], [], [], 0)[0]:
+                data = self.CLIENT.recv(RECEIVE_SIZE)
+                if not data:
+                    self.connected = False
+                    break
+                self.frames.feed(data)
+                self.buffer_events()
+        except (socket.error, ProtocolError, EncryptionError) as e:
+            print(str(e))
+            self.connected = False
+
+        events = self.events
+        self.events = []
+        return events
+
+    def wait_for_events(self, timeout=None):
+        """
+        Block until the server pushes at least one event.
+
+        Arguments:
+            timeout {float} -- Seconds to wait, None waits forever
+
+        Returns:
+            [str] -- Events received, oldest first
+                     Will be empty if the wait timed out or the connection closed
+        """
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        try:
+            self.buffer_events()
+            while not self.events:
+                remaining = None
+                if timeout is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                if not select.select([self.CLIENT], [], [], remaining)[0]:
+                    break
+                data = self.CLIENT.recv(RECEIVE_SIZE)
+                if not data:
+                    self.connected = False
+                    break
+                self.frames.feed(data)
+                self.buffer_events()
+        except (socket.error, ProtocolError, EncryptionError) as e:
+            print(str(e))
+            self.connected = False
+
+        return self.poll_events()
+
+    def buffer_events(self):
+        # Move complete event frames from the front of the buffer
+        frame = self.frames.next_frame()
+        while frame is not None:
+            msg_type, payload = frame
+            # Decrypt everything to keep the session counter in step
+            data = self.session.decrypt(payload)
+            if msg_type != MSG_EVENT:
+                print("[Error]: Unexpected message from server.")
+            else:
+                self.events.append(data.decode())
+            frame = self.frames.next_frame()
+
     def send_command(self, data):
         # Send data to server
+        self.send_frame(MSG_TEXT, data.encode())
+
+    def send_frame(self, msg_type, data):
+        self.send_frames([(msg_type, data)])
+
+    def send_frames(self, frames):
+        # Encrypt and send (msg_type, data) pairs in one write
         try:
-            encrypted_data = encrypt(data.encode())
-            self.CLIENT.sendall(encrypted_data)
+            data = b"".join(pack_frame(msg_type, self.session.encrypt(data)) for msg_type, data in frames)
+            self.CLIENT.sendall(data)
+            self.last_send = time.monotonic()
         except socket.error as e:
             print(str(e))
-            
-    def send_pickle(self, data):
-        # Send move or attack to server
-        data_pickle = pickle.dumps(data)
+            self.connected = False
+
+    def heartbeat(self):
+        # Let the server know an idle client is still there
+        if self.connected and time.monotonic() - self.last_send >= HEARTBEAT_INTERVAL:
+            self.send_command("ping")
+
+    def handshake(self, route=b""):
+        """
+        Exchange keys with the server and start the session.
+
+        Arguments:
+            route {bytes} -- Sent after the public key when resuming or watching,
+                             see protocol.py
+
+        Raises:
+            EncryptionError -- If the server's reply isn't a valid handshake
+        """
+        handshake = Handshake()
+        self.CLIENT.sendall(pack_frame(MSG_HELLO, handshake.public_key + route))
+
+        frame = self.frames.next_frame()
+        while frame is None:
+            data = self.CLIENT.recv(RECEIVE_SIZE)
+            if not data:
+                raise EncryptionError("Server closed the connection during handshake.")
+            self.frames.feed(data)
+            frame = self.frames.next_frame()
+
+        msg_type, public_key = frame
+        if msg_type != MSG_HELLO:
+            raise EncryptionError("Server didn't answer the handshake.")
+        self.session = handshake.create_session(public_key, is_client=True)
+
+    def receive_frame(self):
+        """
+        Read from the socket until a whole frame is buffered.
+        Events that arrive first are set aside for poll_events().
+
+        Returns:
+            (int, bytes) -- The msg_type and decrypted payload
+                            Will be None if the connection failed
+        """
         try:
-            encrypted_data = encrypt(data_pickle)
-            self.CLIENT.sendall(encrypted_data)
-        except socket.error as e:
+            while True:
+                frame = self.frames.next_frame()
+                if frame is None:
+                    data = self.CLIENT.recv(RECEIVE_SIZE)
+                    if not data:
+                        print("[Error]: Server closed the connection.")
+                        self.connected = False
+                        return None
+                    self.frames.feed(data)
+                elif frame[0] == MSG_EVENT:
+                    self.events.append(self.session.decrypt(frame[1]).decode())
+                else:
+                    break
+            msg_type, payload = frame
+            return msg_type, self.session.decrypt(payload)
+        except (socket.error, ProtocolError, EncryptionError) as e:
             print(str(e))
+            self.connected = False
+            return None
 
-    def receive_pickle(self):
+    def receive_gamestate(self):
         """
-        Retrieve pickle from server.
+        Retrieve gamestate from server.
         
         Returns:
-            {object} -- An object loaded from pickle
+            {GameState} -- The server's current state of the game
         """
+        frame = self.receive_frame()
+        if frame is None:
+            return None
+        msg_type, data = frame
+        if msg_type != MSG_GAMESTATE:
+            print("[Error]: Expected gamestate from server.")
+            return None
         try:
-            decrypted_data = decrypt(self.CLIENT.recv(2048))
-            return pickle.loads(decrypted_data)
-        except socket.error as e:
+            return decode_gamestate(data)
+        except CodecError as e:
             print(str(e))
             return None
 
     def receive(self):
-        try:
-            decrypted_data = decrypt(self.CLIENT.recv(2048))
-            data = decrypted_data.decode()
-            return data
-        except socket.error as e:
-            print(str(e))
+        frame = self.receive_frame()
+        if frame is None:
+            return None
+        msg_type, data = frame
+        if msg_type != MSG_TEXT:
+            print("[Error]: Expected text from server.")
             return None
+        return data.decode()
 
     def receive_integer(self):
         try:
             player_num = int(self.receive())
             return player_num
-        except ValueError as e:
+        except (TypeError, ValueError) as e:
             print(str(e))
             return None
 
-    def connect(self):
-         # Connect to server
+    def connect(self, rating=None):
+        """
+        Join the matchmaking queue and wait for an opponent.
+
+        Arguments:
+            rating {int} -- Only play opponents with a similar rating
+                            for a while, None to play anyone
+        """
         self.CLIENT.connect(self.ADDR)
-        self.player_num = self.receive_integer()
+        self.handshake()
+        self.connected = True
+        if rating is None:
+            self.send_command("join")
+        else:
+            self.send_command("join " + str(rating))
+        self.read_seat(self.receive())
         print("Connected to server:", self.HOST)
 
+    def read_seat(self, reply):
+        # Server replies "<player_num> <token>" when a player is seated
+        try:
+            player_num, self.token = reply.split(" ")
+            self.player_num = int(player_num)
+            return True
+        except (AttributeError, ValueError):
+            print("[Error]: Unexpected reply when seated:", reply)
+            return False
+
+    def resume(self, version):
+        """
+        Reconnect after the connection dropped and
+        take back this player's seat in the match.
+
+        Arguments:
+            version {int} -- Version of the client's GameState
+
+        Returns:
+            The changes missed, as for sync_gamestate()
+            Will be None if the session is gone or the server can't be reached
+        """
+        timeout = self.CLIENT.gettimeout()
+        self.CLIENT.close()
+        self.CLIENT = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.CLIENT.settimeout(timeout)
+        self.frames = FrameReader()
+        self.session = None
+        try:
+            self.CLIENT.connect(self.ADDR)
+            # First byte of the token tells the server where the match is
+            self.handshake(bytes.fromhex(self.token[:2]))
+        except (socket.error, EncryptionError) as e:
+            print(str(e))
+            return None
+
+        self.connected = True
+        self.send_command("resume {} {}".format(self.token, version))
+        reply = self.receive()
+        if reply is None or reply == INVALID_SESSION or not self.read_seat(reply):
+            print("[Error]: Unable to resume session.")
+            self.connected = False
+            return None
+        return self.receive_changes()
+
+    def watch(self, match_id, route=0):
+        """
+        Connect as a spectator of a match instead of as a player.
+        Read its updates with receive_broadcast().
+
+        Arguments:
+            match_id {int} -- The match to watch
+            route {int} -- Worker holding the match, the first byte
+                           of its players' session tokens
+
+        Returns:
+            bool -- False if the server has no such match
+        """
+        self.CLIENT.connect(self.ADDR)
+        self.handshake(bytes([route, HELLO_WATCH]))
+        self.connected = True
+        self.send_command("watch " + str(match_id))
+
+        # Server replies "ok <key> <count>"
+        parts = (self.receive() or "").split(" ")
+        if len(parts) != 3 or parts[0] != "ok":
+            print("[Error]: Unable to watch match", match_id)
+            return False
+        self.broadcast = BroadcastCipher(bytes.fromhex(parts[1]), int(parts[2]))
+        return True
+
+    def receive_broadcast(self):
+        """
+        Wait for the next update to the watched match.
+
+        Returns:
+            [tuple] -- Changes to apply to the last state received
+            {GameState} -- The whole state; always sent first, and
+                           again whenever updates had to be skipped
+            Will be None if the connection failed
+        """
+        try:
+            while True:
+                frame = self.frames.next_frame()
+                if frame is None:
+                    data = self.CLIENT.recv(RECEIVE_SIZE)
+                    if not data:
+                        print("[Error]: Server closed the connection.")
+                        self.connected = False
+                        return None
+                    self.frames.feed(data)
+                elif frame[0] != MSG_BROADCAST:
+                    print("[Error]: Unexpected message from server.")
+                    self.session.decrypt(frame[1])
+                else:
+                    break
+            data = self.broadcast.decrypt(frame[1])
+            if data[0] == MSG_DELTA:
+                return decode_changes(data[1:])
+            return decode_gamestate(data[1:])
+        except (socket.error, ProtocolError, EncryptionError, CodecError) as e:
+            print(str(e))
+            self.connected = False
+            return None
+
     def get_player_num(self):
         return self.player_num
 
     def close(self):
         # Close CLIENT socket
-        self.send_command("quit")
-        self.CLIENT.close()
\ No newline at end of file
+        if self.session is not None and self.connected:
+            self.send_command("quit")
+        self.CLIENT.close()
@@ -0,0 +1,143 @@
+"""
+File: protocol.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Frames messages sent between clients and the server.
+
+Every message is a five byte header followed by its payload:
+    length {uint32} -- Size of the payload in bytes
+    msg_type {uint8} -- What the payload holds (see MSG_* below)
+
+A connection opens with a MSG_HELLO from each side; every
+payload after that is encrypted with the session cipher,
+apart from broadcasts to spectators.
+
+The client's hello is its public key. A new player then sends
+"join" or "join <rating>" and, once paired with an opponent, is
+sent "<player_num> <token>". A client resuming a
+dropped connection appends the first byte of its session token
+to the hello (it names the worker holding the match), sends
+"resume <token> <version>" and gets the same reply followed by
+the changes it missed, as for "sync".
+
+A spectator appends the route byte and HELLO_WATCH to its hello
+and sends "watch <match_id>". The reply is "ok <key> <count>":
+the hex broadcast key and the nonce of the last broadcast. From
+then on the server sends MSG_BROADCAST frames, sealed with the
+broadcast key, whose first byte is MSG_GAMESTATE or MSG_DELTA.
+
+"""
+
+import struct
+
+HEADER = struct.Struct("!IB")
+
+# Largest payload either side will accept
+MAX_PAYLOAD_SIZE = 1 << 20
+
+# Message types
+MSG_TEXT = 1      # Commands and short replies, utf-8
+MSG_GAMESTATE = 2 # GameState, see codec.py
+MSG_EVENT = 3     # Pushed by the server to subscribed clients, utf-8
+MSG_DELTA = 4     # List of GameState changes, see codec.py
+MSG_TURN = 5      # A player's move and attack, see codec.py
+MSG_HELLO = 6     # Handshake public key, unencrypted
+MSG_BROADCAST = 7 # Update for spectators, sealed with the match's broadcast key
+
+# Reply to "sync" when the client is already up to date
+NOT_MODIFIED = "not_modified"
+
+# Reply to a turn the server refused, followed by the reason
+INVALID_TURN = "invalid"
+
+# Reply to "resume" when the session has expired or never existed
+INVALID_SESSION = "invalid_session"
+
+# Reply to "watch" when there is no such match
+INVALID_MATCH = "invalid_match"
+
+# Last byte of a spectator's hello
+HELLO_WATCH = 1
+
+# Idle clients send "ping" this often so the server knows they're alive
+HEARTBEAT_INTERVAL = 10
+
+# Events pushed to subscribed clients
+EVENT_YOUR_TURN = "your_turn"
+EVENT_OPPONENT_READY = "opponent_ready"
+EVENT_GAME_OVER = "game_over"
+
+
+class ProtocolError(Exception):
+    """
+    Raised when the peer sends a frame that can't be valid.
+    """
+
+
+def pack_frame(msg_type, payload):
+    """
+    Prefix a payload with its length and type.
+
+    Arguments:
+        msg_type {int} -- One of the MSG_* constants
+        payload {bytes} -- The message body
+
+    Returns:
+        bytes -- The framed message, ready to send
+    """
+    return HEADER.pack(len(payload), msg_type) + payload
+
+
+class FrameReader:
+    """
+    Buffers bytes from a stream and splits them into frames.
+
+    A single read may hold part of a frame or several
+    frames at once; feed() every read and call
+    next_frame() until it returns None.
+
+    Has attributes:
+        limits {dict} -- Largest payload allowed for each msg_type, checked
+                         as soon as the header arrives; other types are refused.
+                         None allows any type up to MAX_PAYLOAD_SIZE
+    """
+
+    def __init__(self, limits=None):
+        self.buffer = bytearray()
+        self.limits = limits
+
+    def feed(self, data):
+        self.buffer += data
+
+    def next_frame(self):
+        """
+        Remove the next complete frame from the buffer.
+
+        Returns:
+            (int, bytes) -- The msg_type and payload of the frame
+                            Will be None if no full frame is buffered
+
+        Raises:
+            ProtocolError -- If the frame's header breaks the limits
+        """
+        if len(self.buffer) < HEADER.size:
+            return None
+
+        length, msg_type = HEADER.unpack_from(self.buffer)
+        if self.limits is None:
+            limit = MAX_PAYLOAD_SIZE
+        else:
+            limit = self.limits.get(msg_type)
+            if limit is None:
+                raise ProtocolError("Unexpected frame of type {}.".format(msg_type))
+        if length > limit:
+            raise ProtocolError("Frame of {} bytes is too large.".format(length))
+
+        end = HEADER.size + length
+        if len(self.buffer) < end:
+            return None
+
+        payload = bytes(self.buffer[HEADER.size:end])
+        del self.buffer[:end]
+        return msg_type, payload
@@ -0,0 +1,52 @@
+"""
+File: ratelimit.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Token buckets for limiting how fast a client may send commands.
+
+A bucket refills at a steady rate up to its capacity, and every
+command takes one token. A client that runs out isn't refused;
+take() says how long to wait, and the server stops reading from
+that client for that long. Its commands then back up in its own
+socket instead of taking time from other matches.
+
+"""
+
+import time
+
+
+class TokenBucket:
+    """
+    Allows rate events per second on average,
+    in bursts of up to capacity.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity):
+        """
+        Arguments:
+            rate {float} -- Tokens added per second
+            capacity {float} -- Most tokens the bucket holds, starts full
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now=None):
+        """
+        Take a token, going into debt if there are none.
+
+        Returns:
+            float -- Seconds until the token would have been there, 0 if it was
+        """
+        if now is None:
+            now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0
+        return -self.tokens / self.rate
@@ -0,0 +1,195 @@
+"""
+File: replay.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Replays recorded matches against GameState without pygame or
+a server, to check archived games still hold up after a rule
+change.
+
+A recorded match is a list of turns in the shape the server
+receives them, {"move": [unit_type, col, row] or None,
+"attack": [unit_type, attack_power] or None}, starting with
+player 1 and alternating. Archives are JSON Lines files with
+one match per line:
+    {"id": ..., "turns": [...], "winner": 1}
+where winner is optional and checked against the replay.
+
+"""
+
+import json
+import multiprocessing
+
+from src.codec import encode_gamestate, decode_gamestate
+from src.core.constants import GRID_COLUMNS, GRID_ROWS
+from src.core.gamestate import GameState
+from src.core.rules import TurnValidator
+
+# Turns between the checkpoints kept for seeking
+CHECKPOINT_INTERVAL = 64
+
+# Matches handed to a pool worker at a time
+CHUNK_SIZE = 64
+
+
+class ReplayError(Exception):
+    """
+    Raised when a recorded turn breaks the rules.
+    """
+
+    def __init__(self, index, reason):
+        Exception.__init__(self, "turn {}: {}".format(index, reason))
+        self.index = index
+        self.reason = reason
+
+
+def new_gamestate():
+    # Replays don't need a change log, so skip keeping one
+    gamestate = GameState()
+    gamestate.changes = None
+    return gamestate
+
+
+class Replay:
+    """
+    Steps through one recorded match.
+
+    A checkpoint of the GameState is saved every
+    CHECKPOINT_INTERVAL turns on the way forward, so seeking
+    back only replays from the nearest checkpoint.
+    """
+
+    def __init__(self, turns, validator=None, checkpoint_interval=CHECKPOINT_INTERVAL):
+        """
+        Arguments:
+            turns {[dict]} -- The recorded turns, oldest first
+            validator {TurnValidator} -- Checks every turn, None to skip checks
+            checkpoint_interval {int} -- Turns between checkpoints
+        """
+        self.turns = turns
+        self.validator = validator
+        self.checkpoint_interval = checkpoint_interval
+
+        self.gamestate = new_gamestate()
+        # Turns applied to gamestate
+        self.index = 0
+
+        # Encoded GameState after each multiple of checkpoint_interval turns
+        self.checkpoints = [encode_gamestate(self.gamestate)]
+
+    def step(self):
+        """
+        Apply the next turn.
+
+        Raises:
+            ReplayError -- If the validator rejects the turn
+        """
+        gamestate = self.gamestate
+        turn = self.turns[self.index]
+        if self.validator is not None:
+            error = self.validator.validate(gamestate, gamestate.get_turn(), turn)
+            if error is not None:
+                raise ReplayError(self.index, error)
+        gamestate.apply_turn(turn)
+        self.index += 1
+
+        if self.index % self.checkpoint_interval == 0 and \
+           self.index // self.checkpoint_interval == len(self.checkpoints):
+            self.checkpoints.append(encode_gamestate(gamestate))
+
+    def seek(self, index):
+        """
+        Move to the state after a given number of turns.
+
+        Arguments:
+            index {int} -- Turns to have applied, 0 to len(turns)
+
+        Returns:
+            GameState -- The state at that point; don't modify it
+        """
+        index = max(0, min(index, len(self.turns)))
+        checkpoint = min(index // self.checkpoint_interval, len(self.checkpoints) - 1)
+        checkpoint_index = checkpoint * self.checkpoint_interval
+        if index < self.index or checkpoint_index > self.index:
+            self.gamestate = decode_gamestate(self.checkpoints[checkpoint])
+            self.index = checkpoint_index
+
+        while self.index < index:
+            self.step()
+        return self.gamestate
+
+    def run(self):
+        """
+        Replay every remaining turn.
+
+        Returns:
+            GameState -- The state at the end of the match
+        """
+        return self.seek(len(self.turns))
+
+
+def verify_match(record, validator):
+    """
+    Replay a match from an archive, checking every turn.
+
+    Arguments:
+        record {dict} -- One line of an archive
+        validator {TurnValidator} -- Checks each turn
+
+    Returns:
+        dict -- id, turns replayed, winner and error (None if the match is valid)
+    """
+    turns = record["turns"]
+    # Checkpoints are only needed for seeking
+    replay = Replay(turns, validator, checkpoint_interval=len(turns) + 1)
+    error = None
+    try:
+        gamestate = replay.run()
+    except ReplayError as e:
+        gamestate = replay.gamestate
+        error = str(e)
+    except (KeyError, TypeError, ValueError) as e:
+        gamestate = replay.gamestate
+        error = "turn {}: malformed ({})".format(replay.index, e)
+
+    if error is None and "winner" in record and record["winner"] != gamestate.winner:
+        error = "winner is {}, recorded {}".format(gamestate.winner, record["winner"])
+
+    return {"id" : record.get("id"), "turns" : replay.index, "winner" : gamestate.winner, "error" : error}
+
+
+# One validator per pool worker, built on first use
+worker_validator = None
+
+
+def verify_line(line):
+    global worker_validator
+    if worker_validator is None:
+        worker_validator = TurnValidator(GRID_COLUMNS, GRID_ROWS)
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return {"id" : None, "turns" : 0, "winner" : None, "error" : "unreadable: " + str(e)}
+    return verify_match(record, worker_validator)
+
+
+def verify_archive(path, processes=None):
+    """
+    Replay every match in an archive across a pool of processes.
+
+    Arguments:
+        path {str} -- JSON Lines archive
+        processes {int} -- Pool size, None for one per CPU
+
+    Returns:
+        generator -- Result of verify_match() for each match, in archive order
+    """
+    with open(path) as archive:
+        lines = (line for line in archive if line.strip())
+        if processes == 1:
+            for line in lines:
+                yield verify_line(line)
+            return
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap(verify_line, lines, CHUNK_SIZE):
+                yield result
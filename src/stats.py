@@ -0,0 +1,139 @@
+"""
+File: stats.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Counters and histograms the server keeps while it runs.
+
+Histograms use log-linear buckets: four buckets for every
+power of two, so recording a value is a bit_length() and a
+list increment and percentiles are within 25% of the true
+value. That is cheap enough to leave on all the time.
+
+"""
+
+import time
+from collections import Counter
+
+# Buckets per power of two, as a number of bits
+SUB_BUCKET_BITS = 2
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+# Enough buckets for values up to 2 ** 40
+BUCKET_COUNT = 40 * SUB_BUCKETS
+
+PERCENTILES = (50, 95, 99)
+
+
+def bucket_index(value):
+    # Small values get a bucket each, larger ones
+    # share a bucket with their top SUB_BUCKET_BITS bits
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return min(shift * SUB_BUCKETS + (value >> shift), BUCKET_COUNT - 1)
+
+
+def bucket_upper_bound(index):
+    # Largest value that falls in a bucket
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index % SUB_BUCKETS + SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+class Histogram:
+    """
+    Distribution of non-negative integer values.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        self.buckets[bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """
+        Returns the upper bound of the bucket holding a percentile.
+
+        Arguments:
+            percent {float} -- Between 0 and 100
+        """
+        rank = self.count * percent / 100
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(bucket_upper_bound(index), self.max)
+        return self.max
+
+    def summary(self):
+        summary = {"count" : self.count, "mean" : round(self.total / self.count, 1) if self.count else 0}
+        for percent in PERCENTILES:
+            summary["p{}".format(percent)] = self.percentile(percent)
+        summary["max"] = self.max
+        return summary
+
+
+class Stats:
+    """
+    Named counters plus histograms of timings and sizes.
+
+    Has attributes:
+        counters {Counter} -- Running totals, e.g. bytes_in
+        timings {dict} -- Histograms of durations in microseconds
+        sizes {dict} -- Histograms of sizes in bytes
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.counters = Counter()
+        self.timings = {}
+        self.sizes = {}
+
+    def record_time(self, name, start):
+        """
+        Record the time elapsed since start.
+
+        Arguments:
+            name {str} -- What was timed
+            start {float} -- time.perf_counter() taken when it began
+        """
+        elapsed = int((time.perf_counter() - start) * 1000000)
+        histogram = self.timings.get(name)
+        if histogram is None:
+            histogram = self.timings[name] = Histogram()
+        histogram.record(elapsed)
+
+    def record_size(self, name, size):
+        histogram = self.sizes.get(name)
+        if histogram is None:
+            histogram = self.sizes[name] = Histogram()
+        histogram.record(size)
+
+    def snapshot(self, gauges=None):
+        """
+        Returns everything recorded so far as plain data.
+
+        Arguments:
+            gauges {dict} -- Current values to include, e.g. open connections
+
+        Returns:
+            dict -- Ready to be encoded as JSON
+        """
+        return {
+            "uptime_sec" : round(time.monotonic() - self.started, 1),
+            "gauges" : gauges or {},
+            "counters" : dict(sorted(self.counters.items())),
+            "timings_us" : {name : histogram.summary() for name, histogram in sorted(self.timings.items())},
+            "sizes_bytes" : {name : histogram.summary() for name, histogram in sorted(self.sizes.items())},
+        }
@@ -0,0 +1,107 @@
+"""
+File: timers.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+A hashed timer wheel for the server's many coarse timeouts,
+such as heartbeats and reconnect grace periods.
+
+Timers are dropped into one of a fixed ring of slots by the tick
+they expire on, so scheduling and cancelling are O(1) no matter
+how many connections are waiting. A single task turns the wheel
+once per tick and runs whatever is due; timers further away than
+one turn of the ring wait in their slot for later rounds.
+
+"""
+
+import asyncio
+import math
+import time
+
+# Seconds per tick, and how many slots the ring has
+DEFAULT_TICK = 1.0
+DEFAULT_SLOTS = 64
+
+
+class Timer:
+    """
+    A callback waiting in the wheel. Cancel with cancel().
+    """
+
+    __slots__ = ("deadline", "callback", "args", "cancelled")
+
+    def __init__(self, deadline, callback, args):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class TimerWheel:
+    """
+    Runs callbacks after a delay, to the nearest tick.
+    """
+
+    def __init__(self, tick=DEFAULT_TICK, slot_count=DEFAULT_SLOTS):
+        self.tick = tick
+        self.slots = [[] for _ in range(slot_count)]
+
+        # Ticks the wheel has turned
+        self.current = 0
+        self.started = time.monotonic()
+
+    def schedule(self, delay, callback, *args):
+        """
+        Call callback(*args) once delay seconds have passed.
+
+        Arguments:
+            delay {float} -- Seconds to wait, rounded up to a whole tick
+
+        Returns:
+            Timer -- Handle for cancelling the call
+        """
+        deadline = self.current + max(1, math.ceil(delay / self.tick))
+        timer = Timer(deadline, callback, args)
+        self.slots[deadline % len(self.slots)].append(timer)
+        return timer
+
+    def advance(self):
+        """
+        Turn the wheel one tick and run the timers that are due.
+        """
+        self.current += 1
+        index = self.current % len(self.slots)
+        slot = self.slots[index]
+        if not slot:
+            return
+
+        due = []
+        waiting = []
+        for timer in slot:
+            if timer.cancelled:
+                continue
+            if timer.deadline <= self.current:
+                due.append(timer)
+            else:
+                waiting.append(timer)
+        self.slots[index] = waiting
+
+        for timer in due:
+            try:
+                timer.callback(*timer.args)
+            except Exception as e:
+                print("[Error]: Timer callback failed:", repr(e))
+
+    async def run(self):
+        """
+        Turn the wheel in step with the clock until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self.tick)
+            # Catch up if the loop was too busy to wake on time
+            elapsed_ticks = int((time.monotonic() - self.started) / self.tick)
+            while self.current < elapsed_ticks:
+                self.advance()
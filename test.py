@@ -1,5 +1,5 @@
 #Test file for functions
-from src.unit import Unit
+from src.core.unit import Unit
 
 cols = 9
 rows = 6
@@ -11,6 +11,6 @@ grid[1][7] = [0,1]
 
 my_unit = Unit(1)
 my_unit.pos = [7, 1]
-range_list = my_unit.get_move_range(cols, rows)
+range_list = my_unit.get_range("move", cols, rows)
 
 print(range_list)
\ No newline at end of file
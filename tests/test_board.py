@@ -0,0 +1,43 @@
+"""
+File: test_board.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Checks that a Board loaded from a GameState matches it,
+whatever the board did locally beforehand.
+
+"""
+
+from src.core.board import Board
+from src.core.gamestate import GameState, starting_locations
+
+
+def test_load_brings_back_a_unit_killed_locally():
+    board = Board(1)
+    board.kill_unit(board.get_unit_by_type(4))
+    assert board.get_unit_by_type(4) is None
+
+    gamestate = GameState()
+    board.load_gamestate(gamestate)
+    unit = board.get_unit_by_type(4)
+    col, row = starting_locations(board.grid.cols, board.grid.rows)[4]
+    assert unit.health == gamestate.unit_health[4]
+    assert unit.pos == [col, row]
+    assert board.get_unit_at(col, row) is unit
+    assert board.grid.get_unit_type(col, row) == 4
+
+
+def test_load_swaps_units_and_drops_dead_ones():
+    board = Board(1)
+    gamestate = GameState()
+    locations = starting_locations(board.grid.cols, board.grid.rows)
+    gamestate.set_location(1, locations[2])
+    gamestate.set_location(2, locations[1])
+    gamestate.unit_health[5] = 0
+
+    board.load_gamestate(gamestate)
+    assert board.get_unit_at(*locations[2]).type == 1
+    assert board.get_unit_at(*locations[1]).type == 2
+    assert board.get_unit_by_type(5) is None
+    assert board.get_unit_at(*locations[5]) is None
+    assert board.grid.get_unit_type(*locations[5]) == 0
@@ -0,0 +1,34 @@
+"""
+File: test_bot.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Checks that the UnitTable a Bot keeps for a match stays equal
+to one built from scratch as the server's changes come in.
+
+"""
+
+from src.bot import Bot
+from src.constants import GRID_COLUMNS, GRID_ROWS
+from src.core.gamestate import GameState
+from src.core.unittable import UnitTable
+from src.replay import new_gamestate
+
+
+def test_units_follow_the_servers_changes():
+    server = GameState()
+    bot = Bot(None, seed=5)
+    bot.gamestate = new_gamestate()
+    for _ in range(300):
+        if server.game_is_over:
+            break
+        bot.player_num = server.get_turn()
+        turn = bot.choose_turn()
+        version = server.version
+        server.apply_turn({"move" : turn["move"], "attack" : turn["attack"]})
+        bot.apply_changes(server.changes_since(version))
+
+        expected = UnitTable.from_gamestate(server, GRID_COLUMNS, GRID_ROWS)
+        assert (bot.units.health == expected.health).all()
+        assert (bot.units.col == expected.col).all()
+        assert (bot.units.row == expected.row).all()
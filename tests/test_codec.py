@@ -0,0 +1,63 @@
+"""
+File: test_codec.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Checks that everything the codec packs comes back unchanged.
+
+"""
+
+import pytest
+
+from src.codec import encode_gamestate, decode_gamestate, encode_turn, decode_turn
+from src.codec import encode_changes, decode_changes, CodecError
+from src.constants import END_TURN
+from src.core.gamestate import GameState
+
+
+def played_gamestate():
+    gamestate = GameState()
+    gamestate.set_ready(1)
+    gamestate.set_ready(2)
+    gamestate.apply_turn({"move": [1, 3, 4], "attack": [5, 2], "phase": END_TURN})
+    gamestate.apply_turn({"move": None, "attack": [1, 100], "phase": END_TURN})
+    return gamestate
+
+
+def test_gamestate_round_trip():
+    gamestate = played_gamestate()
+    decoded = decode_gamestate(encode_gamestate(gamestate))
+
+    assert decoded.version == gamestate.version
+    assert decoded.turn == gamestate.turn
+    assert decoded.ready_state == gamestate.ready_state
+    assert decoded.unit_locations == gamestate.unit_locations
+    assert decoded.unit_health == gamestate.unit_health
+    assert decoded.game_is_over == gamestate.game_is_over
+    assert decoded.winner == gamestate.winner
+    assert decoded.army_size == gamestate.army_size
+    # Client copies don't keep a change log
+    assert decoded.changes is None
+
+
+@pytest.mark.parametrize("turn", [
+    {"move": None, "attack": None, "phase": END_TURN},
+    {"move": [4, 10, 2], "attack": None, "phase": END_TURN},
+    {"move": None, "attack": [6, 3], "phase": END_TURN},
+    {"move": [4, 10, 2], "attack": [6, 3], "phase": END_TURN},
+])
+def test_turn_round_trip(turn):
+    assert decode_turn(encode_turn(turn)) == turn
+
+
+def test_changes_round_trip():
+    changes = played_gamestate().changes
+    assert decode_changes(encode_changes(changes)) == changes
+
+
+def test_damaged_data_is_rejected():
+    data = encode_gamestate(played_gamestate())
+    with pytest.raises(CodecError):
+        decode_gamestate(data[:-1])
+    with pytest.raises(CodecError):
+        decode_gamestate(b"\xff" + data[1:])
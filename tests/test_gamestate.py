@@ -0,0 +1,43 @@
+"""
+File: test_gamestate.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Checks that GameState's index of occupied tiles follows its
+units however they move, die or are brought up to date.
+
+"""
+
+from src.codec import encode_gamestate, decode_gamestate
+from src.constants import END_TURN
+from src.core.gamestate import GameState
+
+
+def expected_tiles(gamestate):
+    return {tuple(location): unit_type
+            for unit_type, location in gamestate.unit_locations.items() if location is not None}
+
+
+def test_unit_tiles_follow_moves_and_deaths():
+    gamestate = GameState()
+    gamestate.apply_turn({"move": [1, 3, 4], "attack": None, "phase": END_TURN})
+    gamestate.apply_turn({"move": [4, 8, 4], "attack": None, "phase": END_TURN})
+    gamestate.apply_turn({"move": [1, 5, 5], "attack": [4, 100], "phase": END_TURN})
+    assert gamestate.unit_tiles == {(5, 5): 1}
+    assert gamestate.unit_tiles == expected_tiles(gamestate)
+
+    gamestate.reset()
+    assert gamestate.unit_tiles == {}
+
+
+def test_unit_tiles_of_copies():
+    gamestate = GameState(army_size=20)
+    copy = decode_gamestate(encode_gamestate(gamestate))
+    for move in ([1, 3, 4], [21, 8, 4], [2, 3, 5], [1, 6, 6]):
+        gamestate.apply_turn({"move": move, "attack": None, "phase": END_TURN})
+
+    decoded = decode_gamestate(encode_gamestate(gamestate))
+    assert decoded.unit_tiles == expected_tiles(gamestate)
+
+    copy.apply_changes(gamestate.changes_since(copy.version))
+    assert copy.unit_tiles == expected_tiles(gamestate) == {(6, 6): 1, (8, 4): 21, (3, 5): 2}
@@ -0,0 +1,71 @@
+"""
+File: test_grid.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Checks that the Bitboard and Pathfinder a Grid keeps up to date
+match ones rebuilt from scratch after every kind of change.
+
+"""
+
+import random
+
+import pytest
+
+from src.core.bitboard import Bitboard
+from src.core.chunks import ChunkedArray
+from src.core.constants import BLANK, HEALTH, HARM, MOVABLE, ATTACKABLE
+from src.core.grid import Grid
+from src.core.pathfinding import get_terrain_cost
+
+
+def check(grid):
+    rebuilt = Bitboard.from_grid(grid)
+    assert {tile_type: mask for tile_type, mask in grid.bitboard.tiles.items() if mask} == rebuilt.tiles
+    tile_types = grid.tile_types.to_array().ravel().tolist()
+    # Highlights are drawn over the terrain and keep its cost
+    assert all(cost == get_terrain_cost(tile_type) for cost, tile_type
+               in zip(grid.pathfinder.costs, tile_types) if tile_type not in (MOVABLE, ATTACKABLE))
+    assert grid.pathfinder.rough == {index for index, cost in enumerate(grid.pathfinder.costs) if cost > 1}
+
+
+@pytest.mark.parametrize("cols, rows", [(14, 12), (150, 90)])
+def test_incremental_updates_match_a_rebuild(cols, rows):
+    random.seed(cols)
+    grid = Grid(cols, rows, bitboard=True, pathfinder=True)
+    for _ in range(30):
+        count = random.randrange(1, cols * rows // 4)
+        positions = [(random.randrange(-cols, cols), random.randrange(-rows, rows)) for _ in range(count)]
+        tile_type = random.choice((BLANK, HEALTH, HARM, MOVABLE, ATTACKABLE))
+        grid.set_tile_types(positions, tile_type)
+        check(grid)
+        if random.random() < 0.3:
+            grid.clear_tile_type(random.choice((HARM, MOVABLE)))
+            check(grid)
+    grid.clear_tiles()
+    check(grid)
+    assert grid.bitboard.tiles == {}
+    assert set(grid.pathfinder.costs) == {get_terrain_cost(BLANK)}
+
+
+@pytest.mark.parametrize("positions", [
+    [(0, 0), (14, 0)],
+    [(0, 0)] * 100 + [(0, -13)],
+])
+def test_out_of_bounds_changes_nothing(positions):
+    grid = Grid(14, 12, bitboard=True, pathfinder=True)
+    grid.set_tile_types(positions, MOVABLE)
+    assert grid.find_tiles(MOVABLE) == []
+    assert grid.bitboard.tiles == {}
+
+
+@pytest.mark.parametrize("cols, rows", [(14, 12), (150, 90)])
+def test_fill_stays_on_the_board(cols, rows):
+    tiles = ChunkedArray(cols, rows)
+    tiles.fill(HEALTH)
+    found_cols, found_rows = tiles.find(HEALTH)
+    assert len(found_cols) == cols * rows
+    assert found_cols.max() == cols - 1 and found_rows.max() == rows - 1
+
+    tiles.replace(HEALTH, HARM)
+    assert len(tiles.find(HARM)[0]) == cols * rows
@@ -0,0 +1,71 @@
+"""
+File: test_journal.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Checks that matches written to the journal come back the same.
+
+"""
+
+from src.codec import encode_gamestate
+from src.constants import END_TURN
+from src.core.gamestate import GameState
+from src.journal import Journal, FSYNC_NEVER
+
+
+def play(gamestate, turn):
+    version = gamestate.version
+    gamestate.apply_turn(turn)
+    return gamestate.changes_since(version)
+
+
+def written(directory):
+    """
+    Returns a started journal and a GameState that was
+    snapshotted, then changed twice more.
+    """
+    journal = Journal(directory, FSYNC_NEVER)
+    journal.start()
+    gamestate = GameState()
+    gamestate.set_ready(1)
+    gamestate.set_ready(2)
+    journal.snapshot(1, gamestate)
+    journal.save_sessions(1, {1: "first", 2: "second"})
+    journal.append(1, play(gamestate, {"move": [1, 3, 4], "attack": [5, 2], "phase": END_TURN}))
+    journal.append(1, play(gamestate, {"move": [4, 8, 7], "attack": None, "phase": END_TURN}))
+    journal.close()
+    return gamestate
+
+
+def test_recovers_snapshot_and_log(tmp_path):
+    gamestate = written(str(tmp_path))
+
+    recovered = Journal(str(tmp_path)).recover()
+
+    assert list(recovered) == [1]
+    recovered_state, tokens = recovered[1]
+    assert encode_gamestate(recovered_state) == encode_gamestate(gamestate)
+    assert tokens == {1: "first", 2: "second"}
+
+
+def test_damaged_tail_is_cut_off(tmp_path):
+    gamestate = written(str(tmp_path))
+    log_path = tmp_path / "match-1.log"
+    intact = log_path.stat().st_size
+    with open(log_path, "ab") as log:
+        log.write(b"\x10\x00\x00\x00half a record")
+
+    recovered_state, _ = Journal(str(tmp_path)).recover()[1]
+
+    assert encode_gamestate(recovered_state) == encode_gamestate(gamestate)
+    assert log_path.stat().st_size == intact
+
+
+def test_removed_match_is_not_recovered(tmp_path):
+    written(str(tmp_path))
+    journal = Journal(str(tmp_path))
+    journal.start()
+    journal.remove(1)
+    journal.close()
+
+    assert Journal(str(tmp_path)).recover() == {}
@@ -0,0 +1,77 @@
+"""
+File: test_match_server.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Drives both players of a match at once through a MatchServer
+and checks the commands it applied: each exactly once, in the
+order its player sent them, with accepted turns alternating.
+
+"""
+
+import asyncio
+
+import pytest
+
+from src.asyncclient import HOST, ROUND, seat_match, send_rounds, read_replies, get_gamestate
+from server import MatchServer, READ_BUFFER_LIMIT
+
+ROUNDS = 50
+
+# Seconds to wait for every reply
+TIMEOUT = 60
+
+
+class RecordingMatchServer(MatchServer):
+    """
+    Keeps (player_num, command, accepted) for every command applied,
+    where accepted says whether a turn changed the GameState.
+    """
+
+    def __init__(self, army_size):
+        super().__init__(army_size=army_size)
+        self.applied = []
+
+    def apply_command(self, match, connection, player_num, command, argument):
+        version = match.gamestate.version
+        super().apply_command(match, connection, player_num, command, argument)
+        self.applied.append((player_num, command, match.gamestate.version != version))
+
+
+async def hammer(server):
+    listener = await asyncio.start_server(server.handle_client, HOST, 0, limit=READ_BUFFER_LIMIT)
+    server.start_timers()
+    port = listener.sockets[0].getsockname()[1]
+    try:
+        players = await seat_match(port, push=False)
+        results = await asyncio.wait_for(asyncio.gather(
+            *(send_rounds(player, ROUNDS) for player in players),
+            *(read_replies(player, ROUNDS) for player in players)), TIMEOUT)
+        applied = list(server.applied)
+        gamestate = await get_gamestate(players[0])
+        for player in players:
+            player.writer.close()
+        return [player.player_num for player in players], results[2:], applied, gamestate
+    finally:
+        listener.close()
+        server.timer_task.cancel()
+
+
+@pytest.mark.parametrize("army_size", [3, 20])
+def test_concurrent_commands_are_applied_once_in_order(army_size):
+    server = RecordingMatchServer(army_size)
+    player_nums, replies, applied, gamestate = asyncio.run(hammer(server))
+
+    sent = ["start"] + [command.split(" ")[0] for command, _ in ROUND] * ROUNDS
+    for player_num, (accepted, errors) in zip(player_nums, replies):
+        assert errors == []
+        assert [command for num, command, _ in applied if num == player_num] == sent
+        # Every "ok" reply matches a turn that changed the GameState
+        turns = [changed for num, command, changed in applied if num == player_num and command == "turn"]
+        assert sum(turns) == len(accepted)
+
+    turn_order = [num for num, command, changed in applied if command == "turn" and changed]
+    assert turn_order == [1, 2] * (len(turn_order) // 2) + [1] * (len(turn_order) % 2)
+    assert len(turn_order) > 0
+    assert gamestate.get_turn() == (1 if len(turn_order) % 2 == 0 else 2)
+    assert gamestate.army_size == army_size
@@ -0,0 +1,73 @@
+"""
+File: test_rules.py
+Programmers: Fernando Rodriguez, Charles Davis, Paul Rogers
+
+
+Checks that the server's TurnValidator lets units move exactly
+where the client's Board highlights, turn after turn.
+
+"""
+
+import random
+
+from src.constants import GRID_COLUMNS, GRID_ROWS, END_TURN
+from src.core.board import Board
+from src.core.gamestate import GameState
+from src.core.rules import TurnValidator
+from src.replay import Replay
+
+
+def board_reach(board, unit_type):
+    unit = board.get_unit_by_type(unit_type)
+    reach = board.grid.pathfinder.get_reach(unit.col(), unit.row(), unit.speed).tiles
+    return {tile for tile in reach if board.get_unit_at(*tile) is None}
+
+
+def test_validator_moves_where_the_board_highlights():
+    random.seed(3)
+    gamestate = GameState()
+    validator = TurnValidator(GRID_COLUMNS, GRID_ROWS)
+    board = Board(1)
+    for _ in range(200):
+        player_num = gamestate.get_turn()
+        unit_type = random.choice(list(validator.player_units[player_num]))
+        legal = {(col, row) for col in range(GRID_COLUMNS) for row in range(GRID_ROWS)
+                 if validator.validate(gamestate, player_num,
+                                       {"move": [unit_type, col, row], "attack": None, "phase": END_TURN}) is None}
+        assert legal == board_reach(board, unit_type)
+
+        col, row = random.choice(sorted(legal))
+        gamestate.apply_turn({"move": [unit_type, col, row], "attack": None, "phase": END_TURN})
+        board.move(board.get_unit_by_type(unit_type), col, row)
+
+
+def test_units_block_the_way():
+    gamestate = GameState()
+    validator = TurnValidator(GRID_COLUMNS, GRID_ROWS)
+    # Wall off unit 2, which starts in the left column, with player 1's other units and player 2's
+    col, row = validator.starting_locations[2]
+    for unit_type, tile in zip((1, 3, 4, 5, 6), ((col, row - 1), (col, row + 1),
+                                                 (col + 1, row - 1), (col + 1, row), (col + 1, row + 1))):
+        gamestate.move_unit([unit_type, *tile])
+
+    assert validator.get_reach(gamestate, 2).tiles == {(col, row)}
+    turn = {"move": [2, col + 2, row], "attack": None, "phase": END_TURN}
+    assert validator.validate(gamestate, 1, turn) == "out of move range"
+
+
+def test_replays_without_a_change_log():
+    # Replays keep no change log, so their version never moves
+    turns = [
+        {"move": [2, 2, 6], "attack": None},
+        {"move": [5, 11, 6], "attack": None},
+        {"move": [2, 0, 6], "attack": None},
+    ]
+    gamestate = GameState()
+    validator = TurnValidator(GRID_COLUMNS, GRID_ROWS)
+    for turn in turns:
+        assert validator.validate(gamestate, gamestate.get_turn(), turn) is None
+        gamestate.apply_turn(turn)
+
+    replay = Replay(turns, TurnValidator(GRID_COLUMNS, GRID_ROWS))
+    replay.run()
+    assert replay.gamestate.unit_locations == gamestate.unit_locations